@@ -0,0 +1,92 @@
+"""
+Event-loop responsiveness under a slow blocking tool call.
+
+Starts a deliberately slow pdf_read (a large generated PDF, no_cache so the
+pages are really extracted) through dispatch_tool and, while it runs, fires
+ping calls and records their latency. With the executor layer the pings stay
+in the low milliseconds; if a handler ever blocks the loop again, the max
+ping latency jumps to the PDF's runtime.
+
+This is a regression check: the exit status is 1 when the ping p99 or max
+latency is over --max-p99-ms / --max-ms, or when the pdf_read finished too
+quickly (under 4 × --max-ms) for a blocked loop to show.
+
+Usage:
+    python benchmarks/bench_dispatch.py [--pages 3000] [--max-p99-ms 25] [--max-ms 100]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import make_pdf
+
+from config import load_config
+from tools import dispatch_tool, shutdown_executors
+
+
+async def run(pages: int) -> tuple[float, list[float]]:
+    config = load_config()
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "slow.pdf"
+        make_pdf(pdf_path, pages)
+        config["pdf_cache_dir"] = str(Path(tmp) / "cache")
+
+        # Warm the pool so process start-up is not counted against the pings
+        await dispatch_tool("pdf_read", {"path": str(pdf_path)}, config)
+
+        t0 = time.perf_counter()
+        slow = asyncio.create_task(
+            dispatch_tool("pdf_read", {"path": str(pdf_path), "no_cache": True}, config)
+        )
+        latencies = []
+        while not slow.done():
+            start = time.perf_counter()
+            await dispatch_tool("ping", {}, config)
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.005)
+        await slow
+        pdf_ms = (time.perf_counter() - t0) * 1000
+
+    print(f"pdf_read ({pages} pages, no_cache): {pdf_ms:.0f} ms")
+    print(f"ping calls during pdf_read: {len(latencies)}")
+    return pdf_ms, latencies
+
+
+def check(pdf_ms: float, latencies: list[float], max_p99_ms: float, max_ms: float) -> list[str]:
+    if pdf_ms < 4 * max_ms or len(latencies) < 2:
+        return [f"pdf_read took {pdf_ms:.0f} ms, too short to tell; raise --pages"]
+    p99 = statistics.quantiles(latencies, n=100, method="inclusive")[98]
+    worst = max(latencies)
+    print(f"ping latency median={statistics.median(latencies):.3f} ms  "
+          f"p99={p99:.3f} ms  max={worst:.3f} ms")
+    failures = []
+    if p99 > max_p99_ms:
+        failures.append(f"ping p99 {p99:.1f} ms > {max_p99_ms:g} ms")
+    if worst > max_ms:
+        failures.append(f"ping max {worst:.1f} ms > {max_ms:g} ms")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=3000)
+    parser.add_argument("--max-p99-ms", type=float, default=25.0)
+    parser.add_argument("--max-ms", type=float, default=100.0)
+    opts = parser.parse_args()
+    try:
+        pdf_ms, latencies = asyncio.run(run(opts.pages))
+    finally:
+        shutdown_executors()
+    failures = check(pdf_ms, latencies, opts.max_p99_ms, opts.max_ms)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
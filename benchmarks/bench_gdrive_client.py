@@ -0,0 +1,102 @@
+"""
+Per-call latency for Drive tools: service built per call vs cached client.
+
+Runs against a local Drive v3 + OAuth stand-in (benchmarks/fakes.py).
+"before" is the original _build_service: load the service-account key,
+build credentials (so a fresh token grant on first use) and build("drive",
+"v3") with a new httplib2 transport, then fetch one file's metadata.
+"after" does the same metadata fetch through tools/gdrive_client.py. A
+threaded burst shows the shared pooled session under concurrency.
+
+Usage:
+    python benchmarks/bench_gdrive_client.py [--calls 50] [--burst 64]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from fixtures import SRC  # noqa: F401  (puts src/ on sys.path)
+from fakes import FakeDrive
+
+import httplib2
+from google.oauth2 import service_account
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+
+from config import load_config
+from tools import gdrive, gdrive_client
+
+
+def _summary(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+    print(f"  {label:<28} median={statistics.median(samples):7.2f} ms  p95={p95:7.2f} ms")
+
+
+def _build_per_call(config, ca_certs: str):
+    creds = service_account.Credentials.from_service_account_file(
+        config["google_service_account_json"], scopes=gdrive.SCOPES
+    )
+    # What build(credentials=creds) does, with the stand-in's CA trusted
+    http = AuthorizedHttp(creds, http=httplib2.Http(ca_certs=ca_certs))
+    return build("drive", "v3", http=http,
+                 client_options={"api_endpoint": config["gdrive_api_endpoint"]})
+
+
+def run(calls: int, burst: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        fake = FakeDrive(Path(tmp), files=10)
+        config = {**load_config(), **fake.start()}
+
+        def timed(get_files) -> list[float]:
+            samples = []
+            for i in range(calls):
+                start = time.perf_counter()
+                get_files().get(fileId=f"f{i % 10:06d}").execute()
+                samples.append((time.perf_counter() - start) * 1000)
+            return samples
+
+        tokens, connects = fake.token_requests, fake.connections
+        before = timed(lambda: _build_per_call(config, str(fake.cert_path)).files())
+        before_tokens, before_connects = fake.token_requests - tokens, fake.connections - connects
+
+        tokens, connects = fake.token_requests, fake.connections
+        after = timed(lambda: gdrive_client.get_client(config, gdrive.SCOPES).files)
+        after_tokens, after_connects = fake.token_requests - tokens, fake.connections - connects
+
+        connects = fake.connections
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=gdrive.MAX_WORKERS) as pool:
+            list(pool.map(
+                lambda i: gdrive.handle("gdrive_read_file", {"file_id": f"f{i % 10:06d}"}, config),
+                range(burst),
+            ))
+        burst_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{calls} sequential files.get calls against the local Drive stand-in")
+        _summary("before: build per call", before)
+        _summary("after:  cached client", after)
+        print(f"  speed-up (median)            {statistics.median(before) / statistics.median(after):.1f}x")
+        print(f"  token grants                 before={before_tokens}  after={after_tokens}")
+        print(f"  connections opened           before={before_connects}  after={after_connects}")
+        print(f"{burst} gdrive_read_file calls on {gdrive.MAX_WORKERS} threads: {burst_ms:.1f} ms total, "
+              f"{fake.connections - connects} new connection(s)")
+
+        gdrive_client.close_all()
+        fake.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--burst", type=int, default=64)
+    opts = parser.parse_args()
+    run(opts.calls, opts.burst)
+
+
+if __name__ == "__main__":
+    main()
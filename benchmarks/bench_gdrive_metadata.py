@@ -0,0 +1,79 @@
+"""
+Drive metadata for many files: one files.get per ID vs gdrive_get_metadata.
+
+Runs against a local Drive v3 stand-in (benchmarks/fakes.py) with a
+per-request latency to mimic the round trip to Google. "per-ID" issues one
+files.get per file on the shared client; "batched" is gdrive_get_metadata,
+which packs up to 100 calls into each batch request. Also lists the folder
+with gdrive_list_files to show how many pages a full listing takes.
+
+Usage:
+    python benchmarks/bench_gdrive_metadata.py [--files 500] [--latency-ms 20]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import SRC  # noqa: F401  (puts src/ on sys.path)
+from fakes import FakeDrive
+
+from config import load_config
+from tools import gdrive, gdrive_client
+
+
+def run(files: int, latency_ms: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        fake = FakeDrive(Path(tmp), files=files)
+        config = {**load_config(), **fake.start()}
+        ids = list(fake.files)
+        files_api = gdrive_client.get_client(config, gdrive.SCOPES).files
+        files_api.get(fileId=ids[0]).execute()   # warm token and connection
+        fake.latency = latency_ms / 1000
+
+        requests = fake.requests
+        start = time.perf_counter()
+        for file_id in ids:
+            files_api.get(fileId=file_id, fields="id,name,size").execute()
+        per_id_ms = (time.perf_counter() - start) * 1000
+        per_id_requests = fake.requests - requests
+
+        requests = fake.requests
+        start = time.perf_counter()
+        result = json.loads(gdrive.handle(
+            "gdrive_get_metadata", {"file_ids": ids, "fields": ["id", "name", "size"]}, config
+        ))
+        batched_ms = (time.perf_counter() - start) * 1000
+        batched_requests = fake.requests - requests
+        assert len(result["files"]) == len(ids), result["errors"][:3]
+
+        requests = fake.requests
+        start = time.perf_counter()
+        listing = json.loads(gdrive.handle(
+            "gdrive_list_files", {"max_results": files, "fields": ["id", "name"]}, config
+        ))
+        list_ms = (time.perf_counter() - start) * 1000
+
+        print(f"metadata for {files} files, {latency_ms:g} ms per HTTP request")
+        print(f"  per-ID files.get             {per_id_ms:8.1f} ms  ({per_id_requests} requests)")
+        print(f"  gdrive_get_metadata          {batched_ms:8.1f} ms  ({batched_requests} requests)")
+        print(f"  speed-up                     {per_id_ms / batched_ms:.1f}x")
+        print(f"full listing: {len(listing['files'])} files in {list_ms:.1f} ms over "
+              f"{fake.requests - requests} page(s), next_cursor={listing['next_cursor']}")
+
+        gdrive_client.close_all()
+        fake.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    opts = parser.parse_args()
+    run(opts.files, opts.latency_ms)
+
+
+if __name__ == "__main__":
+    main()
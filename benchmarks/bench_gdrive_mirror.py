@@ -0,0 +1,105 @@
+"""
+gdrive_list_files: live Drive API vs the local metadata mirror.
+
+Runs against a local Drive v3 stand-in (benchmarks/fakes.py) with a
+per-request latency to mimic the round trip to Google. The folder tree is
+seeded into the mirror once; then the same listing and a name/mimeType
+query are timed live (live=true) and from the mirror. Finally a batch of
+changes is made on the "server" and one incremental changes.list sync is
+timed, to compare with re-seeding.
+
+Usage:
+    python benchmarks/bench_gdrive_mirror.py [--files 2000] [--folders 20] [--latency-ms 20] [--calls 20]
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import SRC  # noqa: F401  (puts src/ on sys.path)
+from fakes import FakeDrive
+
+from config import load_config
+from tools import gdrive, gdrive_client, gdrive_mirror
+
+
+def _time(calls: int, fn) -> list[float]:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _summary(label: str, samples: list[float]) -> str:
+    p95 = sorted(samples)[int(len(samples) * 0.95) - 1]
+    return f"  {label:<28} median {statistics.median(samples):8.2f} ms   p95 {p95:8.2f} ms"
+
+
+def run(files: int, folders: int, latency_ms: float, calls: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        fake = FakeDrive(Path(tmp), files=files // 2)
+        subfolders = [fake.add_folder(f"project-{i:02d}") for i in range(folders)]
+        for i in range(files - files // 2):
+            fake.add_file(f"scan-{i:05d}.pdf", b"%PDF", parent=subfolders[i % folders],
+                          mime_type="application/pdf")
+        config = {
+            **load_config(), **fake.start(),
+            "gdrive_mirror": True,
+            "gdrive_mirror_db": str(Path(tmp) / "mirror.sqlite3"),
+        }
+        fake.latency = latency_ms / 1000
+        mirror = gdrive_mirror.get_mirror(config, gdrive.SCOPES)
+
+        requests = fake.requests
+        start = time.perf_counter()
+        seeded = mirror.sync()
+        seed_s = time.perf_counter() - start
+        print(f"seed: {seeded} files in {folders + 1} folders, {seed_s:.2f} s, "
+              f"{fake.requests - requests} requests ({latency_ms:g} ms each)")
+
+        def listing(**args):
+            return lambda: json.loads(gdrive.handle(
+                "gdrive_list_files", {"max_results": 1000, **args}, config
+            ))
+
+        query = {"folder_id": subfolders[0],
+                 "query": "name contains 'scan-000' and mimeType = 'application/pdf'"}
+        print(f"listing root ({files // 2 + folders} entries) and a filtered subfolder, {calls} calls each")
+        print(_summary("root, live", _time(calls, listing(live=True))))
+        print(_summary("root, mirror", _time(calls, listing())))
+        print(_summary("query, live", _time(calls, listing(live=True, **query))))
+        print(_summary("query, mirror", _time(calls, listing(**query))))
+
+        moved = list(fake.files)[:100]
+        for file_id in moved[:50]:
+            fake.update_file(file_id, name=f"renamed-{file_id}")
+        for file_id in moved[50:]:
+            fake.update_file(file_id, parents=[subfolders[1]])
+        requests = fake.requests
+        start = time.perf_counter()
+        applied = mirror.sync()
+        print(f"incremental sync: {applied} changes in {(time.perf_counter() - start) * 1000:.1f} ms, "
+              f"{fake.requests - requests} request(s)")
+
+        gdrive_mirror.close()
+        gdrive_client.close_all()
+        fake.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--folders", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--calls", type=int, default=20)
+    opts = parser.parse_args()
+    run(opts.files, opts.folders, opts.latency_ms, opts.calls)
+
+
+if __name__ == "__main__":
+    main()
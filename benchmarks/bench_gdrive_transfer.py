@@ -0,0 +1,82 @@
+"""
+Drive transfers: memory for large downloads, throughput for directory uploads.
+
+Runs against a local Drive v3 stand-in (benchmarks/fakes.py).
+  download — peak Python heap for get_media().execute() (the original
+             read path, whole file in memory) vs gdrive_download_file
+             streaming GDRIVE_CHUNK_MB ranges to disk
+  upload   — gdrive_upload_directory with 1 worker vs --workers, with a
+             per-request latency so concurrency has something to hide
+
+Usage:
+    python benchmarks/bench_gdrive_transfer.py [--size-mb 64] [--files 24] [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from fixtures import SRC  # noqa: F401  (puts src/ on sys.path)
+from fakes import FakeDrive
+
+from config import load_config
+from tools import gdrive, gdrive_client
+
+
+def _peak_mb(fn) -> float:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def run(size_mb: int, files: int, workers: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        fake = FakeDrive(tmp, files=0)
+        file_id = fake.add_file("disk.img", os.urandom(size_mb << 20), mime_type="application/octet-stream")
+        config = {**load_config(), **fake.start()}
+        files_api = gdrive_client.get_client(config, gdrive.SCOPES).files
+
+        in_memory = _peak_mb(lambda: files_api.get_media(fileId=file_id).execute())
+        streamed = _peak_mb(lambda: gdrive.handle(
+            "gdrive_download_file",
+            {"file_id": file_id, "local_path": str(tmp / "disk.img"), "overwrite": True},
+            config,
+        ))
+        print(f"download {size_mb} MiB (chunk {config['gdrive_chunk_mb']} MiB), peak Python heap")
+        print(f"  get_media().execute()        {in_memory:8.1f} MB")
+        print(f"  gdrive_download_file         {streamed:8.1f} MB")
+
+        upload_dir = tmp / "scans"
+        upload_dir.mkdir()
+        for i in range(files):
+            (upload_dir / f"scan-{i:03d}.zip").write_bytes(os.urandom(512 * 1024))
+        fake.latency = 0.02
+        print(f"upload {files} × 512 KiB files, 20 ms per request")
+        for n in (1, workers):
+            result = json.loads(gdrive.handle(
+                "gdrive_upload_directory", {"local_dir": str(upload_dir), "workers": n}, config
+            ))
+            print(f"  workers={n:<3} {result['seconds']:6.2f} s  {result['mb_per_s']:6.2f} MB/s  "
+                  f"uploaded={result['uploaded']} failed={result['failed']}")
+
+        gdrive_client.close_all()
+        fake.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--files", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=4)
+    opts = parser.parse_args()
+    run(opts.size_mb, opts.files, opts.workers)
+
+
+if __name__ == "__main__":
+    main()
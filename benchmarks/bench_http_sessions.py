@@ -0,0 +1,121 @@
+"""
+Load test for the streamable HTTP transport.
+
+Starts src/server.py with MCP_TRANSPORT=http on a free local port, opens
+--clients concurrent MCP sessions with the SDK's streamable HTTP client,
+and has each session issue --calls ping calls. Reports aggregate
+throughput and latency percentiles, then checks that one session beyond
+MCP_HTTP_MAX_SESSIONS is refused while the others stay open.
+
+Usage:
+    python benchmarks/bench_http_sessions.py [--clients 8] [--calls 50]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+from fixtures import SRC
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(port: int, timeout: float = 20) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start listening")
+
+
+async def _open_session(stack: AsyncExitStack, url: str) -> ClientSession:
+    read, write, _ = await stack.enter_async_context(streamablehttp_client(url))
+    session = await stack.enter_async_context(ClientSession(read, write))
+    await session.initialize()
+    return session
+
+
+async def _client(url: str, calls: int, latencies: list[float]) -> None:
+    async with AsyncExitStack() as stack:
+        session = await _open_session(stack, url)
+        for i in range(calls):
+            start = time.perf_counter()
+            await session.call_tool("ping", {"message": str(i)})
+            latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def _over_limit(url: str, clients: int) -> bool:
+    """Hold `clients` sessions open and try one more; True if it was refused."""
+    async with AsyncExitStack() as stack:
+        for _ in range(clients):
+            await _open_session(stack, url)
+        try:
+            async with AsyncExitStack() as extra:
+                await asyncio.wait_for(_open_session(extra, url), timeout=10)
+        except Exception:
+            return True
+        return False
+
+
+async def run(clients: int, calls: int) -> None:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/mcp"
+    env = dict(
+        os.environ, MCP_TRANSPORT="http", MCP_HTTP_PORT=str(port),
+        MCP_HTTP_MAX_SESSIONS=str(clients), LOG_LEVEL="WARNING",
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "logs").mkdir()
+        proc = subprocess.Popen(
+            [sys.executable, str(SRC / "server.py")], cwd=tmp, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            await _wait_ready(port)
+            latencies: list[float] = []
+            start = time.perf_counter()
+            await asyncio.gather(*(_client(url, calls, latencies) for _ in range(clients)))
+            elapsed = time.perf_counter() - start
+            refused = await _over_limit(url, clients)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    latencies.sort()
+    pct = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))]  # noqa: E731
+    print(f"{clients} concurrent sessions x {calls} ping calls")
+    print(f"  throughput : {len(latencies) / elapsed:.0f} calls/s")
+    print(f"  latency ms : p50={statistics.median(latencies):.2f} "
+          f"p95={pct(0.95):.2f} p99={pct(0.99):.2f} max={latencies[-1]:.2f}")
+    print(f"  session #{clients + 1} refused at the limit: {refused}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=50)
+    opts = parser.parse_args()
+    asyncio.run(run(opts.clients, opts.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-command latency for Kali commands: new connection per command vs pool.
+
+Runs against a local asyncssh stand-in (benchmarks/fakes.py). "before" opens
+a fresh asyncssh.connect for every command, as kali_run_tool originally
+did; "after" runs kali_run_tool through the persistent connection pool.
+A concurrent burst shows multiplexing, and a forced disconnect shows the
+pool reconnecting transparently.
+
+Usage:
+    python benchmarks/bench_kali_ssh.py [--commands 100] [--burst 32]
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import SRC  # noqa: F401  (puts src/ on sys.path)
+from fakes import FakeKaliServer
+
+import asyncssh
+
+from config import load_config
+from tools import kali, kali_pool
+
+
+def _summary(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+    print(f"  {label:<28} median={statistics.median(samples):7.2f} ms  p95={p95:7.2f} ms")
+
+
+async def run(commands: int, burst: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        fake = FakeKaliServer(Path(tmp))
+        config = {**load_config(), **await fake.start()}
+        args = {"tool": "nmap", "target": "10.0.0.1", "flags": "-sV"}
+        allowed = {"nmap"}
+
+        before = []
+        for _ in range(commands):
+            start = time.perf_counter()
+            async with asyncssh.connect(
+                config["kali_host"], port=config["kali_ssh_port"],
+                username=config["kali_user"], client_keys=[config["kali_ssh_key_path"]],
+                known_hosts=config["kali_known_hosts"],
+            ) as conn:
+                await conn.run("nmap -sV 10.0.0.1", check=False, timeout=120)
+            before.append((time.perf_counter() - start) * 1000)
+
+        after = []
+        for _ in range(commands):
+            start = time.perf_counter()
+            await kali._run_tool(args, config, allowed)
+            after.append((time.perf_counter() - start) * 1000)
+        pool = kali_pool.get_pool(config)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(kali._run_tool(args, config, allowed) for _ in range(burst)))
+        burst_ms = (time.perf_counter() - start) * 1000
+        burst_connects = pool.connects
+
+        for pooled in pool._conns:
+            pooled.conn.close()
+        await asyncio.sleep(0.05)
+        output = await kali._run_tool(args, config, allowed)
+
+        print(f"{commands} sequential commands against the local SSH stand-in")
+        _summary("before: connect per command", before)
+        _summary("after:  pooled channel", after)
+        print(f"  speed-up (median)            {statistics.median(before) / statistics.median(after):.1f}x")
+        print(f"{burst} concurrent commands: {burst_ms:.1f} ms total over "
+              f"{burst_connects} connection(s) (max {pool.max_channels} channels each)")
+        print(f"after forced disconnect: {output.strip()!r}, connects_total={pool.connects}")
+
+        await pool.close()
+        await fake.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commands", type=int, default=100)
+    parser.add_argument("--burst", type=int, default=32)
+    opts = parser.parse_args()
+    logging.getLogger("mcp-server.kali").setLevel(logging.ERROR)  # skip per-command KALI EXEC lines
+    asyncio.run(run(opts.commands, opts.burst))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Per-call logging overhead: synchronous handlers vs the queued pipeline.
+
+Logs the two INFO lines every call_tool emits, once with the old setup —
+StreamHandler plus FileHandler written on the calling thread, arguments
+formatted in full with f-strings — and once with log_setup.setup_logging:
+a QueueHandler feeding a listener thread, a rotating file, and arguments
+through ArgsSummary. Time is measured on the calling thread, which is the
+event loop in the server. "slow stderr" makes every console write take
+1 ms, like a blocked pipe to the client or a busy journald.
+
+Usage:
+    python benchmarks/bench_logging.py [--calls 2000]
+"""
+
+import argparse
+import io
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import SRC  # noqa: F401  (puts src/ on sys.path)
+
+from log_setup import ArgsSummary, TEXT_FORMAT, setup_logging, stop_logging
+
+ARGS = {
+    "small": {"path": "/srv/docs/report.pdf", "pages": [1, 2, 3]},
+    "large": {
+        "input_path": "/srv/forms/template.pdf",
+        "fields": {f"field_{i}": "x" * 40 for i in range(500)},
+        "targets": [f"10.0.{i // 256}.{i % 256}" for i in range(1000)],
+        "api_token": "s3cr3t",
+    },
+}
+
+
+class _SlowStream(io.StringIO):
+    def write(self, s: str) -> int:
+        time.sleep(0.001)
+        return super().write(s)
+
+
+def _old_setup(log_file: Path, stream) -> None:
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in (logging.StreamHandler(stream), logging.FileHandler(log_file)):
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+def _run(new: bool, args: dict, calls: int) -> float:
+    log = logging.getLogger("mcp-server")
+    start = time.perf_counter()
+    for _ in range(calls):
+        if new:
+            log.info("Tool called: %s | args: %s", "pdf_read", ArgsSummary(args), extra={"tool": "pdf_read"})
+            log.info("Tool succeeded: %s (%.0f ms)", "pdf_read", 1.0, extra={"tool": "pdf_read", "duration_ms": 1.0})
+        else:
+            log.info(f"Tool called: pdf_read | args: {args}")
+            log.info("Tool succeeded: pdf_read")
+    return (time.perf_counter() - start) / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2000)
+    opts = parser.parse_args()
+
+    print(f"{'arguments':<10} {'stderr':<7} {'setup':<14} {'µs/call':>9} {'log bytes/call':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size, args in ARGS.items():
+            for slow in (False, True):
+                calls = opts.calls // 10 if slow else opts.calls
+                for label, new in (("sync", False), ("queued", True)):
+                    log_file = Path(tmp) / f"{size}-{slow}-{label}.log"
+                    stream = _SlowStream() if slow else io.StringIO()
+                    if new:
+                        setup_logging({"log_file": str(log_file), "log_level": "INFO"}, stream)
+                    else:
+                        _old_setup(log_file, stream)
+                    per_call = _run(new, args, calls)
+                    stop_logging()
+                    for handler in logging.getLogger().handlers[:]:
+                        handler.close()
+                        logging.getLogger().removeHandler(handler)
+                    written = log_file.stat().st_size / calls
+                    print(f"{size:<10} {'slow' if slow else 'fast':<7} {label:<14} "
+                          f"{per_call * 1e6:>9.1f} {written:>15.0f}")
+        setup_logging({"log_file": str(Path(tmp) / "json.log"), "log_format": "json"}, io.StringIO())
+        logging.getLogger("mcp-server").info(
+            "Tool called: %s | args: %s", "pdf_read", ArgsSummary(ARGS["large"]), extra={"tool": "pdf_read"},
+        )
+        stop_logging()
+        print("json line:", (Path(tmp) / "json.log").read_text()[:160], "...")
+
+
+if __name__ == "__main__":
+    main()
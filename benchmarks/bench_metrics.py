@@ -0,0 +1,115 @@
+"""
+Cost and accuracy of the metrics layer (src/metrics.py).
+
+Measures what instrumentation adds to a call: the tool_started/tool_finished
+pair and a backend observe() on their own, then ping through dispatch_tool
+with and without them. Next, proxmox_vm_status calls run against the local
+HTTPS stand-in (benchmarks/fakes.py) and server_stats is read back; the
+tool's latency and the "proxmox.http" backend timing are recorded. Finally
+the percentile estimates from the fixed buckets are compared with exact
+percentiles of the same log-normal samples, and a full textfile render is
+timed.
+
+Usage:
+    python benchmarks/bench_metrics.py [--calls 20000] [--proxmox-calls 200]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import SRC  # noqa: F401  (puts src/ on sys.path)
+from fakes import FakeProxmox
+
+import urllib3
+
+import metrics
+from config import load_config
+from tools import _call_handler, dispatch_tool, get_all_tools, shutdown_executors
+
+
+async def _per_call(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        await fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def run(calls: int, proxmox_calls: int) -> None:
+    config = load_config()
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        metrics.tool_finished("bench", metrics.tool_started("bench"), False)
+    pair_us = (time.perf_counter() - start) / calls * 1e6
+    start = time.perf_counter()
+    for _ in range(calls):
+        metrics.observe("bench.backend", 0.001)
+    observe_us = (time.perf_counter() - start) / calls * 1e6
+    print(f"tool_started + tool_finished   {pair_us:6.2f} µs")
+    print(f"observe()                      {observe_us:6.2f} µs")
+
+    await dispatch_tool("ping", {}, config)   # import the module first
+    bare = await _per_call(lambda: _call_handler("ping", "ping", {}, config), calls)
+    timed = await _per_call(lambda: dispatch_tool("ping", {}, config), calls)
+    print(f"ping via handler only          {bare:6.2f} µs")
+    print(f"ping via dispatch_tool         {timed:6.2f} µs  (+{timed - bare:.2f} µs)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fake = FakeProxmox(Path(tmp), latency=0.002)
+        config = {**config, **fake.start()}
+        args = {"node": "pve1", "vmid": 101, "max_staleness": 0}   # live reads, not inventory
+        for _ in range(proxmox_calls):
+            await dispatch_tool("proxmox_vm_status", args, config)
+        fake.stop()
+    stats = metrics.snapshot()
+    print(f"\n{proxmox_calls} proxmox_vm_status calls, stand-in adds 2 ms per request:")
+    print(json.dumps({
+        "tools.proxmox_vm_status": stats["tools"]["proxmox_vm_status"],
+        "backends.proxmox.http": stats["backends"]["proxmox.http"],
+    }, indent=2))
+
+    rng = random.Random(0)
+    samples = [rng.lognormvariate(-4, 1.2) for _ in range(100_000)]
+    h = metrics.Histogram()
+    for s in samples:
+        h.observe(s)
+    ordered = sorted(samples)
+    print("\npercentile estimates vs exact (100k log-normal samples):")
+    for q in (0.50, 0.95, 0.99):
+        exact = ordered[int(q * len(ordered)) - 1]
+        estimate = h.quantile(q)
+        print(f"  p{int(q * 100):<3} exact={exact * 1000:8.2f} ms  estimate={estimate * 1000:8.2f} ms  "
+              f"error={abs(estimate - exact) / exact:6.1%}")
+
+    for tool in get_all_tools():
+        metrics.tool_finished(tool.name, metrics.tool_started(tool.name), False)
+    renders = []
+    for _ in range(50):
+        start = time.perf_counter()
+        text = metrics.prometheus_text()
+        renders.append(time.perf_counter() - start)
+    print(f"\ntextfile render, {len(get_all_tools())} tools: "
+          f"{statistics.median(renders) * 1000:.2f} ms, {len(text) / 1024:.0f} KB, "
+          f"{text.count(chr(10))} lines")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--proxmox-calls", type=int, default=200)
+    opts = parser.parse_args()
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    try:
+        asyncio.run(run(opts.calls, opts.proxmox_calls))
+    finally:
+        shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Drive PDF to text: download to a temp file then pdf_read vs drive_file_id.
+
+Runs against a local Drive v3 stand-in (benchmarks/fakes.py). "temp file"
+is the old two-step pipeline — gdrive_download_file to disk, then pdf_read
+on the path. "drive_file_id" is one pdf_read call that opens the
+downloaded bytes in memory; "drive_file_id, cached" repeats it with the
+Drive content cache warm. Each call reads only page 1, so the numbers are
+the cost of getting the document open, and the extraction cache is
+bypassed throughout.
+
+Usage:
+    python benchmarks/bench_pdf_drive.py [--pages 2000] [--calls 10]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import make_pdf
+from fakes import FakeDrive
+
+from config import load_config
+from tools import gdrive, gdrive_cache, pdf
+
+
+def _time(calls: int, fn) -> list[float]:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run(pages: int, calls: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        data = make_pdf(tmp / "source.pdf", pages).read_bytes()
+        fake = FakeDrive(tmp, files=0)
+        file_id = fake.add_file("report.pdf", data, mime_type="application/pdf")
+        config = {
+            **load_config(), **fake.start(),
+            "gdrive_cache_dir": str(tmp / "gdrive-cache"),
+            "pdf_cache_dir": str(tmp / "pdf-cache"),
+            "pdf_extract_workers": 1,
+        }
+
+        def via_temp_file():
+            local = tmp / "download.pdf"
+            gdrive.handle("gdrive_download_file",
+                          {"file_id": file_id, "local_path": str(local), "overwrite": True}, config)
+            pdf.handle("pdf_read", {"path": str(local), "pages": [1], "no_cache": True}, config)
+            local.unlink()
+
+        def via_drive_file_id():
+            pdf.handle("pdf_read", {"drive_file_id": file_id, "pages": [1], "no_cache": True}, config)
+
+        def via_drive_file_id_cold():
+            gdrive_cache.close()
+            (tmp / "gdrive-cache" / "content.sqlite3").unlink()
+            via_drive_file_id()
+
+        via_temp_file()   # warm the token and connection
+        via_drive_file_id()
+        results = {
+            "temp file": _time(calls, via_temp_file),
+            "drive_file_id": _time(calls, via_drive_file_id_cold),
+            "drive_file_id, cached": _time(calls, via_drive_file_id),
+        }
+
+        print(f"page 1 of a {pages}-page PDF ({len(data) >> 10} KiB) from Drive, {calls} calls each")
+        for label, samples in results.items():
+            print(f"  {label:<24} median {statistics.median(samples):8.1f} ms")
+
+        pdf.shutdown()
+        gdrive.shutdown()
+        fake.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--calls", type=int, default=10)
+    opts = parser.parse_args()
+    run(opts.pages, opts.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Page-parallel PDF extraction throughput by worker count.
+
+Generates a large text PDF and extracts every page with pdf_engine at each
+worker count, reporting pages/second and speed-up over a single worker.
+
+Usage:
+    python benchmarks/bench_pdf_extract.py [--pages 2000] [--workers 1,2,4,8]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import make_pdf
+
+from tools import pdf_engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--workers", default="")
+    parser.add_argument("--repeat", type=int, default=3)
+    opts = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    counts = [int(w) for w in opts.workers.split(",") if w] or sorted(
+        {1, 2, 4, cpus} & set(range(1, cpus + 1))
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(make_pdf(Path(tmp) / "bench.pdf", opts.pages))
+        pages = list(range(1, opts.pages + 1))
+
+        print(f"{opts.pages} pages, best of {opts.repeat}")
+        print(f"{'workers':>8} {'seconds':>9} {'pages/s':>10} {'speed-up':>9}")
+        baseline = None
+        for workers in counts:
+            # The pool keeps its first size, so start a fresh one for each count.
+            # Warm-up run starts the pool and lets each worker open the file
+            pdf_engine.shutdown()
+            pdf_engine.extract_text(path, pages, workers)
+            best = float("inf")
+            for _ in range(opts.repeat):
+                start = time.perf_counter()
+                texts = pdf_engine.extract_text(path, pages, workers)
+                best = min(best, time.perf_counter() - start)
+            assert len(texts) == len(pages)
+            baseline = baseline or best
+            print(f"{workers:>8} {best:>9.3f} {len(pages) / best:>10.0f} {baseline / best:>8.2f}x")
+        pdf_engine.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Form filling: one pdf_fill_form call per record vs pdf_fill_form_batch.
+
+Generates an AcroForm template (benchmarks/fixtures.make_form_pdf) and
+fills it for N records. "per call" is a loop of pdf_fill_form, parsing the
+template on every call as the single tool does. "batch" is one
+pdf_fill_form_batch call, which parses it once per worker process.
+
+Usage:
+    python benchmarks/bench_pdf_forms.py [--records 500] [--workers 0]
+"""
+
+import argparse
+import csv
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import make_form_pdf
+
+from config import load_config
+from tools import pdf
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=0, help="0 = one per CPU")
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        template, fields = make_form_pdf(tmp / "template.pdf", opts.pages)
+        records = [
+            {"hostname": f"host-{i:05d}", **{f: f"{f} for host {i}" for f in fields}}
+            for i in range(opts.records)
+        ]
+        records_path = tmp / "records.csv"
+        with open(records_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(records[0]))
+            writer.writeheader()
+            writer.writerows(records)
+        config = {**load_config(), "pdf_extract_workers": opts.workers}
+
+        (tmp / "single").mkdir()
+        start = time.perf_counter()
+        for record in records:
+            pdf.handle("pdf_fill_form", {
+                "input_path": str(template),
+                "output_path": str(tmp / "single" / f"letter-{record['hostname']}.pdf"),
+                "fields": record,
+            }, config)
+        per_call = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = json.loads(pdf.handle("pdf_fill_form_batch", {
+            "template_path": str(template),
+            "records_path": str(records_path),
+            "output_dir": str(tmp / "batch"),
+            "output_name": "letter-{hostname}.pdf",
+        }, config))
+        batch = time.perf_counter() - start
+
+        print(f"{opts.records} records, {len(fields)} fields over {opts.pages} pages")
+        print(f"  per call   {per_call:7.2f} s  {opts.records / per_call:7.1f} records/s")
+        print(f"  batch      {batch:7.2f} s  {opts.records / batch:7.1f} records/s  "
+              f"(written={result['written']} failed={result['failed']})")
+        print(f"  speed-up   {per_call / batch:.1f}x")
+        pdf.shutdown()
+
+
+if __name__ == "__main__":
+    main()
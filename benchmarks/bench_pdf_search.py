@@ -0,0 +1,111 @@
+"""
+pdf_search vs reading every PDF: index build, incremental refresh and query latency.
+
+Generates a library of text PDFs with a seeded vocabulary and a few planted
+phrases. The "baseline" is what an agent does without an index: pdf_read
+each file and scan the text, here pdf_engine.extract_text plus a substring
+test per query. The index is then built with SearchIndex.update, refreshed
+with nothing changed and with one file rewritten, and queried.
+
+Usage:
+    python benchmarks/bench_pdf_search.py [--docs 40] [--pages 25] [--workers 0]
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import SRC  # noqa: F401  (puts src/ on sys.path)
+
+import pymupdf
+
+from tools import pdf_engine, pdf_index
+
+QUERIES = ["quarterly reconciliation", "firmware", "ledger AND audit", "migrat*", "zebra"]
+
+
+def _make_library(root: Path, docs: int, pages: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    vocab = [f"w{n:04d}" for n in range(5000)] + ["ledger", "audit", "migration", "firmware"]
+    for d in range(docs):
+        doc = pymupdf.open()
+        for p in range(pages):
+            words = rng.choices(vocab, k=220)
+            if rng.random() < 0.02:
+                words[rng.randrange(len(words))] = "quarterly reconciliation"
+            page = doc.new_page()
+            page.insert_textbox(page.rect + (72, 72, -72, -72), " ".join(words), fontsize=9)
+        (root / f"dept-{d % 5}").mkdir(exist_ok=True)
+        doc.save(root / f"dept-{d % 5}" / f"doc-{d:03d}.pdf")
+        doc.close()
+
+
+def _rewrite(path: str, pages: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        _make_library(Path(tmp), 1, pages, seed=99)
+        Path(tmp, "dept-0", "doc-000.pdf").replace(path)
+
+
+def _baseline(paths: list[str], query: str) -> int:
+    words = [w for w in query.replace("*", "").split() if w not in ("AND", "OR", "NOT")]
+    hits = 0
+    for path in paths:
+        texts = pdf_engine.extract_text(path, list(range(1, pdf_engine.page_count(path) + 1)), 1)
+        hits += sum(all(w.lower() in t.lower() for w in words) for t in texts)
+    return hits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=40)
+    parser.add_argument("--pages", type=int, default=25)
+    parser.add_argument("--workers", type=int, default=0, help="0 = one per CPU")
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        library = Path(tmp) / "library"
+        library.mkdir()
+        _make_library(library, opts.docs, opts.pages)
+        paths = sorted(str(p) for p in library.rglob("*.pdf"))
+        config = {"pdf_cache_dir": str(Path(tmp) / "cache"), "pdf_index_db": str(Path(tmp) / "index.sqlite3")}
+        print(f"{len(paths)} documents, {len(paths) * opts.pages} pages")
+
+        start = time.perf_counter()
+        _baseline(paths, QUERIES[0])
+        baseline_s = time.perf_counter() - start
+        print(f"baseline: read every file and scan     {baseline_s * 1000:9.0f} ms per query")
+
+        index = pdf_index.SearchIndex(Path(config["pdf_index_db"]))
+        for label, prepare in [
+            ("index build", None),
+            ("refresh, nothing changed", None),
+            ("refresh, one file rewritten", lambda: _rewrite(paths[0], opts.pages)),
+        ]:
+            if prepare:
+                prepare()
+            start = time.perf_counter()
+            result = index.update([str(library)], config, opts.workers)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<38} {elapsed * 1000:9.0f} ms  "
+                  f"(indexed {result['indexed']}, unchanged {result['unchanged']})")
+
+        print(f"{'query':<28} {'matches':>8} {'median ms':>10} {'speed-up':>9}")
+        for query in QUERIES:
+            times = []
+            for _ in range(20):
+                start = time.perf_counter()
+                result = index.search(query, limit=20)
+                times.append(time.perf_counter() - start)
+            median = statistics.median(times)
+            print(f"{query:<28} {len(result['results']):>8} {median * 1000:>10.2f} "
+                  f"{baseline_s / median:>8.0f}x")
+        print(f"index size: {index.stats()['bytes'] / 1e6:.1f} MB")
+        index.close()
+        pdf_engine.shutdown()
+
+
+if __name__ == "__main__":
+    main()
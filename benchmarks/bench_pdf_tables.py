@@ -0,0 +1,85 @@
+"""
+pdf_extract_tables speed and accuracy: pdfplumber on every page vs the two-stage engine.
+
+Generates a corpus of report-like PDFs (benchmarks/fixtures.make_table_pdf)
+in which some pages hold ruled tables and the rest are prose. The
+"baseline" is the original handler: pdfplumber.extract_tables on every
+page in one thread. Each engine then runs through pdf_engine.extract_tables
+with the drawings pre-pass. Accuracy is the share of pages whose tables are
+identical to the baseline's; "table pages" is how many pages with a table
+came back with at least one. The process pool is warmed before anything is
+timed, so the engines' order doesn't matter.
+
+Usage:
+    python benchmarks/bench_pdf_tables.py [--docs 4] [--pages 60] [--workers 0]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import make_table_pdf
+
+import pdfplumber
+
+from tools import pdf_engine
+
+
+def _baseline(path: str, pages: list[int]) -> list[str]:
+    with pdfplumber.open(path) as pdf:
+        return [json.dumps(pdf.pages[i - 1].extract_tables()) for i in pages]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--docs", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=0, help="0 = one per CPU")
+    opts = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = [
+            make_table_pdf(Path(tmp) / f"report-{i}.pdf", opts.pages, table_every=3 + i, seed=i)
+            for i in range(opts.docs)
+        ]
+        pages = list(range(1, opts.pages + 1))
+        total_pages = opts.docs * opts.pages
+        table_pages = sum(len(t) for _, t in corpus)
+
+        start = time.perf_counter()
+        reference = [_baseline(str(path), pages) for path, _ in corpus]
+        baseline_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        flagged = sum(len(pdf_engine.table_candidates(str(path), pages)) for path, _ in corpus)
+        prepass_ms = (time.perf_counter() - start) * 1000
+
+        # Untimed: start the shared process pool and import both engines in its
+        # workers, so spawn start-up isn't charged to whichever engine runs first
+        pdf_engine.extract_tables(str(corpus[0][0]), pages, opts.workers, "pdfplumber")
+
+        print(f"{opts.docs} documents, {total_pages} pages, {table_pages} with a table")
+        print(f"pre-pass flagged {flagged} pages in {prepass_ms:.0f} ms")
+        print(f"{'engine':<22} {'seconds':>8} {'speed-up':>9} {'accuracy':>9} {'table pages':>12}")
+        print(f"{'baseline (pdfplumber)':<22} {baseline_s:8.2f} {'1.0x':>9} {'100.0%':>9} "
+              f"{table_pages:>5}/{table_pages}")
+        for engine in pdf_engine.TABLE_ENGINES:
+            start = time.perf_counter()
+            results = [
+                pdf_engine.extract_tables(str(path), pages, opts.workers, engine)
+                for path, _ in corpus
+            ]
+            elapsed = time.perf_counter() - start
+            same = sum(a == b for got, ref in zip(results, reference) for a, b in zip(got, ref))
+            found = sum(
+                1 for (_, truth), got in zip(corpus, results) for p in truth if got[p - 1] != "[]"
+            )
+            print(f"{engine:<22} {elapsed:8.2f} {baseline_s / elapsed:8.1f}x "
+                  f"{same / total_pages:9.1%} {found:>5}/{table_pages}")
+        pdf_engine.shutdown()
+
+
+if __name__ == "__main__":
+    main()
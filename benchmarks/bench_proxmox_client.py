@@ -0,0 +1,93 @@
+"""
+Per-call latency for Proxmox tools: fresh ProxmoxAPI per call vs cached client.
+
+Runs against a local HTTPS stand-in (benchmarks/fakes.py). "before" builds a
+new ProxmoxAPI for every proxmox_vm_status call, as the handler originally
+did, paying a TCP connect and TLS handshake each time; "after" goes through
+the shared client in tools/proxmox_client.py and reuses keep-alive
+connections. A threaded burst shows the pool serving concurrent calls.
+
+Usage:
+    python benchmarks/bench_proxmox_client.py [--calls 100] [--burst 32]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from fixtures import SRC  # noqa: F401  (puts src/ on sys.path)
+from fakes import FakeProxmox
+
+import urllib3
+from proxmoxer import ProxmoxAPI
+
+from config import load_config
+from tools import proxmox, proxmox_client
+
+
+def _summary(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+    print(f"  {label:<28} median={statistics.median(samples):7.2f} ms  p95={p95:7.2f} ms")
+
+
+def run(calls: int, burst: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        fake = FakeProxmox(Path(tmp))
+        config = {**load_config(), **fake.start()}
+        args = {"node": "pve1", "vmid": 101}
+
+        before = []
+        connects = fake.connections
+        for _ in range(calls):
+            start = time.perf_counter()
+            px = ProxmoxAPI(
+                config["proxmox_host"], user=config["proxmox_user"],
+                token_name=config["proxmox_token_name"],
+                token_value=config["proxmox_token_value"], verify_ssl=False,
+            )
+            px.nodes(args["node"]).qemu(args["vmid"]).status.current.get()
+            before.append((time.perf_counter() - start) * 1000)
+        before_connects = fake.connections - connects
+
+        after = []
+        connects = fake.connections
+        for _ in range(calls):
+            start = time.perf_counter()
+            proxmox.handle("proxmox_vm_status", args, config)
+            after.append((time.perf_counter() - start) * 1000)
+        after_connects = fake.connections - connects
+
+        connects = fake.connections
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=proxmox.MAX_WORKERS) as pool:
+            list(pool.map(lambda _: proxmox.handle("proxmox_vm_status", args, config), range(burst)))
+        burst_ms = (time.perf_counter() - start) * 1000
+        burst_connects = fake.connections - connects
+
+        print(f"{calls} sequential proxmox_vm_status calls against the local HTTPS stand-in")
+        _summary("before: client per call", before)
+        _summary("after:  cached client", after)
+        print(f"  speed-up (median)            {statistics.median(before) / statistics.median(after):.1f}x")
+        print(f"  connections opened           before={before_connects}  after={after_connects}")
+        print(f"{burst} calls on {proxmox.MAX_WORKERS} threads: {burst_ms:.1f} ms total, "
+              f"{burst_connects} new connection(s)")
+
+        proxmox_client.close_all()
+        fake.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--burst", type=int, default=32)
+    opts = parser.parse_args()
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    run(opts.calls, opts.burst)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+proxmox_list_vms latency: per-node loop vs /cluster/resources vs snapshot.
+
+Runs against a local HTTPS stand-in (benchmarks/fakes.py) with a per-request
+latency to mimic a remote cluster. "per-node loop" is the original handler —
+nodes.get() then qemu.get() and lxc.get() per node, 2N+1 round trips;
+"live" is one GET /cluster/resources (max_staleness=0); "snapshot" is the
+default path answered from the background-refreshed inventory.
+
+Usage:
+    python benchmarks/bench_proxmox_inventory.py [--nodes 14] [--latency-ms 5] [--calls 20]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import SRC  # noqa: F401  (puts src/ on sys.path)
+from fakes import FakeProxmox
+
+import urllib3
+
+from config import load_config
+from tools import proxmox, proxmox_client, proxmox_inventory
+
+
+def _per_node_loop(config) -> list[dict]:
+    px = proxmox_client.get_client(config)
+    vms = []
+    for node in [px.nodes(n["node"]) for n in px.nodes.get()]:
+        vms.extend(node.qemu.get())
+        vms.extend(node.lxc.get())
+    return vms
+
+
+def _time(calls: int, fn) -> list[float]:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run(nodes: int, latency_ms: float, calls: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        fake = FakeProxmox(Path(tmp), nodes=nodes, vms_per_node=20, latency=latency_ms / 1000)
+        config = {**load_config(), **fake.start()}
+        proxmox_inventory.get_inventory(config).fetch()
+
+        results = {
+            "per-node loop (2N+1 calls)": _time(calls, lambda: _per_node_loop(config)),
+            "live /cluster/resources": _time(
+                calls, lambda: proxmox.handle("proxmox_list_vms", {"max_staleness": 0}, config)
+            ),
+            "snapshot": _time(calls, lambda: proxmox.handle("proxmox_list_vms", {}, config)),
+        }
+
+        print(f"proxmox_list_vms on {nodes} nodes × 20 VMs, {latency_ms:g} ms per request")
+        for label, samples in results.items():
+            print(f"  {label:<28} median={statistics.median(samples):8.2f} ms")
+
+        proxmox.shutdown()
+        fake.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=14)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    parser.add_argument("--calls", type=int, default=20)
+    opts = parser.parse_args()
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    run(opts.nodes, opts.latency_ms, opts.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Paged delivery of large results and compact JSON (src/results.py, tools.to_json).
+
+Reads one large generated PDF with pdf_read over the real MCP loop (the
+in-memory JSON-RPC session from bench_suite.py), once with paging off and
+once with RESULT_PAGE_CHARS set. For each it reports the time until the
+client holds the first usable text and the size of that response. With
+paging on, the whole document is then read page by page with
+fetch_result_page, and the joined pages are checked against the unpaged
+text. Finally the old indent=2 output of a few JSON
+results is compared in size with to_json's.
+
+Usage:
+    python benchmarks/bench_results.py [--pages 2000] [--page-chars 50000]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from bench_suite import _jsonrpc_session
+from fixtures import make_pdf
+
+import server
+from config import load_config
+import metrics
+from tools import shutdown_executors, to_json
+
+NOTE = re.compile(r'\n\n\[Page \d+ of \d+ .*\]$', re.S)
+CURSOR = re.compile(r'cursor="([^"]+)"')
+
+
+async def _read(session, path: str) -> tuple[float, int, list[str]]:
+    start = time.perf_counter()
+    result = await session.call_tool("pdf_read", {"path": path})
+    elapsed = time.perf_counter() - start
+    wire = len(result.model_dump_json(by_alias=True, exclude_none=True))
+    return elapsed, wire, [block.text for block in result.content]
+
+
+async def run(pages: int, page_chars: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = str(make_pdf(Path(tmp) / "big.pdf", pages))
+        server.config.update({
+            **load_config(),
+            "pdf_cache_dir": str(Path(tmp) / "cache"),
+            "result_page_chars": 0,
+        })
+        async with _jsonrpc_session() as session:
+            await session.call_tool("pdf_read", {"path": pdf})   # warm the page cache
+
+            whole_s, whole_wire, (whole,) = await _read(session, pdf)
+            print(f"{pages}-page pdf_read, {len(whole):,} chars of text")
+            print(f"  whole result   first text after {whole_s * 1000:7.1f} ms, "
+                  f"{whole_wire / 1024:8.0f} KB response")
+
+            server.config["result_page_chars"] = page_chars
+            paged_s, paged_wire, blocks = await _read(session, pdf)
+            print(f"  paged ({page_chars:,})  first text after {paged_s * 1000:7.1f} ms, "
+                  f"{paged_wire / 1024:8.0f} KB response")
+
+            text, note, fetches = [blocks[0]], blocks[1], []
+            while (m := CURSOR.search(note)):
+                start = time.perf_counter()
+                page = (await session.call_tool("fetch_result_page", {"cursor": m.group(1)})).content[0].text
+                fetches.append(time.perf_counter() - start)
+                body, note = NOTE.split(page)[0], NOTE.search(page).group(0)
+                text.append(body)
+            print(f"  {len(fetches)} fetch_result_page calls, "
+                  f"{sum(fetches) / len(fetches) * 1000:.1f} ms each; "
+                  f"joined pages {'match' if ''.join(text) == whole else 'DIFFER FROM'} the whole result")
+            stats = await session.call_tool("server_stats", {})
+            print(f"  result store: {json.loads(stats.content[0].text)['result_store']}")
+
+    samples = {
+        "server_stats": metrics.snapshot(),
+        "list of 500 VMs": [
+            {"vmid": 100 + i, "name": f"vm-{i:03d}", "node": f"pve{i % 4}", "status": "running",
+             "cpus": 4, "maxmem": 8 << 30, "mem": 3 << 30, "uptime": 86400 + i}
+            for i in range(500)
+        ],
+    }
+    print("\nJSON size, indent=2 vs to_json:")
+    for label, value in samples.items():
+        old, new = len(json.dumps(value, indent=2)), len(to_json(value))
+        print(f"  {label:16} {old:8,} → {new:8,} chars ({1 - new / old:.0%} smaller)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--page-chars", type=int, default=50000)
+    opts = parser.parse_args()
+    try:
+        asyncio.run(run(opts.pages, opts.page_chars))
+    finally:
+        shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Cold-start benchmark: time from process spawn to the first list_tools response.
+
+Launches src/server.py as a real stdio subprocess, performs the MCP
+initialize handshake and a tools/list request, and reports the wall time
+to each response. It also checks in-process that listing tools does not
+import any integration's heavy dependencies.
+
+Suitable for CI: --json prints a machine-readable line, and --max-ms makes
+the run fail when the median time to first list_tools exceeds the budget.
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 5] [--max-ms 1500] [--json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fixtures import SRC
+
+HEAVY_MODULES = ("pymupdf", "pdfplumber", "pypdf", "googleapiclient", "proxmoxer", "asyncssh")
+
+_CHECK_LAZY = f"""
+import sys
+from tools import get_all_tools
+get_all_tools()
+print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))
+"""
+
+
+def _send(proc: subprocess.Popen, message: dict) -> None:
+    proc.stdin.write(json.dumps(message) + "\n")
+    proc.stdin.flush()
+
+
+def _recv(proc: subprocess.Popen, request_id: int) -> dict:
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError("server exited before responding")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            return message
+
+
+def time_first_list_tools(workdir: Path) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, str(SRC / "server.py")],
+        cwd=workdir, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, text=True,
+    )
+    try:
+        _send(proc, {
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "bench", "version": "0"},
+            },
+        })
+        _recv(proc, 1)
+        init_ms = (time.perf_counter() - start) * 1000
+        _send(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        _send(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        tools = _recv(proc, 2)["result"]["tools"]
+        list_ms = (time.perf_counter() - start) * 1000
+    finally:
+        proc.stdin.close()
+        proc.wait(timeout=10)
+    return init_ms, list_ms, len(tools)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=0, help="fail above this median")
+    parser.add_argument("--json", action="store_true")
+    opts = parser.parse_args()
+
+    eager = subprocess.run(
+        [sys.executable, "-c", _CHECK_LAZY], cwd=SRC, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "logs").mkdir()
+        runs = [time_first_list_tools(Path(tmp)) for _ in range(opts.runs)]
+
+    result = {
+        "runs": opts.runs,
+        "tools": runs[0][2],
+        "initialize_ms_median": round(statistics.median(r[0] for r in runs), 1),
+        "first_list_tools_ms_median": round(statistics.median(r[1] for r in runs), 1),
+        "first_list_tools_ms_max": round(max(r[1] for r in runs), 1),
+        "heavy_modules_loaded_by_list_tools": eager.split(",") if eager else [],
+    }
+    if opts.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key:>36}: {value}")
+
+    if result["heavy_modules_loaded_by_list_tools"]:
+        sys.exit("list_tools imported heavy integration dependencies")
+    if opts.max_ms and result["first_list_tools_ms_median"] > opts.max_ms:
+        sys.exit(f"first list_tools median exceeds {opts.max_ms} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+"""
+End-to-end throughput and tail latency for every integration, with baselines.
+
+Starts the local stand-ins (benchmarks/fakes.py): FakeProxmox and FakeDrive
+over HTTPS, FakeKaliServer over SSH answering nmap with generated XML, plus
+generated PDFs. Each scenario then runs a fixed number of calls to one tool
+at a given concurrency, --repeat times, through one or both transports:
+
+  dispatch — tools.dispatch_tool directly, as server.call_tool does
+  jsonrpc  — the real MCP loop: a ClientSession talks JSON lines over
+             in-memory stdio streams to mcp.server.stdio.stdio_server
+             feeding server.server.run, so request parsing, validation and
+             response serialisation are all included
+
+A scenario reports its best throughput and the median p50/p95/p99 of its
+runs. Results can be saved as a baseline (benchmarks/baselines/<name>.json)
+and later runs are compared with it. A scenario regresses when its
+throughput drops by more than --tolerance, or its p95 rises by more than
+twice that (tails are noisier) and by at least 1 ms. With --check the exit
+status is 1 on any regression. Baselines are machine-specific: save one on
+the machine that will run the checks.
+
+Usage:
+    python benchmarks/bench_suite.py [--calls 100] [--repeat 3] [--concurrency 8]
+        [--transport both|dispatch|jsonrpc] [--only REGEX]
+        [--baseline default] [--save] [--check] [--tolerance 0.25]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fixtures import SRC, make_form_pdf, make_pdf, make_table_pdf
+from fakes import FakeDrive, FakeKaliServer, FakeProxmox, fake_nmap
+
+# Logging is set up as server.main() does. Per-call log lines are measured
+# separately by bench_logging.py (and kali logs every run at WARNING), so keep
+# them out of these numbers
+os.environ.setdefault("LOG_LEVEL", "ERROR")
+os.environ.setdefault("LOG_FILE", "")
+
+import anyio
+import urllib3
+from mcp import ClientSession, types
+from mcp.server.stdio import stdio_server
+from mcp.shared.message import SessionMessage
+
+import server
+from config import load_config
+from log_setup import setup_logging, stop_logging
+from tools import dispatch_tool, shutdown_executors
+
+BASELINES = Path(__file__).parent / "baselines"
+# p95 changes smaller than this are noise, whatever the ratio
+MIN_P95_DELTA_MS = 1.0
+
+
+# ── Scenarios ─────────────────────────────────────────────────────────────────
+class Scenario:
+    """`calls` calls to `tool`; args(i) builds the arguments of call i."""
+
+    def __init__(self, name: str, tool: str, args):
+        self.name = name
+        self.tool = tool
+        self.args = args if callable(args) else (lambda i, a=args: a)
+
+
+async def _setup(tmp: Path, stack: contextlib.AsyncExitStack) -> tuple[dict, list[Scenario]]:
+    """Start the stand-ins and generate inputs; return (config overrides, scenarios)."""
+    proxmox = FakeProxmox(tmp)
+    stack.callback(proxmox.stop)
+    drive = FakeDrive(tmp, files=200)
+    stack.callback(drive.stop)
+    kali = FakeKaliServer(tmp, handler=fake_nmap)
+    overrides = {**proxmox.start(), **drive.start(), **await kali.start()}
+    stack.push_async_callback(kali.stop)
+
+    docs = tmp / "docs"
+    docs.mkdir()
+    text_pdf = make_pdf(docs / "report.pdf", 40)
+    table_pdf, _ = make_table_pdf(docs / "tables.pdf", 20)
+    for i in range(10):
+        make_pdf(docs / f"library-{i}.pdf", 10)
+    form_pdf, fields = make_form_pdf(tmp / "form.pdf")
+    out = tmp / "out"
+    out.mkdir()
+    overrides.update({
+        "pdf_cache_dir": str(tmp / "cache" / "pdf"),
+        "pdf_index_db": str(tmp / "data" / "pdf-index.sqlite3"),
+        "gdrive_cache_dir": str(tmp / "cache" / "gdrive"),
+        "gdrive_mirror": False,
+        "kali_results_db": str(tmp / "data" / "scan-results.sqlite3"),
+        "kali_job_dir": str(tmp / "cache" / "kali-jobs"),
+        "kali_allowed_tools": ["nmap"],
+    })
+    file_ids = sorted(drive.files)
+
+    scenarios = [
+        Scenario("ping", "ping", {}),
+        Scenario("pdf_read", "pdf_read", {"path": str(text_pdf)}),
+        Scenario("pdf_read.no_cache", "pdf_read", {"path": str(text_pdf), "pages": [1, 2, 3], "no_cache": True}),
+        Scenario("pdf_extract_tables", "pdf_extract_tables", {"path": str(table_pdf)}),
+        Scenario("pdf_fill_form", "pdf_fill_form", lambda i: {
+            "input_path": str(form_pdf), "output_path": str(out / f"filled-{i % 50}.pdf"),
+            "fields": {name: f"value {i}" for name in fields},
+        }),
+        Scenario("pdf_search", "pdf_search", {"query": "lorem ipsum", "limit": 10}),
+        Scenario("kali_run_tool", "kali_run_tool", lambda i: {
+            "tool": "nmap", "target": f"10.0.{i // 250}.{i % 250 + 1}", "structured": True,
+        }),
+        Scenario("kali_query_results", "kali_query_results", {"port": 443, "limit": 50}),
+        Scenario("proxmox_list_vms", "proxmox_list_vms", {}),
+        Scenario("proxmox_vm_status.live", "proxmox_vm_status", lambda i: {
+            "node": "pve1", "vmid": 100 + i % 20, "max_staleness": 0,
+        }),
+        Scenario("gdrive_list_files.live", "gdrive_list_files", {"max_results": 50, "live": True}),
+        Scenario("gdrive_get_metadata", "gdrive_get_metadata", lambda i: {
+            "file_ids": file_ids[i % 180:i % 180 + 20],
+        }),
+        Scenario("gdrive_read_file", "gdrive_read_file", lambda i: {"file_id": file_ids[i % len(file_ids)]}),
+    ]
+    return overrides, scenarios
+
+
+# ── Transports ────────────────────────────────────────────────────────────────
+class _Lines:
+    """In-memory stand-in for an anyio.AsyncFile[str]: one side writes lines, the other iterates."""
+
+    def __init__(self):
+        self._send, self._receive = anyio.create_memory_object_stream[str](1024)
+
+    async def write(self, text: str) -> None:
+        await self._send.send(text)
+
+    async def flush(self) -> None:
+        pass
+
+    def __aiter__(self):
+        return self._receive.__aiter__()
+
+    async def aclose(self) -> None:
+        await self._send.aclose()
+
+
+@contextlib.asynccontextmanager
+async def _jsonrpc_session():
+    """A ClientSession wired to server.server over JSON lines, as under stdio."""
+    to_server, from_server = _Lines(), _Lines()
+    incoming_w, incoming = anyio.create_memory_object_stream(0)
+    outgoing, outgoing_r = anyio.create_memory_object_stream(0)
+
+    async def read_responses():
+        async with incoming_w:
+            async for line in from_server:
+                await incoming_w.send(SessionMessage(types.JSONRPCMessage.model_validate_json(line)))
+
+    async def write_requests():
+        async with outgoing_r:
+            async for message in outgoing_r:
+                await to_server.write(message.message.model_dump_json(by_alias=True, exclude_none=True) + "\n")
+
+    async with anyio.create_task_group() as tg:
+        async with stdio_server(to_server, from_server) as (read, write):
+            tg.start_soon(server.server.run, read, write, server._init_options())
+            tg.start_soon(read_responses)
+            tg.start_soon(write_requests)
+            async with ClientSession(incoming, outgoing) as session:
+                await session.initialize()
+                yield session
+            tg.cancel_scope.cancel()
+
+
+async def _run_once(call, scenario: Scenario, calls: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    counter = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        for i in iter(lambda: next(counter), None):
+            if i >= calls:
+                return
+            start = time.perf_counter()
+            try:
+                await call(scenario.tool, scenario.args(i))
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    ordered = sorted(latencies)
+
+    def pct(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "errors": errors,
+        "throughput": calls / elapsed,
+        "p50_ms": statistics.median(ordered),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+async def _run_scenario(call, scenario: Scenario, opts) -> dict:
+    """Best throughput and median percentiles over --repeat runs, to damp noise."""
+    await call(scenario.tool, scenario.args(opts.calls))   # warm-up: imports, connections, caches
+    runs = [await _run_once(call, scenario, opts.calls, opts.concurrency) for _ in range(opts.repeat)]
+    result = {"calls": opts.calls, "errors": sum(r["errors"] for r in runs)}
+    result["throughput"] = round(max(r["throughput"] for r in runs), 1)
+    for key in ("p50_ms", "p95_ms", "p99_ms"):
+        result[key] = round(statistics.median(r[key] for r in runs), 2)
+    return result
+
+
+async def run(opts) -> dict:
+    results: dict[str, dict] = {}
+    pattern = re.compile(opts.only) if opts.only else None
+    with tempfile.TemporaryDirectory() as tmp:
+        async with contextlib.AsyncExitStack() as stack:
+            overrides, scenarios = await _setup(Path(tmp), stack)
+            server.config.update({**load_config(), **overrides})
+            setup_logging(server.config)
+            stack.callback(stop_logging)
+            # Runs first on exit: close pools (SSH needs the loop) before the stand-ins stop
+            stack.callback(shutdown_executors)
+            await dispatch_tool("pdf_index", {"paths": [str(Path(tmp) / "docs")]}, server.config)
+            scenarios = [s for s in scenarios if not pattern or pattern.search(s.name)]
+
+            async def via_dispatch(tool: str, args: dict) -> None:
+                await dispatch_tool(tool, args, server.config)
+
+            if opts.transport in ("both", "dispatch"):
+                for scenario in scenarios:
+                    key = f"dispatch/{scenario.name}"
+                    results[key] = await _run_scenario(via_dispatch, scenario, opts)
+                    _print_row(key, results[key])
+
+            if opts.transport in ("both", "jsonrpc"):
+                async with _jsonrpc_session() as session:
+                    async def via_jsonrpc(tool: str, args: dict) -> None:
+                        result = await session.call_tool(tool, args)
+                        if result.isError or result.content[0].text.startswith("Error:"):
+                            raise RuntimeError(result.content[0].text)
+
+                    for scenario in scenarios:
+                        key = f"jsonrpc/{scenario.name}"
+                        results[key] = await _run_scenario(via_jsonrpc, scenario, opts)
+                        _print_row(key, results[key])
+    return results
+
+
+# ── Reporting ─────────────────────────────────────────────────────────────────
+def _print_row(key: str, r: dict, note: str = "") -> None:
+    print(f"{key:<36} {r['calls']:>6} {r['errors']:>4} {r['throughput']:>9.1f} "
+          f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}  {note}", flush=True)
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return a line per regressed scenario."""
+    regressions = []
+    for key, r in results.items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        reasons = []
+        if r["throughput"] < base["throughput"] * (1 - tolerance):
+            reasons.append(f"throughput {base['throughput']} → {r['throughput']}/s")
+        if (r["p95_ms"] > base["p95_ms"] * (1 + 2 * tolerance)
+                and r["p95_ms"] - base["p95_ms"] > MIN_P95_DELTA_MS):
+            reasons.append(f"p95 {base['p95_ms']} → {r['p95_ms']} ms")
+        if r["errors"] > base["errors"]:
+            reasons.append(f"errors {base['errors']} → {r['errors']}")
+        if reasons:
+            regressions.append(f"{key}: {'; '.join(reasons)}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=100, help="calls per run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--transport", choices=["both", "dispatch", "jsonrpc"], default="both")
+    parser.add_argument("--only", help="run scenarios whose name matches this regex")
+    parser.add_argument("--baseline", default="default", help="name under benchmarks/baselines/")
+    parser.add_argument("--save", action="store_true", help="save this run as the baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any scenario regressed")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    opts = parser.parse_args()
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    print(f"{opts.repeat} × {opts.calls} calls per scenario at concurrency {opts.concurrency}")
+    print(f"{'scenario':<36} {'calls':>6} {'err':>4} {'calls/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    results = asyncio.run(run(opts))
+
+    path = BASELINES / f"{opts.baseline}.json"
+    if opts.save:
+        BASELINES.mkdir(exist_ok=True)
+        path.write_text(json.dumps({
+            "saved": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+            "calls": opts.calls,
+            "repeat": opts.repeat,
+            "concurrency": opts.concurrency,
+            "results": results,
+        }, indent=2) + "\n")
+        print(f"\nbaseline saved to {path}")
+        return
+    if not path.exists():
+        print(f"\nno baseline at {path}; run with --save to create one")
+        return
+
+    baseline = json.loads(path.read_text())
+    if (baseline["calls"], baseline["concurrency"]) != (opts.calls, opts.concurrency):
+        print(f"\nnote: baseline ran {baseline['calls']} calls at concurrency {baseline['concurrency']}")
+    regressions = compare(results, baseline, opts.tolerance)
+    print(f"\ncompared with {path.name} (saved {baseline['saved']}, "
+          f"{baseline['machine']['cpus']} CPUs): {len(regressions) or 'no'} regression(s)")
+    for line in regressions:
+        print(f"  REGRESSION {line}")
+    if regressions and opts.check:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,693 @@
+"""
+Local stand-ins for the remote backends, used by the benchmark scripts.
+
+FakeKaliServer — an asyncssh server that accepts the generated client key,
+                 writes its host key to a known_hosts file, and answers
+                 every command through a pluggable handler
+fake_nmap      — Kali handler that answers `nmap ... -oX -` with generated XML
+FakeProxmox    — threaded HTTPS server answering the Proxmox API paths the
+                 proxmox tools use, with keep-alive and a connection counter
+FakeDrive      — threaded HTTPS server answering the Drive v3 paths the gdrive
+                 tools use, plus an OAuth token endpoint for a generated
+                 service-account key
+"""
+
+import asyncio
+import datetime
+import email
+import hashlib
+import ipaddress
+import os
+import json
+import random
+import re
+import socket
+import ssl
+import threading
+import time
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import asyncssh
+
+
+async def echo_command(command: str, process: asyncssh.SSHServerProcess) -> int:
+    """Default Kali handler: print the command back and exit 0."""
+    process.stdout.write(f"ran: {command}\n")
+    return 0
+
+
+SERVICES = [
+    (22, "ssh", "OpenSSH", "9.6p1"),
+    (80, "http", "nginx", "1.24.0"),
+    (443, "https", "nginx", "1.24.0"),
+    (443, "https", "Apache httpd", "2.4.58"),
+    (3306, "mysql", "MySQL", "8.0.36"),
+    (8006, "https", "pve-proxy", ""),
+]
+
+
+def nmap_xml(target: str, seed: int | None = None) -> str:
+    """nmap -oX style XML for one host with a deterministic mix of open ports."""
+    rng = random.Random(zlib.crc32(target.encode()) if seed is None else seed)
+    ports = []
+    seen = set()
+    for port, name, product, version in rng.sample(SERVICES, rng.randint(1, 4)):
+        if port in seen:
+            continue
+        seen.add(port)
+        ports.append(
+            f'<port protocol="tcp" portid="{port}"><state state="open" reason="syn-ack"/>'
+            f'<service name="{name}" product="{product}" version="{version}"/></port>'
+        )
+    return (
+        '<?xml version="1.0"?><nmaprun scanner="nmap" args="nmap -oX -">'
+        f'<host><status state="up"/><address addr="{target}" addrtype="ipv4"/>'
+        f'<hostnames/><ports>{"".join(ports)}</ports></host>'
+        '<runstats><finished elapsed="0.42"/></runstats></nmaprun>'
+    )
+
+
+async def fake_nmap(command: str, process: asyncssh.SSHServerProcess) -> int:
+    """Kali handler: XML for `-oX -` nmap runs, a one-line echo otherwise."""
+    if command.startswith("nmap") and "-oX -" in command:
+        process.stdout.write(nmap_xml(command.split()[-1]))
+        return 0
+    return await echo_command(command, process)
+
+
+class _AcceptKey(asyncssh.SSHServer):
+    def begin_auth(self, username: str) -> bool:
+        return True
+
+
+class FakeKaliServer:
+    """asyncssh server on 127.0.0.1 standing in for the Kali host.
+
+    handler(command, process) -> exit status; it may write to
+    process.stdout / process.stderr and await between writes.
+    """
+
+    def __init__(self, workdir: Path, handler=echo_command):
+        self.workdir = workdir
+        self.handler = handler
+        self.commands: list[str] = []
+        self.connections = 0
+        self._server: asyncssh.SSHAcceptor | None = None
+
+    async def _process(self, process: asyncssh.SSHServerProcess) -> None:
+        command = process.command or ""
+        self.commands.append(command)
+        try:
+            status = await self.handler(command, process)
+        except (asyncssh.BreakReceived, asyncssh.TerminalSizeChanged, BrokenPipeError):
+            status = 1
+        process.exit(status)
+
+    def _on_connect(self) -> asyncssh.SSHServer:
+        self.connections += 1
+        return _AcceptKey()
+
+    async def start(self) -> dict:
+        """Start listening; return config overrides that point the pool here."""
+        client_key = asyncssh.generate_private_key("ssh-ed25519")
+        key_path = self.workdir / "kali_id_ed25519"
+        client_key.write_private_key(key_path)
+        host_key = asyncssh.generate_private_key("ssh-ed25519")
+        self._server = await asyncssh.create_server(
+            self._on_connect, "127.0.0.1", 0,
+            server_host_keys=[host_key],
+            authorized_client_keys=asyncssh.import_authorized_keys(
+                client_key.export_public_key().decode()
+            ),
+            process_factory=self._process,
+        )
+        port = self._server.sockets[0].getsockname()[1]
+        known_hosts = self.workdir / "known_hosts"
+        known_hosts.write_text(f"[127.0.0.1]:{port} {host_key.export_public_key().decode()}")
+        return {
+            "kali_host": "127.0.0.1",
+            "kali_ssh_port": port,
+            "kali_user": "mcp-runner",
+            "kali_ssh_key_path": str(key_path),
+            "kali_known_hosts": str(known_hosts),
+        }
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            await asyncio.sleep(0)
+
+
+# ── HTTP stand-ins ────────────────────────────────────────────────────────────
+def _self_signed_cert(workdir: Path, stem: str) -> tuple[Path, Path]:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+            critical=False,
+        )
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = workdir / f"{stem}.crt", workdir / f"{stem}.key"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    return cert_path, key_path
+
+
+class FakeRequest:
+    def __init__(self, method: str, path: str, query: dict, headers, body: bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+
+class Reply:
+    """A non-JSON or non-200 response from a route handler."""
+
+    def __init__(self, body: bytes | str | dict | list, status: int = 200,
+                 content_type: str | None = None, headers: dict | None = None):
+        if isinstance(body, (dict, list)):
+            body, content_type = json.dumps(body), content_type or "application/json"
+        self.body = body.encode() if isinstance(body, str) else body
+        self.status = status
+        self.content_type = content_type or "application/octet-stream"
+        self.headers = headers or {}
+
+
+class _FakeHTTPService:
+    """Threaded keep-alive HTTP(S) server routing requests to handler methods.
+
+    Subclasses define _routes() → [(method, path regex, handler)], where
+    handler(match, request) returns JSON-able data (wrapped by _envelope) or
+    a Reply. `latency` (seconds) is added to every request; `connections`
+    and `requests` count accepted TCP connections and handled requests.
+    """
+
+    tls = False
+
+    def __init__(self, workdir: Path, latency: float = 0.0):
+        self.workdir = workdir
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+        self.cert_path: Path | None = None
+        self._lock = threading.RLock()   # re-entered by batch routes
+        self._server: ThreadingHTTPServer | None = None
+
+    def _routes(self) -> list:
+        raise NotImplementedError
+
+    def _envelope(self, data) -> dict | list:
+        return data
+
+    def _handle(self, method: str, raw_path: str, headers, body: bytes) -> Reply:
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            threading.Event().wait(self.latency)
+        return self._route(method, raw_path, headers, body)
+
+    def _route(self, method: str, raw_path: str, headers, body: bytes) -> Reply:
+        url = urllib.parse.urlsplit(raw_path)
+        query = dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True))
+        request = FakeRequest(method, url.path, query, headers, body)
+        for verb, pattern, route in self._routes():
+            m = re.fullmatch(pattern, url.path)
+            if verb == method and m:
+                try:
+                    with self._lock:
+                        result = route(m, request)
+                except KeyError as e:
+                    return Reply({"error": {"code": 404, "message": f"not found: {e}"}}, 404)
+                return result if isinstance(result, Reply) else Reply(self._envelope(result))
+        return Reply({"error": {"code": 501, "message": f"no route: {method} {url.path}"}}, 501)
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                with fake._lock:
+                    fake.connections += 1
+                # Headers and body go out in separate writes; don't let Nagle hold the body
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                super().setup()
+
+            def log_message(self, *args):
+                pass
+
+            def _dispatch(self, method: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                reply = fake._handle(method, self.path, self.headers, body)
+                self.send_response(reply.status)
+                self.send_header("Content-Type", reply.content_type)
+                self.send_header("Content-Length", str(len(reply.body)))
+                for key, value in reply.headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(reply.body)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_PUT(self):
+                self._dispatch("PUT")
+
+            def do_PATCH(self):
+                self._dispatch("PATCH")
+
+        return Handler
+
+    def _serve(self) -> str:
+        """Start serving in a background thread; return the base URL."""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        if self.tls:
+            self.cert_path, key = _self_signed_cert(self.workdir, type(self).__name__)
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(self.cert_path, key)
+            self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        scheme = "https" if self.tls else "http"
+        self.url = f"{scheme}://127.0.0.1:{self._server.server_address[1]}"
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+class FakeProxmox(_FakeHTTPService):
+    """HTTPS server on 127.0.0.1 standing in for a Proxmox VE cluster.
+
+    Holds `nodes` × `vms_per_node` QEMU guests in memory. Power and snapshot
+    requests return a UPID for a task that stops after `task_duration`
+    seconds; guests in `fail_vmids` finish with an error.
+    """
+
+    tls = True
+
+    def __init__(
+        self,
+        workdir: Path,
+        nodes: int = 3,
+        vms_per_node: int = 20,
+        latency: float = 0.0,
+        task_duration: float = 0.0,
+        fail_vmids: set[int] = frozenset(),
+    ):
+        super().__init__(workdir, latency)
+        self.task_duration = task_duration
+        self.fail_vmids = fail_vmids
+        self.tasks: dict[str, tuple[float, int]] = {}   # upid → (started, vmid)
+        self.task_polls = 0
+        self.vms: dict[int, dict] = {}
+        self.node_names = [f"pve{i + 1}" for i in range(nodes)]
+        for n, node in enumerate(self.node_names):
+            for i in range(vms_per_node):
+                vmid = 100 + n * vms_per_node + i
+                self.vms[vmid] = {
+                    "vmid": vmid, "name": f"vm-{vmid}", "node": node,
+                    "status": "running" if i % 3 else "stopped",
+                    "cpus": 2, "maxmem": 4 << 30, "mem": 1 << 30, "uptime": 3600,
+                }
+
+    def _routes(self):
+        return [
+            ("GET", r"/api2/json/cluster/resources", self._resources),
+            ("GET", r"/api2/json/nodes", self._nodes),
+            ("GET", r"/api2/json/nodes/([^/]+)/(qemu|lxc)", self._guests),
+            ("GET", r"/api2/json/nodes/([^/]+)/(qemu|lxc)/(\d+)/status/current", self._status),
+            ("POST", r"/api2/json/nodes/([^/]+)/(qemu|lxc)/(\d+)/status/(\w+)", self._power),
+            ("POST", r"/api2/json/nodes/([^/]+)/(qemu|lxc)/(\d+)/snapshot", self._snapshot),
+            ("GET", r"/api2/json/nodes/([^/]+)/tasks/([^/]+)/status", self._task_status),
+        ]
+
+    def _envelope(self, data):
+        return {"data": data}
+
+    def _nodes(self, m, request):
+        return [{"node": n, "status": "online", "maxcpu": 16, "cpu": 0.1} for n in self.node_names]
+
+    def _resources(self, m, request):
+        nodes = [{"id": f"node/{n['node']}", "type": "node", **n} for n in self._nodes(m, request)]
+        guests = [{"id": f"qemu/{vm['vmid']}", "type": "qemu", **vm} for vm in self.vms.values()]
+        return nodes + guests
+
+    def _guests(self, m, request):
+        if m[2] == "lxc":
+            return []
+        return [dict(vm) for vm in self.vms.values() if vm["node"] == m[1]]
+
+    def _status(self, m, request):
+        vm = self.vms[int(m[3])]
+        if vm["node"] != m[1]:   # Proxmox only knows a guest on its own node
+            raise KeyError(f"{m[2]}/{m[3]} on {m[1]}")
+        return dict(vm)
+
+    def _task(self, node: str, kind: str, vmid: int) -> str:
+        upid = f"UPID:{node}:{len(self.tasks):08X}:00005678:{int(time.time()):08X}:{kind}:{vmid}:mcp@pam!mcp:"
+        self.tasks[upid] = (time.monotonic(), vmid)
+        return upid
+
+    def _power(self, m, request):
+        vm = self.vms[int(m[3])]
+        vm["status"] = "stopped" if m[4] in ("stop", "shutdown") else "running"
+        return self._task(m[1], f"qm{m[4]}", int(m[3]))
+
+    def _snapshot(self, m, request):
+        return self._task(m[1], "qmsnapshot", int(m[3]))
+
+    def _task_status(self, m, request):
+        self.task_polls += 1
+        started, vmid = self.tasks[urllib.parse.unquote(m[2])]
+        if time.monotonic() - started < self.task_duration:
+            return {"status": "running", "upid": m[2]}
+        exitstatus = "snapshot failed: storage full" if vmid in self.fail_vmids else "OK"
+        return {"status": "stopped", "exitstatus": exitstatus, "upid": m[2]}
+
+    def start(self) -> dict:
+        """Start serving; return config overrides pointing the proxmox tools here."""
+        url = self._serve()
+        return {
+            "proxmox_host": url.removeprefix("https://"),
+            "proxmox_user": "mcp@pam",
+            "proxmox_token_name": "mcp",
+            "proxmox_token_value": "00000000-0000-0000-0000-000000000000",
+            "proxmox_verify_ssl": False,
+        }
+
+
+class FakeDrive(_FakeHTTPService):
+    """HTTPS server on 127.0.0.1 standing in for the Drive v3 API and OAuth.
+
+    Holds `files` plain-text files in the root folder. start() writes a
+    service-account key whose token_uri points here; `token_requests`
+    counts token grants, so callers can see credentials being reused.
+
+    add_folder, update_file and delete_file log to a change feed served by
+    changes.getStartPageToken and changes.list. Media downloads honour Range; uploads accept multipart and the resumable
+    protocol. With `fail_every` set, every Nth media GET or upload PUT
+    answers 503 so callers' resume paths get exercised.
+
+    googleapiclient always sends media uploads over https, so this serves
+    TLS; start() points REQUESTS_CA_BUNDLE at the self-signed certificate
+    (httplib2 callers pass cert_path as ca_certs).
+    """
+
+    FOLDER = "application/vnd.google-apps.folder"
+    tls = True
+
+    def __init__(self, workdir: Path, files: int = 50, latency: float = 0.0,
+                 token_ttl: int = 3600, fail_every: int = 0):
+        super().__init__(workdir, latency)
+        self.token_ttl = token_ttl
+        self.fail_every = fail_every
+        self.media_requests = 0
+        self.uploads: dict[str, tuple[dict, bytearray]] = {}   # upload_id → (meta, received)
+        self.token_requests = 0
+        self.batch_requests = 0
+        self.batched_calls = 0
+        self.export_requests = 0
+        self.files: dict[str, dict] = {}
+        self.content: dict[str, bytes] = {}
+        self.next_id = 0
+        self.changes: list[tuple[str, bool]] = []   # (file_id, removed); the index is the page token
+        self.list_requests = 0
+        for i in range(files):
+            self.add_file(f"file-{i:04d}.txt", f"contents of file {i}\n".encode() * 8)
+
+    def add_file(self, name: str, content: bytes = b"", parent: str = "root",
+                 mime_type: str = "text/plain") -> str:
+        file_id = f"f{self.next_id:06d}"
+        self.next_id += 1
+        self.files[file_id] = {
+            "id": file_id,
+            "name": name,
+            "mimeType": mime_type,
+            "parents": [parent],
+            "modifiedTime": "2026-01-01T00:00:00.000Z",
+            "version": "1",
+            "size": str(len(content)),
+            "md5Checksum": hashlib.md5(content).hexdigest(),
+        }
+        if mime_type.startswith("application/vnd.google-apps"):
+            # Docs Editors files have no stored bytes, so no size or checksum
+            del self.files[file_id]["size"], self.files[file_id]["md5Checksum"]
+        self.content[file_id] = content
+        self.changes.append((file_id, False))
+        return file_id
+
+    def add_folder(self, name: str, parent: str = "root") -> str:
+        return self.add_file(name, parent=parent, mime_type=self.FOLDER)
+
+    def update_file(self, file_id: str, **fields) -> None:
+        """Change metadata (name, parents, trashed, …) and log it to the change feed."""
+        with self._lock:
+            meta = self.files[file_id]
+            meta.update(fields, modifiedTime="2026-02-01T00:00:00.000Z",
+                        version=str(int(meta["version"]) + 1))
+            self.changes.append((file_id, False))
+
+    def set_content(self, file_id: str, content: bytes) -> None:
+        """Replace a file's bytes, as an edit would, and log it to the change feed."""
+        with self._lock:
+            self.content[file_id] = content
+            if "md5Checksum" in self.files[file_id]:
+                self.files[file_id].update(size=str(len(content)),
+                                           md5Checksum=hashlib.md5(content).hexdigest())
+        self.update_file(file_id)
+
+    def delete_file(self, file_id: str) -> None:
+        with self._lock:
+            del self.files[file_id]
+            self.changes.append((file_id, True))
+
+    def _routes(self):
+        return [
+            ("POST", r"/token", self._token),
+            ("POST", r"/batch/drive/v3", self._batch),
+            ("GET", r"/drive/v3/files", self._list),
+            ("GET", r"/drive/v3/changes/startPageToken", self._start_page_token),
+            ("GET", r"/drive/v3/changes", self._changes),
+            ("GET", r"/drive/v3/files/([^/]+)", self._get),
+            ("GET", r"/drive/v3/files/([^/]+)/export", self._export),
+            ("POST", r"/upload/drive/v3/files", self._upload),
+            ("PUT", r"/upload/drive/v3/files", self._upload_chunk),
+        ]
+
+    def _token(self, m, request):
+        self.token_requests += 1
+        return {"access_token": f"token-{self.token_requests}", "expires_in": self.token_ttl,
+                "token_type": "Bearer"}
+
+    @staticmethod
+    def _split_fields(fields: str) -> list[str]:
+        parts, depth, current = [], 0, ""
+        for ch in fields:
+            if ch == "," and depth == 0:
+                parts.append(current.strip())
+                current = ""
+                continue
+            depth += (ch == "(") - (ch == ")")
+            current += ch
+        return [p for p in parts + [current.strip()] if p]
+
+    def _mask(self, obj: dict, fields: str | None) -> dict:
+        """Apply a Drive partial-response mask like "nextPageToken,files(id,name)"."""
+        if not fields:
+            return obj
+        out = {}
+        for field in self._split_fields(fields):
+            name, _, sub = field.partition("(")
+            if name not in obj:
+                continue
+            value = obj[name]
+            if sub:
+                sub = sub[:-1]
+                value = [self._mask(v, sub) for v in value] if isinstance(value, list) else self._mask(value, sub)
+            out[name] = value
+        return out
+
+    def _in_folder(self, q: str) -> list[dict]:
+        # Understands "'<id>' in parents" (or-ed together) and trashed = false;
+        # other clauses are ignored
+        parents = set(re.findall(r"'([^']+)' in parents", q))
+        files = list(self.files.values())
+        if parents:
+            files = [f for f in files if parents & set(f["parents"])]
+        if "trashed = false" in q:
+            files = [f for f in files if not f.get("trashed")]
+        return files
+
+    def _list(self, m, request):
+        self.list_requests += 1
+        files = self._in_folder(request.query.get("q", ""))
+        start = int(request.query.get("pageToken") or 0)
+        size = int(request.query.get("pageSize") or 100)
+        if size > 1000:
+            return Reply({"error": {"code": 400, "message": "Invalid pageSize"}}, 400)
+        page = {"files": files[start:start + size]}
+        if start + size < len(files):
+            page["nextPageToken"] = str(start + size)
+        return self._mask(page, request.query.get("fields"))
+
+    def _flaky(self) -> Reply | None:
+        self.media_requests += 1
+        if self.fail_every and self.media_requests % self.fail_every == 0:
+            return Reply({"error": {"code": 503, "message": "Backend Error"}}, 503)
+        return None
+
+    def _start_page_token(self, m, request):
+        return {"startPageToken": str(len(self.changes))}
+
+    def _changes(self, m, request):
+        start = int(request.query["pageToken"])
+        size = int(request.query.get("pageSize") or 100)
+        changes = []
+        for file_id, removed in self.changes[start:start + size]:
+            change = {"fileId": file_id, "removed": removed or file_id not in self.files}
+            if not change["removed"]:
+                change["file"] = self.files[file_id]
+            changes.append(change)
+        page = {"changes": changes}
+        if start + size < len(self.changes):
+            page["nextPageToken"] = str(start + size)
+        else:
+            page["newStartPageToken"] = str(len(self.changes))
+        return self._mask(page, request.query.get("fields"))
+
+    def _get(self, m, request):
+        if m[1] == "root" and request.query.get("alt") != "media":
+            return self._mask({"id": "root", "name": "My Drive", "mimeType": self.FOLDER},
+                              request.query.get("fields"))
+        meta = self.files[m[1]]
+        if request.query.get("alt") == "media":
+            if failure := self._flaky():
+                return failure
+            content = self.content[m[1]]
+            ranged = re.fullmatch(r"bytes=(\d+)-(\d*)", request.headers.get("Range") or "")
+            if not ranged:
+                return Reply(content, content_type=meta["mimeType"])
+            start = int(ranged[1])
+            end = min(int(ranged[2]) if ranged[2] else len(content) - 1, len(content) - 1)
+            return Reply(content[start:end + 1], 206, meta["mimeType"],
+                         {"Content-Range": f"bytes {start}-{end}/{len(content)}"})
+        return self._mask(dict(meta), request.query.get("fields"))
+
+    def _batch(self, m, request):
+        # multipart/mixed of application/http parts → multipart/mixed of responses
+        self.batch_requests += 1
+        message = email.message_from_bytes(
+            f"Content-Type: {request.headers['Content-Type']}\r\n\r\n".encode() + request.body
+        )
+        parts = message.get_payload()
+        if len(parts) > 100:
+            return Reply({"error": {"code": 400, "message": "Too many requests in batch"}}, 400)
+        boundary = "batch_fake_boundary"
+        out = []
+        for part in parts:
+            self.batched_calls += 1
+            request_line = part.get_payload().splitlines()[0]
+            method, path, _ = request_line.split(" ", 2)
+            reply = self._route(method, path, {}, b"")
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                f"HTTP/1.1 {reply.status} X\r\nContent-Type: {reply.content_type}\r\n\r\n"
+                f"{reply.body.decode()}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        return Reply("".join(out), content_type=f"multipart/mixed; boundary={boundary}")
+
+    def _export(self, m, request):
+        meta = self.files[m[1]]
+        if not meta["mimeType"].startswith("application/vnd.google-apps"):
+            return Reply({"error": {"code": 403, "message": "Export only supports Docs Editors files."}}, 403)
+        self.export_requests += 1
+        return Reply(self.content[m[1]], content_type=request.query.get("mimeType", "text/plain"))
+
+    def _upload(self, m, request):
+        if request.query.get("uploadType") == "resumable":
+            upload_id = f"u{len(self.uploads):06d}"
+            self.uploads[upload_id] = (json.loads(request.body or b"{}"), bytearray())
+            location = f"{self.url}/upload/drive/v3/files?uploadType=resumable&upload_id={upload_id}"
+            return Reply(b"", content_type="text/plain", headers={"Location": location})
+        # uploadType=multipart: a JSON metadata part followed by the media part
+        message = email.message_from_bytes(
+            f"Content-Type: {request.headers['Content-Type']}\r\n\r\n".encode() + request.body
+        )
+        meta_part, media_part = message.get_payload()
+        meta = json.loads(meta_part.get_payload(decode=True))
+        media = media_part.get_payload(decode=True)
+        return {"id": self.add_file(meta["name"], media, (meta.get("parents") or ["root"])[0])}
+
+    def _upload_chunk(self, m, request):
+        meta, received = self.uploads[request.query["upload_id"]]
+        span = re.fullmatch(r"bytes (\*|(\d+)-(\d+))/(\d+|\*)", request.headers.get("Content-Range", ""))
+        if span and span[1] != "*":
+            if failure := self._flaky():
+                return failure
+            if int(span[2]) != len(received):
+                return Reply({"error": {"code": 400, "message": "Unexpected offset"}}, 400)
+            received += request.body
+        if span and span[4] != "*" and len(received) == int(span[4]):
+            file_id = self.add_file(meta["name"], bytes(received), (meta.get("parents") or ["root"])[0])
+            return self._mask(dict(self.files[file_id]), request.query.get("fields"))
+        headers = {"Range": f"bytes=0-{len(received) - 1}"} if received else {}
+        return Reply(b"", 308, "text/plain", headers)
+
+    def start(self) -> dict:
+        """Start serving; return config overrides pointing the gdrive tools here."""
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        url = self._serve()
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        pem = key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        key_path = self.workdir / "gdrive-service-account.json"
+        key_path.write_text(json.dumps({
+            "type": "service_account",
+            "project_id": "mcp-bench",
+            "private_key_id": "0" * 40,
+            "private_key": pem,
+            "client_email": "mcp@mcp-bench.iam.gserviceaccount.com",
+            "client_id": "1",
+            "token_uri": f"{url}/token",
+        }))
+        os.environ["REQUESTS_CA_BUNDLE"] = str(self.cert_path)
+        return {
+            "google_service_account_json": str(key_path),
+            "gdrive_api_endpoint": f"{url}/drive/v3/",
+        }
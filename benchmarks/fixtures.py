@@ -0,0 +1,87 @@
+"""
+Shared fixtures for the benchmark scripts.
+
+Puts src/ on sys.path (the server runs from src/) and generates test data.
+"""
+
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+
+def make_pdf(path: Path, pages: int, words_per_page: int = 200) -> Path:
+    """Write a text-only PDF with `pages` pages and return its path."""
+    import pymupdf
+
+    doc = pymupdf.open()
+    filler = "lorem ipsum dolor sit amet " * (words_per_page // 5)
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(page.rect + (72, 72, -72, -72), f"Page {i + 1}\n{filler}")
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def make_table_pdf(path: Path, pages: int, table_every: int = 5, seed: int = 0) -> tuple[Path, set[int]]:
+    """Write a report-like PDF where every `table_every`-th page holds a ruled table.
+
+    Other pages are prose, some with a ruled box or underline (drawings that
+    are not tables). Returns the path and the 1-indexed pages with tables.
+    """
+    import random
+
+    import pymupdf
+
+    rng = random.Random(seed)
+    doc = pymupdf.open()
+    table_pages = set()
+    filler = "quarterly figures were reviewed by the committee " * 8
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_textbox(pymupdf.Rect(72, 72, 540, 200), f"Section {i + 1}\n{filler}")
+        if (i + 1) % table_every == 0:
+            table_pages.add(i + 1)
+            rows, cols = rng.randint(3, 12), rng.randint(2, 6)
+            x0, y0, w, h = 72, 240, 468 / cols, 18
+            shape = page.new_shape()
+            for r in range(rows + 1):
+                shape.draw_line((x0, y0 + r * h), (x0 + cols * w, y0 + r * h))
+            for c in range(cols + 1):
+                shape.draw_line((x0 + c * w, y0), (x0 + c * w, y0 + rows * h))
+            shape.finish(color=(0, 0, 0), width=0.5)
+            shape.commit()
+            for r in range(rows):
+                for c in range(cols):
+                    text = f"H{c}" if r == 0 else f"{rng.randint(0, 99999)}"
+                    page.insert_text((x0 + c * w + 3, y0 + r * h + 13), text, fontsize=9)
+        elif i % 3 == 1:
+            # A single underline: a drawing, but not a table
+            page.draw_line((72, 220), (300, 220), color=(0, 0, 0), width=0.5)
+    doc.save(path)
+    doc.close()
+    return path, table_pages
+
+
+def make_form_pdf(path: Path, pages: int = 2, fields_per_page: int = 6) -> tuple[Path, list[str]]:
+    """Write an AcroForm template with text fields on every page; return (path, field names)."""
+    import pymupdf
+
+    doc = pymupdf.open()
+    names = []
+    for p in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 60), f"Engagement letter — page {p + 1}")
+        for f in range(fields_per_page):
+            widget = pymupdf.Widget()
+            widget.field_type = pymupdf.PDF_WIDGET_TYPE_TEXT
+            widget.field_name = f"p{p + 1}_field{f + 1}"
+            widget.rect = pymupdf.Rect(72, 90 + f * 30, 372, 110 + f * 30)
+            page.add_widget(widget)
+            names.append(widget.field_name)
+    doc.save(path)
+    doc.close()
+    return path, names
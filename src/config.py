@@ -16,9 +16,28 @@ except ImportError:
 
 
 class Config(TypedDict, total=False):
+    # PDF
+    pdf_extract_workers: int
+    pdf_cache_dir: str
+    pdf_cache_max_mb: int
+    pdf_cache_hash: bool
+    pdf_index_db: str
+    pdf_index_roots: list[str]
+
     # Google Drive
     google_service_account_json: str
     google_drive_root_folder: str
+    gdrive_api_endpoint: str
+    gdrive_pool_size: int
+    gdrive_timeout: int
+    gdrive_chunk_mb: int
+    gdrive_upload_workers: int
+    gdrive_cache_dir: str
+    gdrive_cache_max_mb: int
+    gdrive_mirror: bool
+    gdrive_mirror_db: str
+    gdrive_mirror_interval: int
+    gdrive_mirror_max_age: float
 
     # Proxmox
     proxmox_host: str
@@ -26,24 +45,91 @@ class Config(TypedDict, total=False):
     proxmox_token_name: str
     proxmox_token_value: str
     proxmox_verify_ssl: bool
+    proxmox_timeout: int
+    proxmox_pool_size: int
+    proxmox_inventory_interval: int
+    proxmox_inventory_max_age: float
+    proxmox_bulk_concurrency: int
+    proxmox_task_timeout: int
 
     # Kali (SSH target)
     kali_host: str
+    kali_hosts: list[str]
+    kali_host_concurrency: int
+    kali_batch_max_targets: int
+    kali_ssh_port: int
     kali_user: str
     kali_ssh_key_path: str
     kali_allowed_tools: list[str]
+    kali_known_hosts: str
+    kali_ssh_skip_host_check: bool
+    kali_ssh_max_connections: int
+    kali_ssh_max_channels: int
+    kali_ssh_keepalive: int
+    kali_job_dir: str
+    kali_job_buffer_kb: int
+    kali_job_retention: int
+    kali_job_max_runtime: float
+    kali_results_db: str
 
     # Server
     log_level: str
+    log_file: str
+    log_format: str
+    log_max_mb: int
+    log_backups: int
+    log_arg_max_chars: int
+    log_args_max_chars: int
+    log_redact_keys: list[str]
+    transport: str
+    http_host: str
+    http_port: int
+    http_max_sessions: int
+    http_session_idle_timeout: float
+    executor_workers: dict[str, int]
+    metrics_textfile: str
+    metrics_interval: float
+    result_page_chars: int
+    result_ttl: float
+    result_store_mb: int
 
 
 def load_config() -> Config:
     cfg: Config = {
+        # PDF — 0 means one extraction process per CPU
+        "pdf_extract_workers": int(os.getenv("PDF_EXTRACT_WORKERS", "0")),
+        "pdf_cache_dir": os.getenv(
+            "PDF_CACHE_DIR", str(Path(__file__).parent.parent / "cache" / "pdf")
+        ),
+        "pdf_cache_max_mb": int(os.getenv("PDF_CACHE_MAX_MB", "512")),
+        "pdf_cache_hash": os.getenv("PDF_CACHE_HASH", "false").lower() == "true",
+        "pdf_index_db": os.getenv(
+            "PDF_INDEX_DB", str(Path(__file__).parent.parent / "data" / "pdf-index.sqlite3")
+        ),
+        "pdf_index_roots": [
+            r.strip() for r in os.getenv("PDF_INDEX_ROOTS", "").split(",") if r.strip()
+        ],
+
         # Google Drive
         "google_service_account_json": os.getenv(
             "GOOGLE_SERVICE_ACCOUNT_JSON", ""
         ),
         "google_drive_root_folder": os.getenv("GOOGLE_DRIVE_ROOT_FOLDER", ""),
+        "gdrive_api_endpoint": os.getenv("GDRIVE_API_ENDPOINT", ""),
+        "gdrive_pool_size": int(os.getenv("GDRIVE_POOL_SIZE", "16")),
+        "gdrive_timeout": int(os.getenv("GDRIVE_TIMEOUT", "60")),
+        "gdrive_chunk_mb": int(os.getenv("GDRIVE_CHUNK_MB", "8")),
+        "gdrive_upload_workers": int(os.getenv("GDRIVE_UPLOAD_WORKERS", "4")),
+        "gdrive_cache_dir": os.getenv(
+            "GDRIVE_CACHE_DIR", str(Path(__file__).parent.parent / "cache" / "gdrive")
+        ),
+        "gdrive_cache_max_mb": int(os.getenv("GDRIVE_CACHE_MAX_MB", "256")),
+        "gdrive_mirror": os.getenv("GDRIVE_MIRROR", "false").lower() == "true",
+        "gdrive_mirror_db": os.getenv(
+            "GDRIVE_MIRROR_DB", str(Path(__file__).parent.parent / "data" / "gdrive-mirror.sqlite3")
+        ),
+        "gdrive_mirror_interval": int(os.getenv("GDRIVE_MIRROR_INTERVAL", "60")),
+        "gdrive_mirror_max_age": float(os.getenv("GDRIVE_MIRROR_MAX_AGE", "300")),
 
         # Proxmox
         "proxmox_host": os.getenv("PROXMOX_HOST", ""),
@@ -51,16 +137,73 @@ def load_config() -> Config:
         "proxmox_token_name": os.getenv("PROXMOX_TOKEN_NAME", ""),
         "proxmox_token_value": os.getenv("PROXMOX_TOKEN_VALUE", ""),
         "proxmox_verify_ssl": os.getenv("PROXMOX_VERIFY_SSL", "true").lower() == "true",
+        "proxmox_timeout": int(os.getenv("PROXMOX_TIMEOUT", "10")),
+        "proxmox_pool_size": int(os.getenv("PROXMOX_POOL_SIZE", "16")),
+        "proxmox_inventory_interval": int(os.getenv("PROXMOX_INVENTORY_INTERVAL", "30")),
+        "proxmox_inventory_max_age": float(os.getenv("PROXMOX_INVENTORY_MAX_AGE", "60")),
+        "proxmox_bulk_concurrency": int(os.getenv("PROXMOX_BULK_CONCURRENCY", "8")),
+        "proxmox_task_timeout": int(os.getenv("PROXMOX_TASK_TIMEOUT", "900")),
 
         # Kali
-        "kali_host": os.getenv("KALI_HOST", ""),
+        # KALI_HOST may list several worker hosts; kali_host is the primary
+        "kali_host": os.getenv("KALI_HOST", "").split(",")[0].strip(),
+        "kali_hosts": [h.strip() for h in os.getenv("KALI_HOST", "").split(",") if h.strip()],
+        "kali_host_concurrency": int(os.getenv("KALI_HOST_CONCURRENCY", "4")),
+        "kali_batch_max_targets": int(os.getenv("KALI_BATCH_MAX_TARGETS", "1024")),
+        "kali_ssh_port": int(os.getenv("KALI_SSH_PORT", "22")),
         "kali_user": os.getenv("KALI_USER", "kali"),
         "kali_ssh_key_path": os.getenv("KALI_SSH_KEY_PATH", "~/.ssh/kali_id_ed25519"),
         "kali_allowed_tools": os.getenv(
             "KALI_ALLOWED_TOOLS", "nmap,nikto,gobuster,whatweb,sslscan"
         ).split(","),
+        "kali_known_hosts": os.getenv("KALI_KNOWN_HOSTS") or "~/.ssh/known_hosts",
+        "kali_ssh_skip_host_check": os.getenv("KALI_SSH_SKIP_HOST_CHECK", "false").lower() == "true",
+        "kali_ssh_max_connections": int(os.getenv("KALI_SSH_MAX_CONNECTIONS", "2")),
+        "kali_ssh_max_channels": int(os.getenv("KALI_SSH_MAX_CHANNELS", "8")),
+        "kali_ssh_keepalive": int(os.getenv("KALI_SSH_KEEPALIVE", "30")),
+        "kali_job_dir": os.getenv(
+            "KALI_JOB_DIR", str(Path(__file__).parent.parent / "cache" / "kali-jobs")
+        ),
+        "kali_job_buffer_kb": int(os.getenv("KALI_JOB_BUFFER_KB", "256")),
+        "kali_job_retention": int(os.getenv("KALI_JOB_RETENTION", "50")),
+        "kali_job_max_runtime": float(os.getenv("KALI_JOB_MAX_RUNTIME", "14400")),
+        "kali_results_db": os.getenv(
+            "KALI_RESULTS_DB", str(Path(__file__).parent.parent / "data" / "scan-results.sqlite3")
+        ),
 
         # Server
         "log_level": os.getenv("LOG_LEVEL", "INFO"),
+        "log_file": os.getenv(
+            "LOG_FILE", str(Path(__file__).parent.parent / "logs" / "mcp-server.log")
+        ),
+        "log_format": os.getenv("LOG_FORMAT", "text").lower(),
+        "log_max_mb": int(os.getenv("LOG_MAX_MB", "10")),
+        "log_backups": int(os.getenv("LOG_BACKUPS", "5")),
+        "log_arg_max_chars": int(os.getenv("LOG_ARG_MAX_CHARS", "200")),
+        "log_args_max_chars": int(os.getenv("LOG_ARGS_MAX_CHARS", "1000")),
+        "log_redact_keys": [
+            k.strip() for k in os.getenv("LOG_REDACT_KEYS", "").split(",") if k.strip()
+        ],
+        "transport": os.getenv("MCP_TRANSPORT", "stdio").lower(),
+        "http_host": os.getenv("MCP_HTTP_HOST", "127.0.0.1"),
+        "http_port": int(os.getenv("MCP_HTTP_PORT", "8765")),
+        "http_max_sessions": int(os.getenv("MCP_HTTP_MAX_SESSIONS", "16")),
+        "http_session_idle_timeout": float(os.getenv("MCP_HTTP_SESSION_IDLE_TIMEOUT", "1800")),
+        "executor_workers": _parse_workers(os.getenv("EXECUTOR_WORKERS", "")),
+        "metrics_textfile": os.getenv("METRICS_TEXTFILE", ""),
+        "metrics_interval": float(os.getenv("METRICS_INTERVAL", "15")),
+        "result_page_chars": int(os.getenv("RESULT_PAGE_CHARS", "50000")),
+        "result_ttl": float(os.getenv("RESULT_TTL", "900")),
+        "result_store_mb": int(os.getenv("RESULT_STORE_MB", "256")),
     }
     return cfg
+
+
+def _parse_workers(raw: str) -> dict[str, int]:
+    """Parse "pdf=4,gdrive=8" into {"pdf": 4, "gdrive": 8}."""
+    workers = {}
+    for item in raw.split(","):
+        if "=" in item:
+            integration, size = item.split("=", 1)
+            workers[integration.strip()] = int(size)
+    return workers
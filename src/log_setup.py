@@ -0,0 +1,166 @@
+"""
+Logging setup for the server.
+
+Call sites only enqueue records. The handlers that write — stderr and a
+size-rotated log file — run on a QueueListener thread, so a slow disk never
+stalls the event loop. The file is plain text or, with LOG_FORMAT=json, one
+JSON object per line carrying any `extra=` fields (tool, duration_ms, ...).
+
+Log calls use %-style arguments so nothing is formatted for disabled
+levels. Tool arguments go through ArgsSummary, which renders lazily, caps
+each value at LOG_ARG_MAX_CHARS and the whole at LOG_ARGS_MAX_CHARS, and
+masks values whose key looks like a secret.
+"""
+
+import copy
+import itertools
+import json
+import logging
+import queue
+import re
+import reprlib
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+from config import Config
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+
+# Key substrings (case-insensitive) whose values are never logged
+REDACT_KEYS = (
+    "password", "passwd", "secret", "token", "api_key", "apikey",
+    "authorization", "credential", "private_key",
+)
+
+# Attributes every LogRecord has; anything else on a record came from extra=
+_RECORD_ATTRS = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message", "asctime", "taskName",
+}
+
+_LISTENER: QueueListener | None = None
+
+
+# ── Arguments ─────────────────────────────────────────────────────────────────
+class _ArgsRepr(reprlib.Repr):
+    """reprlib with bounded output and secrets masked by key."""
+
+    def __init__(self, max_chars: int, redact: tuple[str, ...]):
+        super().__init__()
+        self.maxstring = self.maxother = self.maxlong = max_chars
+        self.maxdict = 20
+        self.maxlist = self.maxtuple = self.maxset = 10
+        self.maxlevel = 3
+        self.secret = re.compile("|".join(map(re.escape, redact)), re.IGNORECASE)
+
+    def repr_dict(self, x: dict, level: int) -> str:
+        if not x:
+            return "{}"
+        if level <= 0:
+            return "{...}"
+        items = []
+        for key in itertools.islice(x, self.maxdict):
+            if isinstance(key, str) and self.secret.search(key):
+                value = "'***'"
+            else:
+                value = self.repr1(x[key], level - 1)
+            items.append(f"{self.repr1(key, level - 1)}: {value}")
+        if len(x) > self.maxdict:
+            items.append("...")
+        return "{" + ", ".join(items) + "}"
+
+
+class ArgsSummary:
+    """Tool arguments as a log argument: rendered only if the record is emitted."""
+
+    _repr = _ArgsRepr(200, REDACT_KEYS)
+    max_chars = 1000
+
+    def __init__(self, args: dict):
+        self.args = args
+
+    def __str__(self) -> str:
+        text = self._repr.repr(self.args)
+        if len(text) > self.max_chars:
+            text = f"{text[:self.max_chars]}... (+{len(text) - self.max_chars} chars)"
+        return text
+
+    @classmethod
+    def configure(cls, config: Config) -> None:
+        cls._repr = _ArgsRepr(
+            config.get("log_arg_max_chars", 200),
+            REDACT_KEYS + tuple(k.lower() for k in config.get("log_redact_keys", [])),
+        )
+        cls.max_chars = config.get("log_args_max_chars", 1000)
+
+
+# ── Formatting ────────────────────────────────────────────────────────────────
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+                  + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now, since they may change once the call returns,
+        # but leave the traceback and final formatting to the listener thread
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        return record
+
+
+# ── Setup ─────────────────────────────────────────────────────────────────────
+def setup_logging(config: Config, stream=None) -> None:
+    """Route every logger through a queue to stderr (or `stream`) and the log file."""
+    global _LISTENER
+    stop_logging()
+    ArgsSummary.configure(config)
+
+    console = logging.StreamHandler(stream or sys.stderr)
+    console.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handlers: list[logging.Handler] = [console]
+    if config.get("log_file"):
+        path = Path(config["log_file"])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file = RotatingFileHandler(
+            path,
+            maxBytes=config.get("log_max_mb", 10) * 1024 * 1024,
+            backupCount=config.get("log_backups", 5),
+            encoding="utf-8",
+        )
+        json_lines = config.get("log_format", "text") == "json"
+        file.setFormatter(JSONFormatter() if json_lines else logging.Formatter(TEXT_FORMAT))
+        handlers.append(file)
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(_QueueHandler(records))
+    root.setLevel(config.get("log_level", "INFO").upper())
+    _LISTENER = QueueListener(records, *handlers, respect_handler_level=True)
+    _LISTENER.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and close the handlers."""
+    global _LISTENER
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        for handler in _LISTENER.handlers:
+            handler.close()
+    _LISTENER = None
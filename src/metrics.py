@@ -0,0 +1,237 @@
+"""
+In-process metrics: per-tool and per-backend call counts, errors and latency.
+
+dispatch_tool brackets every call with tool_started/tool_finished, which
+keep a call and error count, an in-flight gauge and a latency histogram per
+tool.
+Integrations time their own backend work with timed("<integration>.<what>"),
+e.g. "kali.ssh_connect", "proxmox.http", "gdrive.api". Either can be read
+with snapshot() (the server_stats tool) or rendered in Prometheus text format
+with prometheus_text(). With METRICS_TEXTFILE set, the server rewrites that
+file every METRICS_INTERVAL seconds for node_exporter's textfile collector.
+
+Histograms use fixed buckets on the R10 series (ten per decade, about 26%
+apart, from 100 µs to 100 s), so recording a value is a bisect and three
+additions under a lock, and p50/p95/p99 are interpolated within one bucket.
+The exported histogram keeps only the 1-2.5-5 boundaries of each decade.
+"""
+
+import asyncio
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from config import Config
+
+log = logging.getLogger("mcp-server.metrics")
+
+_R10 = (1.0, 1.25, 1.6, 2.0, 2.5, 3.15, 4.0, 5.0, 6.3, 8.0)
+BUCKETS: tuple[float, ...] = tuple(
+    round(step * 10.0 ** exp, 6) for exp in range(-4, 2) for step in _R10
+) + (100.0,)
+# Boundaries written to the textfile, a subset of BUCKETS (+Inf is implicit)
+EXPORT_BUCKETS: tuple[float, ...] = tuple(
+    round(step * 10.0 ** exp, 6) for exp in range(-4, 2) for step in (1.0, 2.5, 5.0)
+) + (100.0,)
+
+STARTED = time.time()
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)   # last slot: above the top bucket
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate the q-quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def cumulative(self, bounds: tuple[float, ...]) -> list[int]:
+        out, total, i = [], 0, 0
+        for bound in bounds:
+            while i < len(BUCKETS) and BUCKETS[i] <= bound:
+                total += self.counts[i]
+                i += 1
+            out.append(total)
+        return out
+
+
+class _Series:
+    __slots__ = ("calls", "errors", "in_flight", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latency = Histogram()
+
+    def summary(self) -> dict:
+        def ms(seconds: float | None) -> float | None:
+            return None if seconds is None else round(seconds * 1000, 2)
+
+        h = self.latency
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "mean_ms": ms(h.sum / h.count) if h.count else None,
+            "p50_ms": ms(h.quantile(0.50)),
+            "p95_ms": ms(h.quantile(0.95)),
+            "p99_ms": ms(h.quantile(0.99)),
+            "max_ms": ms(h.max) if h.count else None,
+        }
+
+
+_TOOLS: dict[str, _Series] = {}
+_BACKENDS: dict[str, _Series] = {}
+_LOCK = threading.Lock()
+
+
+def _series(table: dict[str, _Series], name: str) -> _Series:
+    series = table.get(name)
+    if series is None:
+        series = table.setdefault(name, _Series())
+    return series
+
+
+# ── Recording ─────────────────────────────────────────────────────────────────
+def tool_started(name: str) -> float:
+    with _LOCK:
+        _series(_TOOLS, name).in_flight += 1
+    return time.perf_counter()
+
+
+def tool_finished(name: str, started: float, error: bool) -> None:
+    elapsed = time.perf_counter() - started
+    with _LOCK:
+        series = _TOOLS[name]
+        series.in_flight -= 1
+        series.calls += 1
+        series.errors += error
+        series.latency.observe(elapsed)
+
+
+def observe(backend: str, seconds: float, error: bool = False) -> None:
+    """Record one backend operation that took `seconds`."""
+    with _LOCK:
+        series = _series(_BACKENDS, backend)
+        series.calls += 1
+        series.errors += error
+        series.latency.observe(seconds)
+
+
+@contextmanager
+def timed(backend: str):
+    """Time the enclosed block as one `backend` operation; an exception counts as an error."""
+    started = time.perf_counter()
+    error = True
+    try:
+        yield
+        error = False
+    finally:
+        observe(backend, time.perf_counter() - started, error)
+
+
+# ── Reading ───────────────────────────────────────────────────────────────────
+def snapshot() -> dict:
+    with _LOCK:
+        return {
+            "uptime_s": round(time.time() - STARTED, 1),
+            "tools": {name: s.summary() for name, s in sorted(_TOOLS.items())},
+            "backends": {name: s.summary() for name, s in sorted(_BACKENDS.items())},
+        }
+
+
+def _histogram_lines(metric: str, label: str, value: str, h: Histogram) -> list[str]:
+    lines = [
+        f'{metric}_bucket{{{label}="{value}",le="{bound:g}"}} {n}'
+        for bound, n in zip(EXPORT_BUCKETS, h.cumulative(EXPORT_BUCKETS))
+    ]
+    lines.append(f'{metric}_bucket{{{label}="{value}",le="+Inf"}} {h.count}')
+    lines.append(f'{metric}_sum{{{label}="{value}"}} {h.sum:.6f}')
+    lines.append(f'{metric}_count{{{label}="{value}"}} {h.count}')
+    return lines
+
+
+def prometheus_text() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    out = [
+        "# HELP mcp_start_time_seconds Unix time the server process started.",
+        "# TYPE mcp_start_time_seconds gauge",
+        f"mcp_start_time_seconds {STARTED:.0f}",
+    ]
+    with _LOCK:
+        for kind, table in (("tool", _TOOLS), ("backend", _BACKENDS)):
+            out += [
+                f"# HELP mcp_{kind}_calls_total Completed {kind} calls.",
+                f"# TYPE mcp_{kind}_calls_total counter",
+                *(f'mcp_{kind}_calls_total{{{kind}="{n}"}} {s.calls}' for n, s in sorted(table.items())),
+                f"# HELP mcp_{kind}_errors_total {kind.capitalize()} calls that raised.",
+                f"# TYPE mcp_{kind}_errors_total counter",
+                *(f'mcp_{kind}_errors_total{{{kind}="{n}"}} {s.errors}' for n, s in sorted(table.items())),
+            ]
+            if kind == "tool":
+                out += [
+                    "# HELP mcp_tool_in_flight Tool calls currently running.",
+                    "# TYPE mcp_tool_in_flight gauge",
+                    *(f'mcp_tool_in_flight{{tool="{n}"}} {s.in_flight}' for n, s in sorted(table.items())),
+                ]
+            out += [
+                f"# HELP mcp_{kind}_duration_seconds {kind.capitalize()} call latency.",
+                f"# TYPE mcp_{kind}_duration_seconds histogram",
+            ]
+            for name, series in sorted(table.items()):
+                out += _histogram_lines(f"mcp_{kind}_duration_seconds", kind, name, series.latency)
+    return "\n".join(out) + "\n"
+
+
+# ── Textfile export ───────────────────────────────────────────────────────────
+def write_textfile(path: str) -> None:
+    # The collector may read at any moment: write a temp file and rename it over
+    target = Path(path)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    tmp.write_text(prometheus_text())
+    os.replace(tmp, target)
+
+
+async def export_loop(config: Config) -> None:
+    """Rewrite METRICS_TEXTFILE every METRICS_INTERVAL seconds until cancelled."""
+    path, interval = config["metrics_textfile"], config.get("metrics_interval", 15)
+    try:
+        while True:
+            try:
+                await asyncio.to_thread(write_textfile, path)
+            except OSError as e:
+                log.warning("Could not write metrics to %s: %s", path, e)
+            await asyncio.sleep(interval)
+    finally:
+        # One last write so the file reflects the final counts
+        try:
+            write_textfile(path)
+        except OSError:
+            pass
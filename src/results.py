@@ -0,0 +1,125 @@
+"""
+Paged delivery of large tool results.
+
+A tool result longer than RESULT_PAGE_CHARS is not sent in one piece.
+server.call_tool returns its first page plus a note with a cursor, and the
+whole text goes into an in-memory store. The fetch_result_page tool
+(tools/ping.py) then returns the remaining pages one by one. Pages break
+after a newline when there is one in the last quarter of the page, so
+line-oriented output (PDF text, tool output) keeps whole lines. Joined in
+order, the pages without their notes are exactly the original text.
+
+Stored results expire RESULT_TTL seconds after they were last read.
+RESULT_STORE_MB caps the total size, and past it the least recently read
+results are dropped first. The store lives on the event loop, so it is not
+locked; only async code may call into it.
+"""
+
+import secrets
+import time
+from collections import OrderedDict
+
+from config import Config
+
+MIN_PAGE_CHARS = 1000
+
+
+class _Stored:
+    __slots__ = ("tool", "text", "offsets", "last_used")
+
+    def __init__(self, tool: str, text: str, offsets: list[int]):
+        self.tool = tool
+        self.text = text
+        self.offsets = offsets      # start of each page; the last page ends at len(text)
+        self.last_used = time.monotonic()
+
+    def page(self, n: int) -> str:
+        end = self.offsets[n + 1] if n + 1 < len(self.offsets) else len(self.text)
+        return self.text[self.offsets[n]:end]
+
+
+# result id → stored result, least recently read first
+_STORE: "OrderedDict[str, _Stored]" = OrderedDict()
+_counts = {"stored": 0, "pages_served": 0, "expired": 0, "evicted": 0}
+_size = 0
+
+
+def _split(text: str, size: int) -> list[int]:
+    offsets, start = [0], 0
+    while len(text) - start > size:
+        end = start + size
+        newline = text.rfind("\n", start + size * 3 // 4, end)
+        if newline != -1:
+            end = newline + 1
+        offsets.append(end)
+        start = end
+    return offsets
+
+
+def _drop(result_id: str, reason: str) -> None:
+    global _size
+    _size -= len(_STORE.pop(result_id).text)
+    _counts[reason] += 1
+
+
+def _expire(config: Config) -> None:
+    cutoff = time.monotonic() - config.get("result_ttl", 900)
+    while _STORE:
+        result_id, stored = next(iter(_STORE.items()))
+        if stored.last_used >= cutoff:
+            break
+        _drop(result_id, "expired")
+
+
+def _note(result_id: str, stored: _Stored, n: int, config: Config) -> str:
+    pages = len(stored.offsets)
+    head = f"[Page {n + 1} of {pages} of a {len(stored.text):,}-character result from {stored.tool}."
+    if n + 1 == pages:
+        return f"{head} This is the last page.]"
+    return (
+        f'{head} Next: fetch_result_page(cursor="{result_id}:{n + 1}"). '
+        f"Kept for {config.get('result_ttl', 900):g} s after each read.]"
+    )
+
+
+# ── Delivery ──────────────────────────────────────────────────────────────────
+def deliver(tool: str, text: str, config: Config) -> list[str]:
+    """The content blocks for one tool result: the text itself, or its first page and a note."""
+    global _size
+    page_chars = config.get("result_page_chars", 50_000)
+    if not page_chars or len(text) <= page_chars or tool == "fetch_result_page":
+        return [text]
+
+    _expire(config)
+    result_id = secrets.token_urlsafe(9)
+    stored = _Stored(tool, text, _split(text, max(page_chars, MIN_PAGE_CHARS)))
+    _STORE[result_id] = stored
+    _size += len(text)
+    _counts["stored"] += 1
+    max_chars = config.get("result_store_mb", 256) * 1024 * 1024
+    while _size > max_chars and len(_STORE) > 1:
+        _drop(next(iter(_STORE)), "evicted")
+    _counts["pages_served"] += 1
+    return [stored.page(0), _note(result_id, stored, 0, config)]
+
+
+def fetch(cursor: str, config: Config) -> str:
+    """One page of a stored result, followed by its note. Raises LookupError if it is gone."""
+    _expire(config)
+    result_id, _, page = cursor.rpartition(":")
+    stored = _STORE.get(result_id)
+    if stored is None:
+        raise LookupError(
+            f"no stored result for cursor '{cursor}' — it expired or was evicted; call the tool again"
+        )
+    if not page.isdigit() or not 0 <= int(page) < len(stored.offsets):
+        raise LookupError(f"cursor '{cursor}' is past the last page ({len(stored.offsets)})")
+    n = int(page)
+    stored.last_used = time.monotonic()
+    _STORE.move_to_end(result_id)
+    _counts["pages_served"] += 1
+    return f"{stored.page(n)}\n\n{_note(result_id, stored, n, config)}"
+
+
+def stats() -> dict:
+    return {**_counts, "entries": len(_STORE), "chars": _size}
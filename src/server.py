@@ -1,32 +1,39 @@
 """
 Base MCP Server
 Entry point for the Model Context Protocol server.
+
+Transports (MCP_TRANSPORT in .env):
+  stdio (default) — one client over stdin/stdout
+  http            — streamable HTTP on MCP_HTTP_HOST:MCP_HTTP_PORT at /mcp;
+                    many concurrent sessions share this process's config,
+                    connection pools and caches
 """
 
 import asyncio
+import contextlib
 import logging
-from mcp.server import Server
+import time
+from mcp.server import NotificationOptions, Server
 from mcp.server.stdio import stdio_server
 from mcp.server.models import InitializationOptions
 from mcp import types
 
-from config import load_config
-from tools import get_all_tools, dispatch_tool
-
-# ── Logging ──────────────────────────────────────────────────────────────────
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("logs/mcp-server.log"),
-    ],
+import metrics
+import results
+from config import Config, load_config
+from log_setup import ArgsSummary, setup_logging, stop_logging
+from tools import (
+    UnknownToolError, get_all_tools, dispatch_tool, set_progress_sender, shutdown_executors,
 )
-log = logging.getLogger("mcp-server")
 
 # ── Server init ───────────────────────────────────────────────────────────────
-server = Server("base-mcp-server")
-config = load_config()
+SERVER_VERSION = "0.1.0"
+server = Server("base-mcp-server", version=SERVER_VERSION)
+# Filled in by main(). Every spawn-context worker (the PDF pool, "cpu"
+# executors) re-imports this file as __mp_main__, and must not load config
+# or start a log listener writing to LOG_FILE of its own
+config: Config = {}
+log = logging.getLogger("mcp-server")
 
 
 # ── Tool registration ─────────────────────────────────────────────────────────
@@ -34,7 +41,7 @@ config = load_config()
 async def list_tools() -> list[types.Tool]:
     """Return all registered tools to the client."""
     tools = get_all_tools()
-    log.info(f"Listing {len(tools)} tools")
+    log.info("Listing %d tools", len(tools))
     return tools
 
 
@@ -43,35 +50,128 @@ async def call_tool(
     name: str, arguments: dict | None
 ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
     """Dispatch a tool call and return the result."""
-    log.info(f"Tool called: {name} | args: {arguments}")
+    log.info("Tool called: %s | args: %s", name, ArgsSummary(arguments or {}), extra={"tool": name})
+    _attach_progress()
+    started = time.perf_counter()
     try:
         result = await dispatch_tool(name, arguments or {}, config)
-        log.info(f"Tool succeeded: {name}")
-        return [types.TextContent(type="text", text=result)]
-    except ValueError as e:
-        log.warning(f"Tool not found: {name}")
+        elapsed = (time.perf_counter() - started) * 1000
+        log.info(
+            "Tool succeeded: %s (%.0f ms)", name, elapsed,
+            extra={"tool": name, "duration_ms": round(elapsed, 1)},
+        )
+        # Past RESULT_PAGE_CHARS only the first page goes out (see results.py)
+        return [types.TextContent(type="text", text=t) for t in results.deliver(name, result, config)]
+    except UnknownToolError:
+        log.warning("Tool not found: %s", name, extra={"tool": name})
         raise
     except Exception as e:
-        log.error(f"Tool error [{name}]: {e}", exc_info=True)
+        elapsed = (time.perf_counter() - started) * 1000
+        log.error(
+            "Tool error [%s]: %s", name, e, exc_info=True,
+            extra={"tool": name, "duration_ms": round(elapsed, 1)},
+        )
         return [types.TextContent(type="text", text=f"Error: {str(e)}")]
 
 
+def _attach_progress() -> None:
+    """Route report_progress() from handlers to this request's progress token."""
+    ctx = server.request_context
+    token = ctx.meta.progressToken if ctx.meta else None
+    if token is None:
+        return
+
+    async def send(progress: float, total: float | None, message: str | None) -> None:
+        await ctx.session.send_progress_notification(
+            token, progress, total, message, related_request_id=ctx.request_id
+        )
+
+    set_progress_sender(send)
+
+
 # ── Run ───────────────────────────────────────────────────────────────────────
-async def main():
+def _init_options() -> InitializationOptions:
+    return InitializationOptions(
+        server_name="base-mcp-server",
+        server_version=SERVER_VERSION,
+        capabilities=server.get_capabilities(
+            notification_options=NotificationOptions(),
+            experimental_capabilities={},
+        ),
+    )
+
+
+async def _serve_stdio():
     log.info("Starting base-mcp-server via stdio transport")
     async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="base-mcp-server",
-                server_version="0.1.0",
-                capabilities=server.get_capabilities(
-                    notification_options=None,
-                    experimental_capabilities={},
-                ),
-            ),
-        )
+        await server.run(read_stream, write_stream, _init_options())
+
+
+class _MCPEndpoint:
+    """ASGI endpoint handing every /mcp request to the session manager."""
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    async def __call__(self, scope, receive, send):
+        await self.manager.handle_request(scope, receive, send)
+
+
+async def _serve_http():
+    # Imported here so the default stdio mode never pays for the web stack
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.routing import Route
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+
+    # Every session runs against the same `server`, so they share `config`
+    # and every integration's module-level pools and caches. Past the limit,
+    # new sessions are refused with 503; existing ones are unaffected.
+    manager = StreamableHTTPSessionManager(
+        app=server,
+        max_sessions=config["http_max_sessions"],
+        session_idle_timeout=config["http_session_idle_timeout"],
+    )
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        async with manager.run():
+            yield
+
+    app = Starlette(routes=[Route("/mcp", endpoint=_MCPEndpoint(manager))], lifespan=lifespan)
+    host, port = config["http_host"], config["http_port"]
+    log.info(
+        "Starting base-mcp-server via streamable HTTP on http://%s:%s/mcp (max %d sessions)",
+        host, port, config["http_max_sessions"],
+    )
+    # log_config=None: uvicorn's loggers propagate to our queue instead of
+    # getting handlers of their own that write from the event loop
+    uv = uvicorn.Server(uvicorn.Config(
+        app, host=host, port=port, log_level=config["log_level"].lower(), lifespan="on",
+        log_config=None,
+    ))
+    await uv.serve()
+
+
+async def main():
+    config.update(load_config())
+    # Records are queued here and written on a listener thread (see log_setup.py)
+    setup_logging(config)
+    exporter = None
+    if config["metrics_textfile"]:
+        exporter = asyncio.create_task(metrics.export_loop(config))
+    try:
+        if config["transport"] == "http":
+            await _serve_http()
+        else:
+            await _serve_stdio()
+    finally:
+        if exporter is not None:
+            exporter.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await exporter
+        shutdown_executors()
+        stop_logging()
 
 
 if __name__ == "__main__":
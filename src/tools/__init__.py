@@ -4,49 +4,252 @@ Tool registry and dispatcher.
 To add a new integration:
   1. Create src/tools/my_integration.py
   2. Implement TOOLS (list[types.Tool]) and handle(name, args, config) -> str
-  3. Import and register it below — nothing else to change.
+  3. Declare EXECUTOR (see below) if handle does blocking work
+  4. Register it in _REGISTRY below
+  5. Regenerate the manifest: cd src && python -m tools
+
+Lazy loading:
+  list_tools is answered from manifest.json, a generated snapshot of every
+  registered module's TOOLS. An integration module — and the heavy libraries
+  it imports (pymupdf, googleapiclient, proxmoxer, asyncssh) — is imported
+  only on the first call to one of its tools. If a module's TOOLS no longer
+  match the manifest, a warning is logged on that first import.
+
+Executors:
+  Each module may declare EXECUTOR to tell dispatch_tool where its handler runs.
+    "async" (default) — handle is a coroutine that never blocks; awaited on the loop
+    "io"              — handle is a plain function doing blocking I/O; thread pool
+    "cpu"             — handle is a plain function doing CPU work; process pool
+  Every "io"/"cpu" integration gets its own pool, so a slow Drive call cannot
+  starve Proxmox calls. Pool size is MAX_WORKERS from the module, overridden
+  per integration by EXECUTOR_WORKERS in .env (e.g. "pdf=4,gdrive=8").
+
+  A module that owns long-lived resources of its own (pools, connections)
+  may define shutdown(); it is called by shutdown_executors on server exit.
+  It may also define startup(config), called on the event loop right after
+  the module is first imported — the place to start background tasks.
+
+Metrics:
+  dispatch_tool records calls, errors, in-flight and latency per tool (see
+  src/metrics.py). Integrations time their backend round trips with
+  metrics.timed("<integration>.<what>"); like progress, this only works
+  from "async" and "io" handlers.
+
+Results:
+  Handlers serialize with to_json, which writes compact JSON (no indentation
+  or padding). A result longer than RESULT_PAGE_CHARS goes out one page at a
+  time: server.call_tool sends the first page plus a cursor, and the rest is
+  read with the fetch_result_page tool (see src/results.py).
+
+Progress:
+  Long-running handlers call report_progress(progress, total, message) to
+  send MCP progress notifications for the current call. It is a no-op when
+  the client did not ask for progress, never blocks, and works from "async"
+  and "io" handlers alike ("cpu" handlers run in another process and can't).
 """
 
+import asyncio
+import contextvars
+import importlib
+import json
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from types import ModuleType
+from typing import Awaitable, Callable
+
+import metrics
 from mcp import types
 from config import Config
 
-# ── Import tool modules ───────────────────────────────────────────────────────
-from tools.ping import TOOLS as PING_TOOLS, handle as ping_handle
-
-# Stubs — uncomment as you build each integration:
-# from tools.pdf        import TOOLS as PDF_TOOLS,    handle as pdf_handle
-# from tools.gdrive     import TOOLS as GDRIVE_TOOLS,  handle as gdrive_handle
-# from tools.proxmox    import TOOLS as PROXMOX_TOOLS, handle as proxmox_handle
-# from tools.kali       import TOOLS as KALI_TOOLS,    handle as kali_handle
+log = logging.getLogger("mcp-server.tools")
 
 # ── Registry ──────────────────────────────────────────────────────────────────
-# Each entry: (list_of_tools, handler_coroutine)
-_REGISTRY = [
-    (PING_TOOLS, ping_handle),
-    # (PDF_TOOLS,    pdf_handle),
-    # (GDRIVE_TOOLS,  gdrive_handle),
-    # (PROXMOX_TOOLS, proxmox_handle),
-    # (KALI_TOOLS,    kali_handle),
-]
-
-# Build a flat name → handler map at import time
-_DISPATCH: dict[str, object] = {}
-for tool_list, handler in _REGISTRY:
-    for tool in tool_list:
-        _DISPATCH[tool.name] = handler
+# Each entry: integration name → module exposing TOOLS, handle and EXECUTOR.
+# Modules are imported on first use — never import them at the top of this file.
+_REGISTRY: dict[str, str] = {
+    "ping": "tools.ping",
+    "pdf": "tools.pdf",
+    "kali": "tools.kali",
+    "proxmox": "tools.proxmox",
+    "gdrive": "tools.gdrive",
+}
+
+MANIFEST_PATH = Path(__file__).parent / "manifest.json"
+
+DEFAULT_MAX_WORKERS = 4
+
+
+# Built from manifest.json on first use: schemas per integration, the
+# types.Tool list and a flat tool name → integration name map
+_MANIFEST: dict[str, list[dict]] = {}
+_TOOLS: list[types.Tool] = []
+_DISPATCH: dict[str, str] = {}
+
+
+def _load_manifest() -> None:
+    manifest = json.loads(MANIFEST_PATH.read_text())
+    missing = set(_REGISTRY) - set(manifest)
+    if missing:
+        raise RuntimeError(
+            f"manifest.json is missing {sorted(missing)} — run: cd src && python -m tools"
+        )
+    for integration in _REGISTRY:
+        _MANIFEST[integration] = manifest[integration]
+        for schema in manifest[integration]:
+            _TOOLS.append(types.Tool.model_validate(schema))
+            _DISPATCH[schema["name"]] = integration
+
+
+# Modules and pools are created on first use and live for the life of the process
+_MODULES: dict[str, ModuleType] = {}
+_EXECUTORS: dict[str, Executor] = {}
 
 
 def get_all_tools() -> list[types.Tool]:
     """Return every registered tool (called by server.list_tools)."""
-    tools = []
-    for tool_list, _ in _REGISTRY:
-        tools.extend(tool_list)
-    return tools
+    if not _MANIFEST:
+        _load_manifest()
+    return _TOOLS
+
+
+def _schemas(module: ModuleType) -> list[dict]:
+    return [tool.model_dump(mode="json", exclude_none=True) for tool in module.TOOLS]
+
+
+def build_manifest() -> dict[str, list[dict]]:
+    """Import every registered module and snapshot its TOOLS (used by python -m tools)."""
+    return {
+        integration: _schemas(importlib.import_module(path))
+        for integration, path in _REGISTRY.items()
+    }
+
+
+async def _get_module(integration: str, config: Config) -> ModuleType:
+    module = _MODULES.get(integration)
+    if module is not None:
+        return module
+
+    # Heavy imports (pymupdf, googleapiclient, …) run off the event loop
+    module = await asyncio.to_thread(importlib.import_module, _REGISTRY[integration])
+    if _schemas(module) != _MANIFEST[integration]:
+        log.warning(
+            "manifest.json is out of date for '%s' — run: cd src && python -m tools", integration
+        )
+    if integration not in _MODULES and hasattr(module, "startup"):
+        module.startup(config)
+    _MODULES[integration] = module
+    return module
+
+
+def _get_executor(integration: str, module: ModuleType, config: Config) -> Executor:
+    executor = _EXECUTORS.get(integration)
+    if executor is not None:
+        return executor
+
+    workers = config.get("executor_workers", {}).get(
+        integration, getattr(module, "MAX_WORKERS", DEFAULT_MAX_WORKERS)
+    )
+    if module.EXECUTOR == "cpu":
+        # spawn, not fork: the parent is a multi-threaded asyncio process
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    else:
+        executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"mcp-{integration}"
+        )
+    _EXECUTORS[integration] = executor
+    return executor
+
+
+# ── Results ───────────────────────────────────────────────────────────────────
+def to_json(value) -> str:
+    """Compact JSON for a tool result: no indentation, no padding, UTF-8 kept as is."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+# ── Progress ──────────────────────────────────────────────────────────────────
+# (progress, total, message) → coroutine that sends one notification
+ProgressSender = Callable[[float, float | None, str | None], Awaitable[None]]
+
+_PROGRESS: contextvars.ContextVar[tuple[asyncio.AbstractEventLoop, ProgressSender] | None] = (
+    contextvars.ContextVar("progress", default=None)
+)
+_PENDING_NOTIFICATIONS: set[asyncio.Task] = set()
+
+
+def set_progress_sender(sender: ProgressSender) -> None:
+    """Attach a progress sender to the current tool call (called by server.call_tool)."""
+    _PROGRESS.set((asyncio.get_running_loop(), sender))
+
+
+def report_progress(
+    progress: float, total: float | None = None, message: str | None = None
+) -> None:
+    """Send a progress notification for the current tool call, if one was requested."""
+    current = _PROGRESS.get()
+    if current is None:
+        return
+    loop, sender = current
+    try:
+        on_loop = asyncio.get_running_loop() is loop
+    except RuntimeError:
+        on_loop = False
+    if on_loop:
+        task = loop.create_task(sender(progress, total, message))
+        _PENDING_NOTIFICATIONS.add(task)
+        task.add_done_callback(_PENDING_NOTIFICATIONS.discard)
+    else:
+        asyncio.run_coroutine_threadsafe(sender(progress, total, message), loop)
+
+
+class UnknownToolError(ValueError):
+    """dispatch_tool was asked for a tool no integration registers."""
 
 
 async def dispatch_tool(name: str, args: dict, config: Config) -> str:
-    """Route a tool call to the correct handler."""
-    handler = _DISPATCH.get(name)
-    if handler is None:
-        raise ValueError(f"Unknown tool: '{name}'")
-    return await handler(name, args, config)
+    """Route a tool call to the correct handler. Raises UnknownToolError for an unknown name."""
+    if not _MANIFEST:
+        _load_manifest()
+    integration = _DISPATCH.get(name)
+    if integration is None:
+        raise UnknownToolError(f"Unknown tool: '{name}'")
+
+    # Per-tool calls, errors, in-flight and latency (server_stats, textfile export)
+    started = metrics.tool_started(name)
+    error = True
+    try:
+        result = await _call_handler(integration, name, args, config)
+        error = False
+        return result
+    finally:
+        metrics.tool_finished(name, started, error)
+
+
+async def _call_handler(integration: str, name: str, args: dict, config: Config) -> str:
+    module = await _get_module(integration, config)
+    kind = getattr(module, "EXECUTOR", "async")
+    if kind == "async":
+        return await module.handle(name, args, config)
+    if kind not in ("io", "cpu"):
+        raise RuntimeError(f"{integration} declares unknown EXECUTOR: {kind!r}")
+
+    executor = _get_executor(integration, module, config)
+    loop = asyncio.get_running_loop()
+    if kind == "io":
+        # Carry the call's context (progress sender) into the worker thread
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(executor, ctx.run, module.handle, name, args, config)
+    return await loop.run_in_executor(executor, module.handle, name, args, config)
+
+
+def shutdown_executors() -> None:
+    """Stop every integration pool (called once on server exit)."""
+    for executor in _EXECUTORS.values():
+        executor.shutdown(wait=False, cancel_futures=True)
+    _EXECUTORS.clear()
+    for module in _MODULES.values():
+        if hasattr(module, "shutdown"):
+            module.shutdown()
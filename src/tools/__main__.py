@@ -0,0 +1,15 @@
+"""
+Regenerate tools/manifest.json from the registered modules' TOOLS.
+
+Run after adding an integration or changing any tool schema:
+    cd src && python -m tools
+"""
+
+import json
+
+from tools import MANIFEST_PATH, build_manifest
+
+manifest = build_manifest()
+MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+count = sum(len(schemas) for schemas in manifest.values())
+print(f"Wrote {count} tools from {len(manifest)} integrations to {MANIFEST_PATH}")
@@ -0,0 +1,173 @@
+"""
+SQLite blob store with LRU eviction (base of tools/pdf_cache.py and
+tools/gdrive_cache.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+A subclass names its table and key columns; every row also carries the
+zlib-compressed value, its size and when it was last read. The store keeps
+a running byte count, and once that passes the cap it evicts least
+recently used rows down to EVICT_TO of it. Subclasses keep their own
+lookups and validation. They compress new rows with _pack before taking
+self._lock, then call _touch and _write under it for the bookkeeping.
+
+Shared holds the one process-wide instance of a store.
+"""
+
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Generic, TypeVar
+
+# Evict down to this fraction of the cap so we don't evict on every write
+EVICT_TO = 0.9
+
+
+class BlobStore:
+    TABLE = ""
+    # "name TYPE" for each key column, then any other columns, in table order
+    KEY_COLUMNS: tuple[str, ...] = ()
+    EXTRA_COLUMNS: tuple[str, ...] = ()
+    # Values compressing to more than this share of the cap are not stored
+    MAX_ENTRY_SHARE = 1.0
+
+    def __init__(self, path: Path, max_bytes: int):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._key = [c.split()[0] for c in self.KEY_COLUMNS]
+        self._columns = self._key + [c.split()[0] for c in self.EXTRA_COLUMNS]
+        self._match_key = " AND ".join(f"{c} = ?" for c in self._key)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        columns = ", ".join(f"{c} NOT NULL" for c in self.KEY_COLUMNS + self.EXTRA_COLUMNS)
+        self._db.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                {columns},
+                value     BLOB    NOT NULL,
+                size      INTEGER NOT NULL,
+                last_used REAL    NOT NULL,
+                PRIMARY KEY ({", ".join(self._key)})
+            );
+            CREATE INDEX IF NOT EXISTS {self.TABLE}_last_used ON {self.TABLE} (last_used);
+        """)
+        (self._bytes,) = self._db.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE}"
+        ).fetchone()
+
+    # ── Bookkeeping (call with self._lock held) ───────────────────────────────
+    @staticmethod
+    def _unpack(blob: bytes) -> bytes:
+        return zlib.decompress(blob)
+
+    def _touch(self, keys: list[tuple]) -> None:
+        """Mark rows as just read, in one transaction."""
+        if not keys:
+            return
+        now = time.time()
+        self._db.execute("BEGIN")
+        self._db.executemany(
+            f"UPDATE {self.TABLE} SET last_used = ? WHERE {self._match_key}",
+            [(now, *key) for key in keys],
+        )
+        self._db.execute("COMMIT")
+
+    def _pack(self, rows: list[tuple]) -> list[tuple]:
+        """Compress rows of (column values..., raw value) for _write; needs no lock."""
+        now = time.time()
+        packed = []
+        for *columns, value in rows:
+            blob = zlib.compress(value, 1)
+            if len(blob) <= self.max_bytes * self.MAX_ENTRY_SHARE:
+                packed.append((*columns, blob, len(blob), now))
+        return packed
+
+    def _write(self, packed: list[tuple], stale: tuple[str, tuple] | None = None) -> None:
+        """Insert or replace `packed` rows in one transaction.
+
+        `stale` is an optional (WHERE clause, params) of other rows to drop first.
+        """
+        n = len(self._key)
+        self._db.execute("BEGIN")
+        if stale is not None:
+            where, params = stale
+            (freed,) = self._db.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE} WHERE {where}", params
+            ).fetchone()
+            self._db.execute(f"DELETE FROM {self.TABLE} WHERE {where}", params)
+            self._bytes -= freed
+        for row in packed:
+            old = self._db.execute(
+                f"SELECT size FROM {self.TABLE} WHERE {self._match_key}", row[:n]
+            ).fetchone()
+            self._bytes -= old[0] if old else 0
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.TABLE} ({', '.join(self._columns)}, value, size, last_used) "
+                f"VALUES ({', '.join('?' * (len(self._columns) + 3))})",
+                row,
+            )
+            self._bytes += row[-2]
+        self._db.execute("COMMIT")
+        if self._bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        target = int(self.max_bytes * EVICT_TO)
+        rows = self._db.execute(
+            f"SELECT rowid, size FROM {self.TABLE} ORDER BY last_used"
+        ).fetchall()
+        doomed = []
+        for rowid, size in rows:
+            if self._bytes <= target:
+                break
+            doomed.append((rowid,))
+            self._bytes -= size
+        self._db.executemany(f"DELETE FROM {self.TABLE} WHERE rowid = ?", doomed)
+
+    # ── Reporting ─────────────────────────────────────────────────────────────
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._db.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "entries": entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "path": str(self.path),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+T = TypeVar("T", bound=BlobStore)
+
+
+class Shared(Generic[T]):
+    """One store per process, opened on first use."""
+
+    def __init__(self):
+        self._store: T | None = None
+        self._lock = threading.Lock()
+
+    def get(self, open_store: Callable[[], T]) -> T:
+        with self._lock:
+            if self._store is None:
+                self._store = open_store()
+            return self._store
+
+    def close(self) -> None:
+        with self._lock:
+            if self._store is not None:
+                self._store.close()
+            self._store = None
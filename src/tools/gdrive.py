@@ -9,59 +9,179 @@ Setup steps:
   3. Create a Service Account → download JSON key
   4. Set GOOGLE_SERVICE_ACCOUNT_JSON=/path/to/key.json in config/.env
   5. Share any Drive folders with the service account email address
+     (as Editor on the folders you upload into)
+
+Scopes:
+  Listing, reading and downloading use drive.readonly (SCOPES). Uploads use
+  the full drive scope (WRITE_SCOPES): drive.file would only let the account
+  see files it created itself, so uploading into a folder someone shared
+  with it would fail with 404. Domain-wide delegation, if used, must grant
+  both scopes to the service account's client ID, or every upload fails with
+  403 insufficientPermissions.
+
+Connections:
+  All calls share one Drive service and pooled HTTP session
+  (tools/gdrive_client.py), rebuilt only when the key file changes.
+
+Listing:
+  gdrive_list_files follows nextPageToken until max_results files are
+  collected and returns next_cursor to continue from. Callers choose the
+  per-file fields to keep responses small. gdrive_get_metadata looks up many
+  file IDs with Drive batch requests, up to BATCH_SIZE per HTTP round trip.
+
+Mirror:
+  With GDRIVE_MIRROR=true, gdrive_list_files is answered from a local SQLite
+  copy of the metadata under GOOGLE_DRIVE_ROOT_FOLDER, kept current through
+  the Changes API (tools/gdrive_mirror.py). Queries the mirror can't answer,
+  and calls with live=true, go to the API. Responses say which via "source".
+
+Content cache:
+  gdrive_read_file keeps what it reads in a local cache keyed by file ID and
+  export format (tools/gdrive_cache.py). Each read revalidates with one
+  small metadata call and downloads again only if the file changed.
+
+Transfers:
+  gdrive_download_file streams to disk in GDRIVE_CHUNK_MB ranges and resumes
+  a partial download; uploads are resumable and chunked, and
+  gdrive_upload_directory uploads many files on GDRIVE_UPLOAD_WORKERS threads
+  (tools/gdrive_transfer.py).
 
 Dependencies:
     pip install google-api-python-client google-auth
 """
 
-import json
+import re
+import time
+from pathlib import Path
 from mcp import types
 from config import Config
 
-# TODO: uncomment when dependencies are installed
-# from googleapiclient.discovery import build
-# from google.oauth2 import service_account
+from googleapiclient.errors import HttpError
 
-SCOPES = [
-    "https://www.googleapis.com/auth/drive.readonly",
-    # Add drive (read/write) scope only when needed:
-    # "https://www.googleapis.com/auth/drive",
-]
+from tools import gdrive_cache, gdrive_client, gdrive_mirror, gdrive_transfer, to_json
+
+# Drive API calls block on HTTP — run handlers in this integration's thread pool
+EXECUTOR = "io"
+MAX_WORKERS = 8
+
+DEFAULT_FIELDS = ["id", "name", "mimeType", "modifiedTime"]
+MAX_PAGE_SIZE = 1000    # Drive's cap on files.list pageSize
+BATCH_SIZE = 100        # Drive's cap on calls per batch request
+MAX_METADATA_IDS = 1000
+
+# Errors worth retrying a batched call for, after a pause
+_RETRY_STATUSES = {403, 429, 500, 502, 503, 504}
+_RETRY_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+
+SCOPES = ["https://www.googleapis.com/auth/drive.readonly"]
+# Uploads only: create files in any folder shared with the account
+WRITE_SCOPES = ["https://www.googleapis.com/auth/drive"]
 
 TOOLS: list[types.Tool] = [
     types.Tool(
         name="gdrive_list_files",
-        description="List files in a Google Drive folder.",
+        description=(
+            "List files in a Google Drive folder. Returns up to max_results files and "
+            "next_cursor; pass next_cursor back as cursor to continue the listing."
+        ),
         inputSchema={
             "type": "object",
             "properties": {
                 "folder_id": {
                     "type": "string",
-                    "description": "Drive folder ID. Omit to use root.",
+                    "description": "Drive folder ID. Omit to use GOOGLE_DRIVE_ROOT_FOLDER or root.",
                 },
                 "query": {
                     "type": "string",
                     "description": "Optional Drive query string, e.g. \"name contains 'report'\"",
                 },
-                "max_results": {"type": "integer", "default": 20},
+                "max_results": {"type": "integer", "default": 100},
+                "cursor": {
+                    "type": "string",
+                    "description": "next_cursor from a previous call with the same folder and query.",
+                },
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": f"File fields to return (default {', '.join(DEFAULT_FIELDS)}).",
+                },
+                "live": {
+                    "type": "boolean",
+                    "default": False,
+                    "description": "Skip the local metadata mirror and ask the Drive API.",
+                },
             },
             "required": [],
         },
     ),
+    types.Tool(
+        name="gdrive_get_metadata",
+        description="Get metadata for many Drive files at once, batched into few HTTP requests.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_ids": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": f"Google Drive file IDs (at most {MAX_METADATA_IDS}).",
+                },
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": (
+                        f"File fields to return (default {', '.join(DEFAULT_FIELDS)}), "
+                        "e.g. size, parents, md5Checksum, owners(emailAddress)."
+                    ),
+                },
+            },
+            "required": ["file_ids"],
+        },
+    ),
     types.Tool(
         name="gdrive_read_file",
         description="Read the text content of a Google Doc or plain text file from Drive.",
         inputSchema={
             "type": "object",
             "properties": {
-                "file_id": {"type": "string", "description": "Google Drive file ID."}
+                "file_id": {"type": "string", "description": "Google Drive file ID."},
+                "mime_type": {
+                    "type": "string",
+                    "default": "text/plain",
+                    "description": "Export format for Google Docs, Sheets and Slides, e.g. text/csv or text/html.",
+                },
+                "no_cache": {
+                    "type": "boolean",
+                    "default": False,
+                    "description": "Download again even if the cached copy is current.",
+                },
             },
             "required": ["file_id"],
         },
     ),
+    types.Tool(
+        name="gdrive_cache_stats",
+        description="Report hit/miss counts and size of the Drive content cache, and metadata mirror status.",
+        inputSchema={"type": "object", "properties": {}, "required": []},
+    ),
+    types.Tool(
+        name="gdrive_download_file",
+        description=(
+            "Download a binary Drive file to a local path, streaming in chunks. "
+            "Re-running after an interruption resumes where it stopped."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "file_id": {"type": "string", "description": "Google Drive file ID."},
+                "local_path": {"type": "string", "description": "Destination file path."},
+                "overwrite": {"type": "boolean", "default": False},
+            },
+            "required": ["file_id", "local_path"],
+        },
+    ),
     types.Tool(
         name="gdrive_upload_file",
-        description="Upload a local file to Google Drive.",
+        description="Upload a local file to Google Drive (resumable, chunked).",
         inputSchema={
             "type": "object",
             "properties": {
@@ -72,57 +192,235 @@ TOOLS: list[types.Tool] = [
             "required": ["local_path", "drive_filename"],
         },
     ),
+    types.Tool(
+        name="gdrive_upload_directory",
+        description=(
+            "Upload every file in a local directory matching a glob pattern to a Drive "
+            "folder, several at a time. Reports per-file results and throughput."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "local_dir": {"type": "string"},
+                "folder_id": {"type": "string", "description": "Destination folder ID."},
+                "pattern": {
+                    "type": "string",
+                    "default": "*",
+                    "description": "Glob relative to local_dir, e.g. '*.zip'. Files only; names must be unique.",
+                },
+                "workers": {
+                    "type": "integer",
+                    "description": "Concurrent uploads (default GDRIVE_UPLOAD_WORKERS).",
+                },
+            },
+            "required": ["local_dir"],
+        },
+    ),
 ]
 
 
-def _build_service(config: Config):
-    # creds = service_account.Credentials.from_service_account_file(
-    #     config["google_service_account_json"], scopes=SCOPES
-    # )
-    # return build("drive", "v3", credentials=creds)
-    raise NotImplementedError("Install google-api-python-client and configure service account")
+def _client(config: Config, scopes: list[str] = SCOPES) -> gdrive_client.DriveClient:
+    return gdrive_client.get_client(config, scopes)
 
 
-async def handle(name: str, args: dict, config: Config) -> str:
+def handle(name: str, args: dict, config: Config) -> str:
     if name == "gdrive_list_files":
         return _list_files(args, config)
+    if name == "gdrive_get_metadata":
+        return _get_metadata(args, config)
     if name == "gdrive_read_file":
-        return _read_file(args["file_id"], config)
+        return _read_file(args, config)
+    if name == "gdrive_cache_stats":
+        return _cache_stats(config)
+    if name == "gdrive_download_file":
+        return _download_file(args, config)
     if name == "gdrive_upload_file":
         return _upload_file(args, config)
+    if name == "gdrive_upload_directory":
+        return _upload_directory(args, config)
     raise ValueError(f"gdrive module cannot handle tool: {name}")
 
 
+def startup(config: Config) -> None:
+    mirror = gdrive_mirror.get_mirror(config, SCOPES)
+    if mirror is not None:
+        mirror.start()
+
+
+def shutdown() -> None:
+    gdrive_mirror.close()
+    gdrive_cache.close()
+    gdrive_client.close_all()
+
+
+def _fields(args: dict) -> str:
+    fields = args.get("fields") or DEFAULT_FIELDS
+    for field in fields:
+        if not re.fullmatch(r"[A-Za-z][\w.]*(\([\w.,/ ]+\))?", field):
+            raise ValueError(f"Invalid Drive field: {field!r}")
+    return ",".join(fields)
+
+
 def _list_files(args: dict, config: Config) -> str:
-    # service = _build_service(config)
-    # q = f"'{args.get('folder_id', 'root')}' in parents"
-    # if args.get("query"):
-    #     q += f" and {args['query']}"
-    # results = service.files().list(q=q, pageSize=args.get("max_results", 20),
-    #                                fields="files(id, name, mimeType, modifiedTime)").execute()
-    # return json.dumps(results.get("files", []), indent=2)
-    raise NotImplementedError("Implement after setting up Service Account")
-
-
-def _read_file(file_id: str, config: Config) -> str:
-    # service = _build_service(config)
-    # # Export Google Docs as plain text; download others directly
-    # try:
-    #     content = service.files().export(fileId=file_id, mimeType="text/plain").execute()
-    #     return content.decode("utf-8")
-    # except Exception:
-    #     content = service.files().get_media(fileId=file_id).execute()
-    #     return content.decode("utf-8", errors="replace")
-    raise NotImplementedError("Implement after setting up Service Account")
+    folder = args.get("folder_id") or config.get("google_drive_root_folder") or "root"
+    max_results = args.get("max_results", 100)
+    cursor = args.get("cursor")
+    fields = _fields(args)
+
+    mirror = None if args.get("live") else gdrive_mirror.get_mirror(config, SCOPES)
+    # A cursor from a live listing can only be continued live
+    if mirror is not None and (not cursor or cursor.startswith(gdrive_mirror.CURSOR_PREFIX)):
+        result = mirror.list(folder, args.get("query"), fields.split(","), max_results, cursor)
+        if result is not None:
+            return to_json(result)
+    if cursor and cursor.startswith(gdrive_mirror.CURSOR_PREFIX):
+        raise ValueError("cursor is from the metadata mirror, which can't answer now; "
+                         "restart the listing without cursor")
+
+    files_api = _client(config).files
+    q = f"'{folder}' in parents"
+    if args.get("query"):
+        q += f" and {args['query']}"
+    files: list[dict] = []
+    while len(files) < max_results:
+        # Never ask for more than is still wanted, so next_cursor resumes exactly here
+        page = files_api.list(
+            q=q,
+            pageSize=min(MAX_PAGE_SIZE, max_results - len(files)),
+            pageToken=cursor,
+            fields=f"nextPageToken,files({fields})",
+        ).execute()
+        files.extend(page.get("files", []))
+        cursor = page.get("nextPageToken")
+        if not cursor:
+            break
+    return to_json({"files": files, "next_cursor": cursor, "source": "live"})
+
+
+def _retryable(error: HttpError) -> bool:
+    if error.resp.status not in _RETRY_STATUSES:
+        return False
+    if error.resp.status != 403:
+        return True
+    return any(d.get("reason") in _RETRY_REASONS for d in (error.error_details or [])
+               if isinstance(d, dict))
+
+
+def _get_metadata(args: dict, config: Config) -> str:
+    file_ids = list(dict.fromkeys(args["file_ids"]))
+    if len(file_ids) > MAX_METADATA_IDS:
+        raise ValueError(f"At most {MAX_METADATA_IDS} file_ids per call (got {len(file_ids)})")
+    client = _client(config)
+    fields = _fields(args)
+
+    found: dict[str, dict] = {}
+    errors: dict[str, HttpError] = {}
+
+    def on_response(file_id, response, error):
+        if error is None:
+            found[file_id] = response
+            errors.pop(file_id, None)
+        else:
+            errors[file_id] = error
+
+    todo = file_ids
+    for attempt in range(3):
+        for start in range(0, len(todo), BATCH_SIZE):
+            batch = client.new_batch(on_response)
+            for file_id in todo[start:start + BATCH_SIZE]:
+                batch.add(client.files.get(fileId=file_id, fields=fields),
+                          request_id=file_id)
+            batch.execute()
+        todo = [file_id for file_id, error in errors.items() if _retryable(error)]
+        if not todo:
+            break
+        time.sleep(0.5 * 2 ** attempt)
+
+    return to_json({
+        "files": [found[file_id] for file_id in file_ids if file_id in found],
+        "errors": [
+            {"id": file_id, "status": errors[file_id].resp.status, "error": errors[file_id].reason}
+            for file_id in file_ids if file_id in errors
+        ],
+    })
+
+
+def read_content(
+    file_id: str, config: Config, export_mime_type: str = "text/plain", no_cache: bool = False
+) -> tuple[dict, bytes]:
+    """Return (metadata, bytes) of a file, through the content cache.
+
+    Google Docs Editors files are exported as export_mime_type; others are
+    downloaded as they are. Also used by tools/pdf.py for drive_file_id.
+    """
+    files_api = _client(config).files
+    # One small call tells us both how to fetch the file and whether the cache is current
+    meta = files_api.get(fileId=file_id, fields=gdrive_cache.VALIDATOR_FIELDS).execute()
+    export = meta["mimeType"].startswith("application/vnd.google-apps")
+    fmt = export_mime_type if export else ""
+    current = gdrive_cache.validator(meta)
+
+    cache = None if no_cache else gdrive_cache.get_cache(config)
+    content = cache.get(file_id, fmt, current) if cache else None
+    if content is None:
+        if export:
+            content = files_api.export(fileId=file_id, mimeType=fmt).execute()
+        else:
+            content = files_api.get_media(fileId=file_id).execute()
+        if cache:
+            cache.put(file_id, fmt, current, content)
+    meta["validator"] = current
+    return meta, content
+
+
+def _read_file(args: dict, config: Config) -> str:
+    _, content = read_content(
+        args["file_id"], config, args.get("mime_type") or "text/plain", args.get("no_cache", False)
+    )
+    return content.decode("utf-8", errors="replace")
+
+
+def _cache_stats(config: Config) -> str:
+    mirror = gdrive_mirror.get_mirror(config, SCOPES)
+    return to_json({
+        "content": gdrive_cache.get_cache(config).stats(),
+        "mirror": mirror.stats() if mirror else None,
+    })
+
+
+def _chunk_size(config: Config) -> int:
+    return config.get("gdrive_chunk_mb", 8) * 1024 * 1024
+
+
+def _download_file(args: dict, config: Config) -> str:
+    dest = Path(args["local_path"]).expanduser()
+    if dest.exists() and not args.get("overwrite"):
+        raise FileExistsError(f"{dest} exists; pass overwrite=true to replace it")
+    result = gdrive_transfer.download(_client(config), args["file_id"], dest, _chunk_size(config))
+    return to_json(result)
 
 
 def _upload_file(args: dict, config: Config) -> str:
-    # from googleapiclient.http import MediaFileUpload
-    # service = _build_service(config)
-    # meta = {"name": args["drive_filename"]}
-    # if args.get("folder_id"):
-    #     meta["parents"] = [args["folder_id"]]
-    # media = MediaFileUpload(args["local_path"])
-    # f = service.files().create(body=meta, media_body=media, fields="id").execute()
-    # return f"Uploaded. File ID: {f['id']}"
-    raise NotImplementedError("Implement after setting up Service Account")
+    result = gdrive_transfer.upload(
+        _client(config, WRITE_SCOPES),
+        Path(args["local_path"]).expanduser(),
+        args["drive_filename"],
+        args.get("folder_id"),
+        _chunk_size(config),
+    )
+    return f"Uploaded. File ID: {result['id']} ({result['bytes']} bytes in {result['seconds']}s)"
+
+
+def _upload_directory(args: dict, config: Config) -> str:
+    directory = Path(args["local_dir"]).expanduser()
+    if not directory.is_dir():
+        raise NotADirectoryError(f"Not a directory: {directory}")
+    result = gdrive_transfer.upload_directory(
+        _client(config, WRITE_SCOPES),
+        directory,
+        args.get("pattern", "*"),
+        args.get("folder_id"),
+        _chunk_size(config),
+        workers=args.get("workers") or config.get("gdrive_upload_workers", 4),
+    )
+    return to_json(result)
@@ -0,0 +1,76 @@
+"""
+Revalidating content cache for gdrive_read_file (used by tools/gdrive.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+Entries live in a single SQLite file under GDRIVE_CACHE_DIR, keyed by
+(file ID, format). The format is the export mimeType for Google Docs
+Editors files, or "" for the raw content of any other file, so a Doc read
+as text/plain and as text/html is cached twice. Each entry stores the
+validator it was fetched under. This is the md5Checksum when Drive has
+one, which is every file with binary content; otherwise it is the file's
+version and modifiedTime. A read costs one small files.get to fetch the
+current validator, and content is downloaded again only when it changed.
+
+Storage, compression and LRU eviction past GDRIVE_CACHE_MAX_MB come from
+tools/blob_store.py. Files larger than a quarter of the cap are not cached.
+"""
+
+from pathlib import Path
+
+from config import Config
+from tools.blob_store import BlobStore, Shared
+
+# What a read needs to know to revalidate and to choose export vs download
+VALIDATOR_FIELDS = "id,name,mimeType,md5Checksum,version,modifiedTime,size"
+
+
+def validator(meta: dict) -> str:
+    """The part of a file's metadata that changes when its content does."""
+    if meta.get("md5Checksum"):
+        return f"md5:{meta['md5Checksum']}"
+    return f"v:{meta.get('version')}:{meta.get('modifiedTime')}"
+
+
+class ContentCache(BlobStore):
+    TABLE = "content"
+    KEY_COLUMNS = ("file_id TEXT", "format TEXT")
+    EXTRA_COLUMNS = ("validator TEXT",)
+    MAX_ENTRY_SHARE = 0.25
+
+    def get(self, file_id: str, fmt: str, current: str) -> bytes | None:
+        """Return cached content if it was stored under the `current` validator."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT validator, value FROM content WHERE file_id = ? AND format = ?",
+                (file_id, fmt),
+            ).fetchone()
+            if row is None or row[0] != current:
+                self.misses += 1
+                return None
+            self._touch([(file_id, fmt)])
+            self.hits += 1
+        return self._unpack(row[1])
+
+    def put(self, file_id: str, fmt: str, current: str, value: bytes) -> None:
+        packed = self._pack([(file_id, fmt, current, value)])
+        if not packed:
+            return
+        with self._lock:
+            # Every format of a changed file is stale, not just this one
+            self._write(packed, stale=("file_id = ? AND validator != ?", (file_id, current)))
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+_SHARED: Shared[ContentCache] = Shared()
+
+
+def get_cache(config: Config) -> ContentCache:
+    return _SHARED.get(lambda: ContentCache(
+        Path(config["gdrive_cache_dir"]) / "content.sqlite3",
+        max_bytes=config.get("gdrive_cache_max_mb", 256) * 1024 * 1024,
+    ))
+
+
+def close() -> None:
+    _SHARED.close()
@@ -0,0 +1,147 @@
+"""
+Process-wide Google Drive client (used by tools/gdrive.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+The service-account key is read once and the Drive service is built once
+from the discovery document bundled with google-api-python-client, so a
+call never re-parses the key, fetches a fresh token or downloads
+discovery. Both are rebuilt only when the key file changes (path, size or
+mtime). There is one client per scope set: tools/gdrive.py reads through a
+drive.readonly client and uploads through a full drive one, so a token
+able to write is only minted when something is uploaded.
+
+googleapiclient's default transport, httplib2, is not thread-safe, and the
+gdrive executor runs handlers on several threads. SessionHttp puts an
+httplib2-shaped request() on top of a google-auth AuthorizedSession: one
+requests session with a keep-alive pool of GDRIVE_POOL_SIZE connections,
+shared safely by every thread. The access token is refreshed under a lock
+before it expires, so concurrent calls don't each refresh it.
+"""
+
+import logging
+import os
+import threading
+import time
+import urllib.parse
+
+import httplib2
+from google.auth.transport.requests import AuthorizedSession, Request
+from google.oauth2 import service_account
+from googleapiclient.discovery import build
+from googleapiclient.http import BatchHttpRequest
+from requests.adapters import HTTPAdapter
+
+import metrics
+from config import Config
+
+log = logging.getLogger("mcp-server.gdrive")
+
+
+class SessionHttp:
+    """httplib2.Http stand-in for googleapiclient, backed by a pooled requests session."""
+
+    def __init__(self, credentials, pool_size: int, timeout: float):
+        self.credentials = credentials
+        self.timeout = timeout
+        self.session = AuthorizedSession(credentials)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._refresh_lock = threading.Lock()
+        self._refresh_request = Request()
+
+    def ensure_token(self) -> None:
+        # credentials.valid turns False a few minutes before expiry
+        if self.credentials.valid:
+            return
+        with self._refresh_lock:
+            if not self.credentials.valid:
+                with metrics.timed("gdrive.token_refresh"):
+                    self.credentials.refresh(self._refresh_request)
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        self.ensure_token()
+        started = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, uri, data=body, headers=headers, timeout=self.timeout
+            )
+        except Exception:
+            metrics.observe("gdrive.api", time.perf_counter() - started, error=True)
+            raise
+        metrics.observe("gdrive.api", time.perf_counter() - started, response.status_code >= 400)
+        info = {"status": response.status_code, **response.headers}
+        return httplib2.Response(info), response.content
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def _key_identity(path: str) -> tuple:
+    real = os.path.realpath(os.path.expanduser(path))
+    st = os.stat(real)
+    return (real, st.st_size, st.st_mtime_ns)
+
+
+class DriveClient:
+    def __init__(self, config: Config, scopes: list[str]):
+        key_path = os.path.expanduser(config["google_service_account_json"])
+        credentials = service_account.Credentials.from_service_account_file(key_path, scopes=scopes)
+        self.http = SessionHttp(
+            credentials,
+            pool_size=config.get("gdrive_pool_size", 16),
+            timeout=config.get("gdrive_timeout", 60),
+        )
+        endpoint = config.get("gdrive_api_endpoint")
+        options = {"api_endpoint": endpoint} if endpoint else None
+        # googleapiclient takes the batch URL from the discovery document's
+        # rootUrl, ignoring api_endpoint; derive it from the override instead
+        self.batch_uri = None
+        if endpoint:
+            root = urllib.parse.urlsplit(endpoint)
+            self.batch_uri = f"{root.scheme}://{root.netloc}/batch/drive/v3"
+        self.service = build(
+            "drive", "v3",
+            http=self.http,
+            static_discovery=True,
+            cache_discovery=False,
+            client_options=options,
+        )
+        # service.files() builds a fresh Resource (every method re-generated
+        # from discovery) on each call; build it once and share it
+        self.files = self.service.files()
+        self.changes = self.service.changes()
+
+    def new_batch(self, callback) -> BatchHttpRequest:
+        # Batch execution refreshes credentials itself with a throwaway
+        # httplib2 transport if the token is stale; refresh it here instead
+        self.http.ensure_token()
+        if self.batch_uri:
+            return BatchHttpRequest(callback=callback, batch_uri=self.batch_uri)
+        return self.service.new_batch_http_request(callback=callback)
+
+
+# scopes → (key file identity + endpoint, client)
+_CLIENTS: dict[tuple[str, ...], tuple[tuple, DriveClient]] = {}
+_LOCK = threading.Lock()
+
+
+def get_client(config: Config, scopes: list[str]) -> DriveClient:
+    """Return the shared client for `scopes`, rebuilding it if the key file changed."""
+    key = (_key_identity(config["google_service_account_json"]), config.get("gdrive_api_endpoint", ""))
+    with _LOCK:
+        current = _CLIENTS.get(tuple(scopes))
+        if current is None or current[0] != key:
+            if current is not None:
+                log.info("Google service account key changed; rebuilding Drive client")
+                current[1].http.close()
+            current = _CLIENTS[tuple(scopes)] = (key, DriveClient(config, scopes))
+        return current[1]
+
+
+def close_all() -> None:
+    with _LOCK:
+        for _, client in _CLIENTS.values():
+            client.http.close()
+        _CLIENTS.clear()
@@ -0,0 +1,377 @@
+"""
+Local SQLite mirror of Drive file metadata (used by tools/gdrive.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+With GDRIVE_MIRROR enabled, the metadata of every file under
+GOOGLE_DRIVE_ROOT_FOLDER (or My Drive) is copied into GDRIVE_MIRROR_DB.
+The mirror is seeded once by crawling the folder tree, up to
+FOLDERS_PER_QUERY folders per files.list query. It then stays current with
+changes.list from a start page token stored next to the rows. A background
+asyncio task syncs every GDRIVE_MIRROR_INTERVAL seconds, and a query that
+finds the mirror older than GDRIVE_MIRROR_MAX_AGE syncs it first.
+
+list() answers a folder listing from the mirror, optionally filtered by
+name, mimeType and modifiedTime clauses joined with "and". It returns None
+when it can't answer exactly: the mirror isn't seeded yet, the folder is
+outside the mirrored tree, or the query or fields need something the
+mirror doesn't hold. The caller then goes to the live API. "name contains"
+matches any substring, case-insensitively; Drive itself only matches the
+start of words, so the mirror may return a few more files.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from googleapiclient.errors import HttpError
+
+from config import Config
+from tools import gdrive_client
+
+log = logging.getLogger("mcp-server.gdrive")
+
+FOLDER = "application/vnd.google-apps.folder"
+FIELDS = ["id", "name", "mimeType", "modifiedTime", "createdTime", "size", "md5Checksum", "parents"]
+FOLDERS_PER_QUERY = 20
+PAGE_SIZE = 1000
+CURSOR_PREFIX = "mirror:"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id            TEXT PRIMARY KEY,
+    name          TEXT NOT NULL,
+    mime_type     TEXT NOT NULL,
+    modified_time TEXT,
+    meta          TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS parents (
+    parent_id TEXT NOT NULL,
+    file_id   TEXT NOT NULL,
+    PRIMARY KEY (parent_id, file_id)
+);
+CREATE INDEX IF NOT EXISTS parents_file ON parents (file_id);
+CREATE TABLE IF NOT EXISTS state (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# One query clause: <field> <op> '<value>' — everything else goes live
+_CLAUSE = re.compile(
+    r"\s*(name|mimeType|modifiedTime)\s*(=|!=|<=|>=|<|>|contains)\s*'((?:[^'\\]|\\.)*)'\s*"
+)
+_COLUMNS = {"name": "name", "mimeType": "mime_type", "modifiedTime": "modified_time"}
+
+
+def _where(query: str | None) -> tuple[str, list] | None:
+    """Translate a Drive query to SQL, or None if the mirror can't evaluate it."""
+    if not query or not query.strip():
+        return "", []
+    sql, params = [], []
+    for clause in re.split(r"\s+and\s+", query.strip(), flags=re.IGNORECASE):
+        if re.fullmatch(r"\s*trashed\s*=\s*false\s*", clause):
+            continue   # the mirror never holds trashed files
+        m = _CLAUSE.fullmatch(clause)
+        if not m:
+            return None
+        field, op, value = m[1], m[2], re.sub(r"\\(.)", r"\1", m[3])
+        if op == "contains":
+            if field != "name":
+                return None
+            escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            sql.append("f.name LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        elif field != "modifiedTime" and op not in ("=", "!="):
+            return None
+        else:
+            sql.append(f"f.{_COLUMNS[field]} {op} ?")
+            params.append(value)
+    return "".join(f" AND {s}" for s in sql), params
+
+
+class Mirror:
+    def __init__(self, path: Path, config: Config, scopes: list[str]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.config = config
+        self.scopes = scopes
+        self.root = config.get("google_drive_root_folder") or "root"
+        self.interval = config.get("gdrive_mirror_interval", 60)
+        self.max_age = config.get("gdrive_mirror_max_age", 300)
+        self.last_sync: float | None = None
+        self._lock = threading.Lock()        # guards the connection
+        self._sync_lock = threading.Lock()   # one seed/sync at a time
+        self._task: asyncio.Task | None = None
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    # ── State ─────────────────────────────────────────────────────────────────
+    def _state(self, key: str) -> str | None:
+        row = self._db.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, **values) -> None:
+        self._db.executemany(
+            "INSERT OR REPLACE INTO state VALUES (?, ?)", [(k, str(v)) for k, v in values.items()]
+        )
+
+    @property
+    def root_id(self) -> str | None:
+        """Drive ID of the mirrored root once seeded, else None."""
+        with self._lock:
+            if self._state("root") != self.root:
+                return None
+            return self._state("root_id")
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+    def _upsert(self, files: list[dict]) -> None:
+        for f in files:
+            self._db.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                (f["id"], f["name"], f["mimeType"], f.get("modifiedTime"), json.dumps(f)),
+            )
+            self._db.execute("DELETE FROM parents WHERE file_id = ?", (f["id"],))
+            self._db.executemany(
+                "INSERT INTO parents VALUES (?, ?)", [(p, f["id"]) for p in f.get("parents", [])]
+            )
+
+    def _delete_tree(self, file_id: str) -> None:
+        """Remove a file and, if it is a folder, everything mirrored below it."""
+        doomed = [file_id]
+        while doomed:
+            current = doomed.pop()
+            doomed.extend(
+                child for (child,) in self._db.execute(
+                    "SELECT file_id FROM parents WHERE parent_id = ?", (current,)
+                )
+            )
+            self._db.execute("DELETE FROM files WHERE id = ?", (current,))
+            self._db.execute("DELETE FROM parents WHERE file_id = ? OR parent_id = ?",
+                             (current, current))
+
+    def _in_tree(self, parents: list[str], root_id: str) -> bool:
+        return any(
+            p == root_id or self._db.execute(
+                "SELECT 1 FROM files WHERE id = ? AND mime_type = ?", (p, FOLDER)
+            ).fetchone()
+            for p in parents
+        )
+
+    # ── Seeding ───────────────────────────────────────────────────────────────
+    def _crawl(self, files_api, folders: list[str]) -> list[dict]:
+        """Return every non-trashed file below `folders` (breadth-first)."""
+        found: list[dict] = []
+        fields = f"nextPageToken,files({','.join(FIELDS)})"
+        while folders:
+            group, folders = folders[:FOLDERS_PER_QUERY], folders[FOLDERS_PER_QUERY:]
+            parents = " or ".join(f"'{folder}' in parents" for folder in group)
+            token = None
+            while True:
+                page = files_api.list(
+                    q=f"({parents}) and trashed = false",
+                    pageSize=PAGE_SIZE, pageToken=token, fields=fields,
+                ).execute()
+                for f in page.get("files", []):
+                    found.append(f)
+                    if f["mimeType"] == FOLDER:
+                        folders.append(f["id"])
+                token = page.get("nextPageToken")
+                if not token:
+                    break
+        return found
+
+    def seed(self) -> int:
+        """Rebuild the mirror from a full crawl; return the number of files."""
+        client = gdrive_client.get_client(self.config, self.scopes)
+        # Take the token first so changes made during the crawl are replayed after it
+        token = client.changes.getStartPageToken().execute()["startPageToken"]
+        root_id = client.files.get(fileId=self.root, fields="id").execute()["id"]
+        started = time.monotonic()
+        files = self._crawl(client.files, [root_id])
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM files")
+            self._db.execute("DELETE FROM parents")
+            self._upsert(files)
+            self._set_state(root=self.root, root_id=root_id, page_token=token, seeded=time.time())
+        self.last_sync = time.time()
+        log.info("Drive mirror seeded with %d files in %.1fs", len(files), time.monotonic() - started)
+        return len(files)
+
+    # ── Incremental sync ──────────────────────────────────────────────────────
+    def _apply(self, changes: list[dict], root_id: str) -> list[str]:
+        """Apply one page of changes; return folders that joined the tree."""
+        joined: list[str] = []
+        # A file may arrive before the new folder it sits in; retry until stable
+        pending = changes
+        while pending:
+            deferred = []
+            for change in pending:
+                f = change.get("file")
+                if change.get("removed") or f is None or f.get("trashed"):
+                    self._delete_tree(change["fileId"])
+                elif self._in_tree(f.get("parents", []), root_id):
+                    known = self._db.execute(
+                        "SELECT 1 FROM files WHERE id = ?", (f["id"],)
+                    ).fetchone()
+                    self._upsert([{k: f[k] for k in FIELDS if k in f}])
+                    if f["mimeType"] == FOLDER and not known:
+                        joined.append(f["id"])
+                else:
+                    deferred.append(change)
+            if len(deferred) == len(pending):
+                break
+            pending = deferred
+        # Whatever is left is outside the tree (or was moved out of it)
+        for change in pending:
+            self._delete_tree(change["fileId"])
+        return joined
+
+    def sync(self, max_age: float | None = None) -> int:
+        """Seed if needed, else replay changes since the stored token; return changes applied.
+
+        With max_age, return at once if another caller synced within it.
+        """
+        with self._sync_lock:
+            if max_age is not None and self.age is not None and self.age <= max_age:
+                return 0
+            root_id = self.root_id
+            with self._lock:
+                token = self._state("page_token")
+            if root_id is None or token is None:
+                return self.seed()
+            client = gdrive_client.get_client(self.config, self.scopes)
+            fields = f"nextPageToken,newStartPageToken,changes(fileId,removed,file({','.join(FIELDS)},trashed))"
+            applied = 0
+            while token:
+                try:
+                    page = client.changes.list(
+                        pageToken=token, pageSize=PAGE_SIZE, includeRemoved=True,
+                        spaces="drive", fields=fields,
+                    ).execute()
+                except HttpError as e:
+                    if e.resp.status in (400, 404, 410):
+                        log.warning("Drive change token %s rejected (%s); re-seeding", token, e.resp.status)
+                        return self.seed()
+                    raise
+                with self._lock, self._db:
+                    joined = self._apply(page.get("changes", []), root_id)
+                # Folders moved into the tree bring children the change feed won't list
+                adopted = self._crawl(client.files, joined) if joined else []
+                token = page.get("nextPageToken")
+                with self._lock, self._db:
+                    self._upsert(adopted)
+                    self._set_state(page_token=page.get("newStartPageToken") or token)
+                applied += len(page.get("changes", []))
+            self.last_sync = time.time()
+            return applied
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+    @property
+    def age(self) -> float | None:
+        return None if self.last_sync is None else time.time() - self.last_sync
+
+    def list(
+        self,
+        folder: str,
+        query: str | None,
+        fields: list[str],
+        max_results: int,
+        cursor: str | None,
+    ) -> dict | None:
+        """Answer a folder listing from the mirror, or None to go live."""
+        root_id = self.root_id
+        where = _where(query)
+        if root_id is None or where is None or not set(fields) <= set(FIELDS):
+            return None
+        if self.age is None or self.age > self.max_age:
+            try:
+                self.sync(self.max_age)
+            except Exception as e:
+                log.warning("Drive mirror sync failed, answering live: %s", e)
+                return None
+        if folder in ("root", self.root):
+            folder = root_id
+        offset = int(cursor[len(CURSOR_PREFIX):]) if cursor else 0
+        clauses, params = where
+        with self._lock:
+            if folder != root_id and not self._db.execute(
+                "SELECT 1 FROM files WHERE id = ? AND mime_type = ?", (folder, FOLDER)
+            ).fetchone():
+                return None
+            rows = self._db.execute(
+                "SELECT f.meta FROM parents p JOIN files f ON f.id = p.file_id "
+                f"WHERE p.parent_id = ?{clauses} ORDER BY f.name, f.id LIMIT ? OFFSET ?",
+                (folder, *params, max_results + 1, offset),
+            ).fetchall()
+        files = [json.loads(meta) for (meta,) in rows[:max_results]]
+        return {
+            "files": [{k: f[k] for k in fields if k in f} for f in files],
+            "next_cursor": f"{CURSOR_PREFIX}{offset + max_results}" if len(rows) > max_results else None,
+            "source": "mirror",
+            "data_age_s": round(self.age, 1),
+        }
+
+    # ── Background sync ───────────────────────────────────────────────────────
+    def start(self) -> None:
+        """Start the background sync task on the running loop (idempotent)."""
+        if self.interval <= 0 or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.get_running_loop().create_task(self._sync_loop())
+
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.sync)
+            except Exception as e:
+                # Keep serving the last good mirror; queries older than max_age go live
+                log.warning("Drive mirror sync failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        with self._lock:
+            (files,) = self._db.execute("SELECT COUNT(*) FROM files").fetchone()
+            seeded = self._state("seeded")
+        return {
+            "files": files,
+            "seeded": float(seeded) if seeded else None,
+            "data_age_s": round(self.age, 1) if self.age is not None else None,
+            "path": str(self.path),
+        }
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        with self._lock:
+            self._db.close()
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+_MIRROR: Mirror | None = None
+_LOCK = threading.Lock()
+
+
+def get_mirror(config: Config, scopes: list[str]) -> Mirror | None:
+    """Return the shared mirror, or None if GDRIVE_MIRROR is off."""
+    global _MIRROR
+    if not config.get("gdrive_mirror"):
+        return None
+    with _LOCK:
+        if _MIRROR is None:
+            _MIRROR = Mirror(Path(config["gdrive_mirror_db"]), config, scopes)
+        return _MIRROR
+
+
+def close() -> None:
+    global _MIRROR
+    with _LOCK:
+        if _MIRROR is not None:
+            _MIRROR.close()
+        _MIRROR = None
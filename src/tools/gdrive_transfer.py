@@ -0,0 +1,212 @@
+"""
+Streaming Drive transfers (used by tools/gdrive.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+download streams a file to disk GDRIVE_CHUNK_MB at a time with HTTP Range
+requests, so memory use is one chunk whatever the file size. Bytes land in
+"<dest>.part" and the file is renamed into place only when complete and its
+MD5 matches Drive's. A dropped connection resumes from the last byte
+written, and so does a later call for the same file and destination.
+
+upload sends a file as a resumable upload in GDRIVE_CHUNK_MB chunks. After
+a transport error, googleapiclient asks the server how much it has and
+resumes from there instead of restarting. upload_directory runs many
+uploads on a bounded pool of threads sharing the client's connection pool.
+"""
+
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import requests
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload
+
+from tools import report_progress
+from tools.gdrive_client import DriveClient
+
+log = logging.getLogger("mcp-server.gdrive")
+
+MAX_ATTEMPTS = 5
+UPLOAD_CHUNK_ALIGN = 256 * 1024   # resumable chunks must be multiples of 256 KiB
+
+_TRANSIENT = (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError)
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _backoff(attempt: int) -> None:
+    time.sleep(min(0.5 * 2 ** attempt, 8))
+
+
+def _md5_of(path: Path):
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            md5.update(block)
+    return md5
+
+
+# ── Download ──────────────────────────────────────────────────────────────────
+def download(client: DriveClient, file_id: str, dest: Path, chunk_size: int) -> dict:
+    """Stream `file_id` to `dest`; return {path, bytes, resumed_from, seconds}."""
+    meta = client.files.get(fileId=file_id, fields="id,name,mimeType,size,md5Checksum").execute()
+    if meta["mimeType"].startswith("application/vnd.google-apps"):
+        raise ValueError(
+            f"{meta['name']} is a {meta['mimeType']} document with no binary content; "
+            "use gdrive_read_file to export it"
+        )
+    total = int(meta.get("size", 0))
+    uri = client.files.get_media(fileId=file_id).uri
+    part = dest.with_name(dest.name + ".part")
+    dest.parent.mkdir(parents=True, exist_ok=True)
+
+    offset = part.stat().st_size if part.exists() else 0
+    if offset > total:
+        part.unlink()
+        offset = 0
+    resumed_from = offset
+    md5 = _md5_of(part) if offset else hashlib.md5()
+    started = time.monotonic()
+
+    with open(part, "ab") as out:
+        attempt = 0
+        while offset < total:
+            end = min(offset + chunk_size, total) - 1
+            try:
+                resp, content = client.http.request(
+                    uri, "GET", headers={"Range": f"bytes={offset}-{end}"}
+                )
+            except _TRANSIENT as e:
+                resp, content, error = None, b"", e
+            else:
+                error = None
+            if resp is not None and resp.status in (200, 206):
+                if resp.status == 200 and offset:
+                    # Server ignored Range and sent the whole file: start over
+                    out.truncate(0)
+                    md5, offset = hashlib.md5(), 0
+                out.write(content)
+                md5.update(content)
+                offset += len(content)
+                attempt = 0
+                report_progress(offset, total, f"{meta['name']}: {offset >> 20} / {total >> 20} MiB")
+                continue
+            if resp is not None and resp.status not in _RETRY_STATUSES:
+                raise HttpError(resp, content, uri=uri)
+            attempt += 1
+            if attempt >= MAX_ATTEMPTS:
+                raise error or HttpError(resp, content, uri=uri)
+            log.warning("Drive download of %s interrupted at byte %d; resuming", file_id, offset)
+            _backoff(attempt)
+
+    if meta.get("md5Checksum") and md5.hexdigest() != meta["md5Checksum"]:
+        part.unlink()
+        raise ValueError(f"MD5 mismatch downloading {file_id}; partial file discarded")
+    os.replace(part, dest)
+    return {
+        "path": str(dest),
+        "bytes": total,
+        "resumed_from": resumed_from,
+        "seconds": round(time.monotonic() - started, 2),
+    }
+
+
+# ── Upload ────────────────────────────────────────────────────────────────────
+def _aligned(chunk_size: int) -> int:
+    return max(UPLOAD_CHUNK_ALIGN, chunk_size // UPLOAD_CHUNK_ALIGN * UPLOAD_CHUNK_ALIGN)
+
+
+def upload(
+    client: DriveClient,
+    path: Path,
+    name: str,
+    folder_id: str | None,
+    chunk_size: int,
+) -> dict:
+    """Resumable chunked upload of `path`; return {id, name, bytes, seconds}."""
+    meta = {"name": name}
+    if folder_id:
+        meta["parents"] = [folder_id]
+    size = path.stat().st_size
+    media = MediaFileUpload(str(path), chunksize=_aligned(chunk_size), resumable=True)
+    request = client.files.create(body=meta, media_body=media, fields="id,name,size")
+    started = time.monotonic()
+
+    response, attempt = None, 0
+    while response is None:
+        try:
+            # No built-in retries: they resend the same, already-drained
+            # stream slice. Retrying here rebuilds it from the last offset
+            status, response = request.next_chunk(num_retries=0)
+        except _TRANSIENT as e:
+            # next_chunk marks itself in error and re-syncs the offset on the next call
+            attempt += 1
+            if attempt >= MAX_ATTEMPTS:
+                raise
+            log.warning("Drive upload of %s interrupted (%r); resuming", path, e)
+            _backoff(attempt)
+            continue
+        except HttpError as e:
+            if e.resp.status not in _RETRY_STATUSES or attempt + 1 >= MAX_ATTEMPTS:
+                raise
+            attempt += 1
+            _backoff(attempt)
+            continue
+        attempt = 0
+        if status is not None:
+            report_progress(status.resumable_progress, size, f"{name}: {status.progress():.0%}")
+
+    return {
+        "id": response["id"],
+        "name": name,
+        "bytes": size,
+        "seconds": round(time.monotonic() - started, 2),
+    }
+
+
+def upload_directory(
+    client: DriveClient,
+    directory: Path,
+    pattern: str,
+    folder_id: str | None,
+    chunk_size: int,
+    workers: int,
+) -> dict:
+    """Upload every file in `directory` matching `pattern`, `workers` at a time."""
+    paths = sorted(p for p in directory.glob(pattern) if p.is_file())
+    total_bytes = sum(p.stat().st_size for p in paths)
+    started = time.monotonic()
+    results, done_bytes = [], 0
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcp-gdrive-upload") as pool:
+        futures = {
+            pool.submit(upload, client, p, p.name, folder_id, chunk_size): p for p in paths
+        }
+        # Only this thread carries the call's progress context; per-chunk
+        # reports from the pool threads are no-ops, per-file ones go out here
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+                done_bytes += result["bytes"]
+            except Exception as e:
+                result = {"name": path.name, "error": str(e)}
+            results.append(result)
+            report_progress(done_bytes, total_bytes, f"{len(results)}/{len(paths)} files")
+
+    elapsed = time.monotonic() - started
+    results.sort(key=lambda r: r["name"])
+    return {
+        "files": len(paths),
+        "uploaded": sum(1 for r in results if "id" in r),
+        "failed": sum(1 for r in results if "error" in r),
+        "bytes": done_bytes,
+        "seconds": round(elapsed, 2),
+        "mb_per_s": round(done_bytes / elapsed / 1e6, 2) if elapsed else None,
+        "workers": workers,
+        "results": results,
+    }
@@ -9,6 +9,16 @@ Security model:
   - All commands are logged with full args before execution
   - Targets are validated to prevent scope creep
   - SSH key auth only — no password auth
+  - Host keys are checked against KALI_KNOWN_HOSTS when it is set
+
+Connections:
+  Commands run as channels on a persistent, keepalive'd connection pool
+  (tools/kali_pool.py) instead of a fresh SSH handshake per command.
+
+Long-running scans:
+  kali_run_tool is synchronous and capped at RUN_TIMEOUT. For full port
+  scans, brute-forcing etc. use kali_start_job and follow it with
+  kali_job_output (tools/kali_jobs.py keeps the output on the server).
 
 Setup steps:
   1. Deploy Kali as VM/LXC in Proxmox
@@ -21,16 +31,25 @@ Dependencies:
     pip install asyncssh
 """
 
-import json
+import asyncio
+import ipaddress
 import logging
+import time
 from mcp import types
 from config import Config
 
-# TODO: uncomment when asyncssh is installed
-# import asyncssh
+from tools import kali_jobs, kali_pool, kali_results, report_progress, to_json
 
 log = logging.getLogger("mcp-server.kali")
 
+# asyncssh is natively async — handlers run directly on the event loop
+EXECUTOR = "async"
+
+RUN_TIMEOUT = 120
+OUTPUT_LIMIT = 64 * 1024
+MAX_WAIT = 300
+PROGRESS_SNIPPET = 1024
+
 # These are the defaults; override via KALI_ALLOWED_TOOLS in .env
 DEFAULT_ALLOWED_TOOLS = {
     "nmap", "nikto", "gobuster", "whatweb", "sslscan",
@@ -61,10 +80,141 @@ TOOLS: list[types.Tool] = [
                     "description": "Additional flags/arguments, e.g. '-sV -p 80,443'.",
                     "default": "",
                 },
+                "structured": {
+                    "type": "boolean",
+                    "default": False,
+                    "description": (
+                        "nmap only: emit XML (-oX -), return compact hosts/ports/services "
+                        "instead of raw text, and save them for kali_query_results."
+                    ),
+                },
+            },
+            "required": ["tool", "target"],
+        },
+    ),
+    types.Tool(
+        name="kali_run_batch",
+        description=(
+            "Run one allowed Kali tool against many targets in parallel and return "
+            "the results grouped by target. Give a list of targets, a CIDR, or both. "
+            "Runs are spread over the configured Kali hosts, least-loaded first. "
+            "Use only on systems you own or have explicit permission to test."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "tool": {"type": "string", "description": "Tool name, e.g. 'nmap'."},
+                "targets": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "IP addresses or hostnames.",
+                },
+                "cidr": {"type": "string", "description": "Network to expand, e.g. '10.0.0.0/24'."},
+                "flags": {"type": "string", "description": "Additional flags.", "default": ""},
+                "per_host_concurrency": {
+                    "type": "integer",
+                    "description": "Max simultaneous runs per Kali host (default from config).",
+                },
+                "structured": {
+                    "type": "boolean",
+                    "default": False,
+                    "description": (
+                        "nmap only: emit XML (-oX -), return compact hosts/ports/services "
+                        "instead of raw text, and save them for kali_query_results."
+                    ),
+                },
+            },
+            "required": ["tool"],
+        },
+    ),
+    types.Tool(
+        name="kali_query_results",
+        description=(
+            "Query stored structured nmap results without rescanning, e.g. all hosts "
+            "with port 443 open running nginx. By default only open ports from each "
+            "host's most recent scan are returned."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "host": {"type": "string", "description": "IP address or hostname."},
+                "port": {"type": "integer"},
+                "protocol": {"type": "string", "enum": ["tcp", "udp", "sctp"]},
+                "state": {
+                    "type": "string",
+                    "default": "open",
+                    "description": "Port state to match; empty string for any.",
+                },
+                "service": {
+                    "type": "string",
+                    "description": "Substring of the service name or product, e.g. 'nginx'.",
+                },
+                "latest_only": {"type": "boolean", "default": True},
+                "limit": {"type": "integer", "default": 500},
+            },
+            "required": [],
+        },
+    ),
+    types.Tool(
+        name="kali_start_job",
+        description=(
+            "Start an allowed Kali tool as a background job and return its job ID "
+            "immediately. Use for long scans (e.g. nmap -p-, gobuster). Follow it "
+            "with kali_job_output. Use only on systems you own or have explicit "
+            "permission to test."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "tool": {"type": "string", "description": "Tool name, e.g. 'nmap'."},
+                "target": {"type": "string", "description": "IP address or hostname."},
+                "flags": {"type": "string", "description": "Additional flags.", "default": ""},
             },
             "required": ["tool", "target"],
         },
     ),
+    types.Tool(
+        name="kali_job_status",
+        description="Get the state of a background Kali job, or of all jobs if job_id is omitted.",
+        inputSchema={
+            "type": "object",
+            "properties": {"job_id": {"type": "string"}},
+            "required": [],
+        },
+    ),
+    types.Tool(
+        name="kali_job_output",
+        description=(
+            "Read a background job's stdout from a byte offset (or just its tail). "
+            "Pass next_offset from the previous call to read only new output. With "
+            "wait > 0 the call stays open until the job ends or wait seconds pass, "
+            "sending progress notifications with new output as it arrives."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "job_id": {"type": "string", "description": "Job ID returned by kali_start_job."},
+                "offset": {"type": "integer", "default": 0, "description": "Byte offset to read from."},
+                "tail": {"type": "integer", "description": "Return only the last N bytes instead."},
+                "limit": {"type": "integer", "default": OUTPUT_LIMIT, "description": "Max bytes to return."},
+                "wait": {
+                    "type": "number",
+                    "default": 0,
+                    "description": f"Seconds to follow the job before returning (max {MAX_WAIT}).",
+                },
+            },
+            "required": ["job_id"],
+        },
+    ),
+    types.Tool(
+        name="kali_cancel_job",
+        description="Cancel a running or queued background Kali job.",
+        inputSchema={
+            "type": "object",
+            "properties": {"job_id": {"type": "string", "description": "Job ID returned by kali_start_job."}},
+            "required": ["job_id"],
+        },
+    ),
     types.Tool(
         name="kali_list_allowed_tools",
         description="List which Kali tools are permitted by this server's configuration.",
@@ -77,40 +227,241 @@ async def handle(name: str, args: dict, config: Config) -> str:
     allowed = set(config.get("kali_allowed_tools", list(DEFAULT_ALLOWED_TOOLS)))
 
     if name == "kali_list_allowed_tools":
-        return json.dumps(sorted(allowed), indent=2)
+        return to_json(sorted(allowed))
 
     if name == "kali_run_tool":
         return await _run_tool(args, config, allowed)
 
+    if name == "kali_run_batch":
+        return await _run_batch(args, config, allowed)
+
+    if name == "kali_query_results":
+        return await _query_results(args, config)
+
+    if name == "kali_start_job":
+        return _start_job(args, config, allowed)
+
+    if name in ("kali_job_status", "kali_job_output", "kali_cancel_job"):
+        table = kali_jobs.get_table(config)
+        if name == "kali_job_status" and not args.get("job_id"):
+            return to_json([job.summary() for job in table.jobs.values()])
+        try:
+            job = table.get(args["job_id"])
+        except KeyError:
+            return f"Error: no such job: '{args['job_id']}'"
+        if name == "kali_job_status":
+            return to_json(job.summary())
+        if name == "kali_job_output":
+            return await _job_output(job, args)
+        await table.cancel(job)
+        return to_json(job.summary())
+
     raise ValueError(f"kali module cannot handle tool: {name}")
 
 
+def _check(tool: str, target: str, allowed: set[str]) -> str | None:
+    """Return an error message if the tool or target is not permitted."""
+    if tool not in allowed:
+        return f"Error: '{tool}' is not in the allowed tools list: {sorted(allowed)}"
+    if not target or any(c in target for c in [";", "&", "|", "`", "$", "\n"]):
+        return "Error: Invalid target — shell metacharacters are not permitted."
+    return None
+
+
 async def _run_tool(args: dict, config: Config, allowed: set[str]) -> str:
     tool = args["tool"].strip()
     target = args["target"].strip()
     flags = args.get("flags", "").strip()
 
     # Safety checks
+    error = _check(tool, target, allowed)
+    if error:
+        return error
+
+    structured = args.get("structured", False)
+    if structured and tool != "nmap":
+        return "Error: structured output is only supported for nmap."
+
+    command = _command(tool, flags, target, structured)
+    log.warning("KALI EXEC | tool=%s target=%s flags=%r", tool, target, flags)
+
+    # Runs as a channel on a warm pooled connection — no per-command handshake
+    result = await kali_pool.get_pool(config).run(command, timeout=RUN_TIMEOUT)
+    if structured:
+        return to_json(await _store_scan(
+            result, tool, command, target, config["kali_host"], config
+        ))
+    output = result.stdout or ""
+    if result.stderr:
+        output += f"\n[stderr]\n{result.stderr}"
+    return output or "(no output)"
+
+
+def _command(tool: str, flags: str, target: str, structured: bool = False) -> str:
+    if structured:
+        flags = f"{flags} -oX -".strip()
+    return f"{tool} {flags} {target}".strip()
+
+
+async def _store_scan(result, tool: str, command: str, target: str, host: str, config: Config) -> dict:
+    """Parse nmap XML from `result`, save it, and return the compact form."""
+    try:
+        parsed = kali_results.parse_nmap_xml(result.stdout or "")
+    except Exception as e:
+        return {"error": f"could not parse nmap XML: {e}", "stderr": result.stderr or None}
+    store = kali_results.get_store(config)
+    parsed["scan_id"] = await asyncio.to_thread(store.save, tool, command, target, host, parsed)
+    if result.exit_status:
+        parsed["exit_status"] = result.exit_status
+    return parsed
+
+
+async def _query_results(args: dict, config: Config) -> str:
+    store = kali_results.get_store(config)
+    rows = await asyncio.to_thread(
+        store.query,
+        host=args.get("host"),
+        port=args.get("port"),
+        protocol=args.get("protocol"),
+        state=args.get("state", "open") or None,
+        service=args.get("service"),
+        latest_only=args.get("latest_only", True),
+        limit=args.get("limit", 500),
+    )
+    return to_json({"count": len(rows), "results": rows})
+
+
+def _expand_targets(args: dict, limit: int) -> list[str]:
+    targets = [t.strip() for t in args.get("targets", [])]
+    if args.get("cidr"):
+        network = ipaddress.ip_network(args["cidr"].strip(), strict=False)
+        # Checked before expanding so a /8 is refused without building 16M strings
+        if network.num_addresses - 2 > limit:
+            raise ValueError(f"CIDR {network} has more than {limit} hosts")
+        targets.extend(str(ip) for ip in network.hosts())
+    targets = list(dict.fromkeys(targets))
+    if not targets:
+        raise ValueError("Give at least one target or a cidr")
+    if len(targets) > limit:
+        raise ValueError(f"{len(targets)} targets exceeds KALI_BATCH_MAX_TARGETS ({limit})")
+    return targets
+
+
+async def _run_batch(args: dict, config: Config, allowed: set[str]) -> str:
+    tool = args["tool"].strip()
+    flags = args.get("flags", "").strip()
+    structured = args.get("structured", False)
     if tool not in allowed:
         return f"Error: '{tool}' is not in the allowed tools list: {sorted(allowed)}"
-    if not target or any(c in target for c in [";", "&", "|", "`", "$", "\n"]):
-        return "Error: Invalid target — shell metacharacters are not permitted."
+    if structured and tool != "nmap":
+        return "Error: structured output is only supported for nmap."
+    try:
+        targets = _expand_targets(args, config.get("kali_batch_max_targets", 1024))
+    except ValueError as e:
+        return f"Error: {e}"
 
-    command = f"{tool} {flags} {target}".strip()
-    log.warning(f"KALI EXEC | tool={tool} target={target} flags={flags!r}")
-
-    # async with asyncssh.connect(
-    #     config["kali_host"],
-    #     username=config["kali_user"],
-    #     client_keys=[config["kali_ssh_key_path"]],
-    #     known_hosts=None,  # TODO: set up known_hosts properly in production
-    # ) as conn:
-    #     result = await conn.run(command, check=False, timeout=120)
-    #     output = result.stdout or ""
-    #     if result.stderr:
-    #         output += f"\n[stderr]\n{result.stderr}"
-    #     return output or "(no output)"
-
-    raise NotImplementedError(
-        "Install asyncssh, configure SSH key, and uncomment the implementation"
+    hosts = config.get("kali_hosts") or [config["kali_host"]]
+    per_host = args.get("per_host_concurrency") or config.get("kali_host_concurrency", 4)
+    scheduler = kali_pool.HostScheduler(hosts, per_host)
+    log.warning(
+        "KALI BATCH | tool=%s targets=%d flags=%r hosts=%s", tool, len(targets), flags, hosts
     )
+
+    results: dict[str, dict] = {}
+    done = 0
+
+    async def run_one(target: str) -> None:
+        nonlocal done
+        error = _check(tool, target, allowed)
+        if error:
+            results[target] = {"error": error}
+        else:
+            command = _command(tool, flags, target, structured)
+            async with scheduler.slot() as host:
+                log.warning("KALI EXEC | tool=%s target=%s flags=%r host=%s", tool, target, flags, host)
+                start = time.monotonic()
+                try:
+                    result = await kali_pool.get_pool(config, host).run(command, timeout=RUN_TIMEOUT)
+                    results[target] = {
+                        "host": host,
+                        "exit_status": result.exit_status,
+                        "duration_s": round(time.monotonic() - start, 2),
+                    }
+                    if structured:
+                        results[target]["scan"] = await _store_scan(
+                            result, tool, command, target, host, config
+                        )
+                    else:
+                        results[target]["output"] = result.stdout or ""
+                        results[target]["stderr"] = result.stderr or None
+                except Exception as e:
+                    results[target] = {
+                        "host": host,
+                        "duration_s": round(time.monotonic() - start, 2),
+                        "error": f"{type(e).__name__}: {e}",
+                    }
+        done += 1
+        report_progress(done, len(targets), f"{target} done")
+
+    await asyncio.gather(*(run_one(t) for t in targets))
+    failed = sum(1 for r in results.values() if r.get("error") or r.get("exit_status"))
+    return to_json({
+        "tool": tool,
+        "flags": flags,
+        "targets": len(targets),
+        "failed": failed,
+        "runs_per_host": scheduler.assigned,
+        "results": {t: results[t] for t in targets},
+    })
+
+
+def _start_job(args: dict, config: Config, allowed: set[str]) -> str:
+    tool = args["tool"].strip()
+    target = args["target"].strip()
+    flags = args.get("flags", "").strip()
+
+    error = _check(tool, target, allowed)
+    if error:
+        return error
+
+    command = f"{tool} {flags} {target}".strip()
+    job = kali_jobs.get_table(config).start(command, tool, target, config)
+    log.warning("KALI JOB START | id=%s tool=%s target=%s flags=%r", job.id, tool, target, flags)
+    return to_json(job.summary())
+
+
+async def _job_output(job: "kali_jobs.Job", args: dict) -> str:
+    offset = max(0, int(args.get("offset", 0)))
+    limit = max(1, int(args.get("limit", OUTPUT_LIMIT)))
+    wait = min(float(args.get("wait", 0)), MAX_WAIT)
+
+    # Follow the job, pushing each new piece of output as a progress notification
+    deadline = time.monotonic() + wait
+    seen = job.stdout.total
+    while not job.done and (remaining := deadline - time.monotonic()) > 0:
+        await job.wait_for_output(seen, remaining)
+        if job.stdout.total > seen:
+            fresh = job.stdout.read(max(seen, job.stdout.total - PROGRESS_SNIPPET), PROGRESS_SNIPPET)
+            report_progress(job.stdout.total, None, fresh.decode("utf-8", errors="replace"))
+            seen = job.stdout.total
+
+    if args.get("tail"):
+        offset = max(0, job.stdout.total - int(args["tail"]))
+    data = job.stdout.read(offset, limit)
+    next_offset = offset + len(data)
+    return to_json({
+        "job_id": job.id,
+        "state": job.state,
+        "offset": offset,
+        "next_offset": next_offset,
+        "total_bytes": job.stdout.total,
+        "complete": job.done and next_offset >= job.stdout.total,
+        "stderr": job.stderr.decode("utf-8", errors="replace") if job.done else None,
+        "output": data.decode("utf-8", errors="replace"),
+    })
+
+
+def shutdown() -> None:
+    kali_jobs.close_all()
+    kali_pool.close_all()
+    kali_results.close()
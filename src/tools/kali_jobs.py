@@ -0,0 +1,246 @@
+"""
+Background job engine for long-running Kali tools (used by tools/kali.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+A job runs its command as a channel on the pooled SSH connection
+(tools/kali_pool.py) and streams remote stdout into an OutputBuffer: the
+most recent KALI_JOB_BUFFER_KB live in a memory ring, and anything pushed
+out of the ring is appended to a spill file on disk, so the complete output
+stays readable by byte offset without holding it all in memory.
+
+Job states: queued (waiting for a free SSH channel) → running → one of
+completed / failed / cancelled / timed_out. Finished jobs are kept for
+inspection until more than KALI_JOB_RETENTION have finished, oldest first.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+from config import Config
+from tools import kali_pool
+
+log = logging.getLogger("mcp-server.kali")
+
+READ_CHUNK = 64 * 1024
+STDERR_LIMIT = 16 * 1024
+
+FINISHED_STATES = {"completed", "failed", "cancelled", "timed_out"}
+
+
+class OutputBuffer:
+    """Append-only byte stream: a bounded memory ring that spills to disk."""
+
+    def __init__(self, capacity: int, spill_path: Path):
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.spilled = 0            # bytes [0, spilled) live in the spill file
+        self._ring = bytearray()    # bytes [spilled, total) live here
+        self._spill = None
+
+    @property
+    def total(self) -> int:
+        return self.spilled + len(self._ring)
+
+    def write(self, data: bytes) -> None:
+        self._ring += data
+        overflow = len(self._ring) - self.capacity
+        if overflow > 0:
+            if self._spill is None:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                self._spill = open(self.spill_path, "ab")
+            self._spill.write(self._ring[:overflow])
+            self._spill.flush()
+            del self._ring[:overflow]
+            self.spilled += overflow
+
+    def read(self, offset: int, limit: int) -> bytes:
+        """Return up to `limit` bytes starting at absolute `offset`."""
+        offset = max(0, min(offset, self.total))
+        end = min(self.total, offset + limit)
+        out = b""
+        if offset < self.spilled:
+            with open(self.spill_path, "rb") as f:
+                f.seek(offset)
+                out = f.read(min(end, self.spilled) - offset)
+            offset = self.spilled
+        if offset < end:
+            out += bytes(self._ring[offset - self.spilled:end - self.spilled])
+        return out
+
+    def close(self, delete: bool = False) -> None:
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        if delete and self.spill_path.exists():
+            self.spill_path.unlink()
+
+
+class Job:
+    def __init__(self, command: str, tool: str, target: str, buffer: OutputBuffer):
+        self.id = uuid.uuid4().hex[:12]
+        self.command = command
+        self.tool = tool
+        self.target = target
+        self.stdout = buffer
+        self.stderr = b""
+        self.state = "queued"
+        self.exit_status: int | None = None
+        self.error: str | None = None
+        self.created = time.time()
+        self.started: float | None = None
+        self.finished: float | None = None
+        self.task: asyncio.Task | None = None
+        self.process = None
+        self.changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def summary(self) -> dict:
+        end = self.finished or time.time()
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "tool": self.tool,
+            "target": self.target,
+            "command": self.command,
+            "exit_status": self.exit_status,
+            "error": self.error,
+            "stdout_bytes": self.stdout.total,
+            "runtime_s": round(end - self.started, 1) if self.started else None,
+        }
+
+    async def _notify(self) -> None:
+        async with self.changed:
+            self.changed.notify_all()
+
+    async def wait_for_output(self, offset: int, timeout: float) -> None:
+        """Return once output beyond `offset` exists, the job ends, or `timeout` passes."""
+        async with self.changed:
+            try:
+                await asyncio.wait_for(
+                    self.changed.wait_for(lambda: self.stdout.total > offset or self.done),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                pass
+
+
+class JobTable:
+    def __init__(self, spill_dir: Path, buffer_bytes: int, retention: int, max_runtime: float):
+        self.spill_dir = spill_dir
+        self.buffer_bytes = buffer_bytes
+        self.retention = retention
+        self.max_runtime = max_runtime
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def start(self, command: str, tool: str, target: str, config: Config) -> Job:
+        buffer = OutputBuffer(self.buffer_bytes, self.spill_dir / f"{uuid.uuid4().hex}.out")
+        job = Job(command, tool, target, buffer)
+        job.task = asyncio.create_task(self._run(job, config))
+        self.jobs[job.id] = job
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    async def cancel(self, job: Job) -> None:
+        if job.done:
+            return
+        job.task.cancel()
+        try:
+            await job.task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self, job: Job, config: Config) -> None:
+        pool = kali_pool.get_pool(config)
+        stderr_task = None
+        try:
+            async with asyncio.timeout(self.max_runtime):
+                async with pool.connection() as conn:
+                    job.state, job.started = "running", time.time()
+                    await job._notify()
+                    job.process = await conn.create_process(job.command, encoding=None)
+                    stderr_task = asyncio.create_task(self._drain_stderr(job))
+                    while chunk := await job.process.stdout.read(READ_CHUNK):
+                        job.stdout.write(chunk)
+                        await job._notify()
+                    await stderr_task
+                    result = await job.process.wait()
+                    job.exit_status = result.exit_status
+                    job.state = "completed" if result.exit_status == 0 else "failed"
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+        except TimeoutError:
+            job.state = "timed_out"
+            job.error = f"exceeded KALI_JOB_MAX_RUNTIME ({self.max_runtime:.0f}s)"
+        except Exception as e:
+            job.state, job.error = "failed", str(e)
+            log.error("Kali job %s failed: %s", job.id, e, exc_info=True)
+        finally:
+            if stderr_task is not None:
+                stderr_task.cancel()
+            if job.process is not None and job.state in ("cancelled", "timed_out"):
+                # Best effort: signal the remote tool, then close its channel
+                try:
+                    job.process.terminate()
+                except Exception:
+                    pass
+                job.process.close()
+            job.finished = time.time()
+            job.stdout.close()
+            log.warning("KALI JOB END | id=%s state=%s bytes=%d", job.id, job.state, job.stdout.total)
+            await job._notify()
+
+    async def _drain_stderr(self, job: Job) -> None:
+        while chunk := await job.process.stderr.read(READ_CHUNK):
+            job.stderr = (job.stderr + chunk)[-STDERR_LIMIT:]
+
+    def _prune(self) -> None:
+        finished = [j for j in self.jobs.values() if j.done]
+        for job in finished[:max(0, len(finished) - self.retention)]:
+            job.stdout.close(delete=True)
+            del self.jobs[job.id]
+
+    def close_all(self) -> None:
+        for job in self.jobs.values():
+            if not job.done and job.task is not None:
+                job.task.cancel()
+            job.stdout.close(delete=True)
+        self.jobs.clear()
+
+
+# ── Process-wide table ────────────────────────────────────────────────────────
+_TABLE: JobTable | None = None
+
+
+def get_table(config: Config) -> JobTable:
+    global _TABLE
+    if _TABLE is None:
+        _TABLE = JobTable(
+            Path(config["kali_job_dir"]),
+            buffer_bytes=config.get("kali_job_buffer_kb", 256) * 1024,
+            retention=config.get("kali_job_retention", 50),
+            max_runtime=config.get("kali_job_max_runtime", 4 * 3600),
+        )
+        os.makedirs(_TABLE.spill_dir, exist_ok=True)
+    return _TABLE
+
+
+def close_all() -> None:
+    global _TABLE
+    if _TABLE is not None:
+        _TABLE.close_all()
+    _TABLE = None
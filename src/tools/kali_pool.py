@@ -0,0 +1,231 @@
+"""
+Persistent asyncssh connection pool for the Kali host (used by tools/kali.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+Connections are opened lazily on first use and kept alive with SSH
+keepalives. Each command runs as its own channel, multiplexed over a warm
+connection: a command goes to the least-busy live connection with a free
+channel slot, a new connection is opened only when every existing one is
+at KALI_SSH_MAX_CHANNELS, and callers wait once KALI_SSH_MAX_CONNECTIONS
+are all full. A connection that drops is discarded and the command is
+retried once on a fresh one, so callers never see a stale connection.
+
+The host key is always checked against KALI_KNOWN_HOSTS (~/.ssh/known_hosts
+by default); only KALI_SSH_SKIP_HOST_CHECK=true turns the check off.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
+import asyncssh
+
+import metrics
+from config import Config
+
+log = logging.getLogger("mcp-server.kali")
+
+# Errors that mean the connection (not the command) is broken
+_CONNECTION_ERRORS = (
+    asyncssh.ConnectionLost,
+    asyncssh.DisconnectError,
+    asyncssh.ChannelOpenError,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class _PooledConnection:
+    def __init__(self, conn: asyncssh.SSHClientConnection):
+        self.conn = conn
+        self.channels = 0
+
+    @property
+    def alive(self) -> bool:
+        return not self.conn.is_closed()
+
+
+class SSHPool:
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        client_keys: list[str],
+        known_hosts: str | None = None,
+        max_connections: int = 2,
+        max_channels: int = 8,
+        keepalive_interval: int = 30,
+        port: int = 22,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.client_keys = client_keys
+        self.known_hosts = known_hosts
+        self.max_connections = max_connections
+        self.max_channels = max_channels
+        self.keepalive_interval = keepalive_interval
+        self.connects = 0
+        self._conns: list[_PooledConnection] = []
+        self._opening = 0
+        self._cond = asyncio.Condition()
+
+    async def _connect(self) -> asyncssh.SSHClientConnection:
+        self.connects += 1
+        with metrics.timed("kali.ssh_connect"):
+            return await asyncssh.connect(
+                self.host,
+                port=self.port,
+                username=self.username,
+                client_keys=self.client_keys,
+                known_hosts=self.known_hosts,
+                keepalive_interval=self.keepalive_interval,
+                keepalive_count_max=3,
+            )
+
+    async def _acquire(self) -> _PooledConnection:
+        async with self._cond:
+            while True:
+                self._conns = [c for c in self._conns if c.alive or c.channels]
+                free = [c for c in self._conns if c.alive and c.channels < self.max_channels]
+                if free:
+                    pooled = min(free, key=lambda c: c.channels)
+                    pooled.channels += 1
+                    return pooled
+                if len(self._conns) + self._opening < self.max_connections:
+                    self._opening += 1
+                    break
+                await self._cond.wait()
+
+        # Connect outside the lock so other callers can use warm connections
+        try:
+            pooled = _PooledConnection(await self._connect())
+        finally:
+            async with self._cond:
+                self._opening -= 1
+                self._cond.notify_all()
+        pooled.channels = 1
+        async with self._cond:
+            self._conns.append(pooled)
+        return pooled
+
+    async def _release(self, pooled: _PooledConnection, broken: bool = False) -> None:
+        async with self._cond:
+            pooled.channels -= 1
+            if broken or not pooled.alive:
+                pooled.conn.close()
+                if pooled in self._conns and not pooled.channels:
+                    self._conns.remove(pooled)
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def connection(self):
+        """Yield a live connection with one channel slot reserved for the caller."""
+        pooled = await self._acquire()
+        broken = False
+        try:
+            yield pooled.conn
+        except _CONNECTION_ERRORS:
+            broken = True
+            raise
+        finally:
+            await self._release(pooled, broken)
+
+    async def run(self, command: str, timeout: float | None = None) -> asyncssh.SSHCompletedProcess:
+        """Run `command` on a pooled connection, reconnecting once if it has died."""
+        for attempt in (1, 2):
+            try:
+                async with self.connection() as conn:
+                    with metrics.timed("kali.ssh_run"):
+                        return await conn.run(command, check=False, timeout=timeout)
+            except _CONNECTION_ERRORS as e:
+                if attempt == 2:
+                    raise
+                log.warning("Kali SSH connection to %s lost (%r); reconnecting", self.host, e)
+
+    def stats(self) -> dict:
+        return {
+            "host": self.host,
+            "connections": sum(1 for c in self._conns if c.alive),
+            "channels_in_use": sum(c.channels for c in self._conns),
+            "connects_total": self.connects,
+        }
+
+    async def close(self) -> None:
+        conns, self._conns = self._conns, []
+        for pooled in conns:
+            pooled.conn.close()
+        for pooled in conns:
+            await pooled.conn.wait_closed()
+
+
+class HostScheduler:
+    """Assign runs to the least-loaded Kali host, at most `per_host` at a time each."""
+
+    def __init__(self, hosts: list[str], per_host: int):
+        self.in_flight = {host: 0 for host in hosts}
+        self.assigned = {host: 0 for host in hosts}
+        self.per_host = per_host
+        self._cond = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait for a host with spare capacity and yield its name."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: min(self.in_flight.values()) < self.per_host)
+            host = min(self.in_flight, key=lambda h: (self.in_flight[h], self.assigned[h]))
+            self.in_flight[host] += 1
+            self.assigned[host] += 1
+        try:
+            yield host
+        finally:
+            async with self._cond:
+                self.in_flight[host] -= 1
+                self._cond.notify()
+
+
+# ── Process-wide pools ────────────────────────────────────────────────────────
+# One pool per (host, port, user, key), bound to the loop that created it
+_POOLS: dict[tuple, SSHPool] = {}
+_POOL_LOOPS: dict[tuple, asyncio.AbstractEventLoop] = {}
+
+
+def get_pool(config: Config, host: str | None = None) -> SSHPool:
+    host = host or config["kali_host"]
+    key_path = os.path.expanduser(config["kali_ssh_key_path"])
+    key = (host, config.get("kali_ssh_port", 22), config["kali_user"], key_path)
+    loop = asyncio.get_running_loop()
+    if key not in _POOLS or _POOL_LOOPS[key] is not loop:
+        if config.get("kali_ssh_skip_host_check", False):
+            log.warning("KALI_SSH_SKIP_HOST_CHECK is set: not verifying the host key of %s", host)
+            known_hosts = None
+        else:
+            known_hosts = os.path.expanduser(config.get("kali_known_hosts") or "~/.ssh/known_hosts")
+            if not os.path.exists(known_hosts):
+                raise FileNotFoundError(
+                    f"known_hosts file {known_hosts} not found; add the host key of {host} "
+                    f"to it (ssh-keyscan) or set KALI_KNOWN_HOSTS"
+                )
+        _POOLS[key] = SSHPool(
+            host,
+            username=config["kali_user"],
+            client_keys=[key_path],
+            known_hosts=known_hosts,
+            max_connections=config.get("kali_ssh_max_connections", 2),
+            max_channels=config.get("kali_ssh_max_channels", 8),
+            keepalive_interval=config.get("kali_ssh_keepalive", 30),
+            port=config.get("kali_ssh_port", 22),
+        )
+        _POOL_LOOPS[key] = loop
+    return _POOLS[key]
+
+
+def close_all() -> None:
+    """Close every pooled connection (called on server exit)."""
+    for pool in _POOLS.values():
+        for pooled in pool._conns:
+            pooled.conn.close()
+    _POOLS.clear()
+    _POOL_LOOPS.clear()
@@ -0,0 +1,209 @@
+"""
+Structured nmap results and a local scan-results store (used by tools/kali.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+parse_nmap_xml turns `nmap -oX -` output into a compact dict of hosts, ports
+and services. ResultStore saves parsed scans to SQLite with indexes on host,
+port and service/product, so kali_query_results can answer questions like
+"hosts with 443 open running nginx" without rescanning.
+"""
+
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from config import Config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id        INTEGER PRIMARY KEY,
+    tool      TEXT NOT NULL,
+    command   TEXT NOT NULL,
+    target    TEXT NOT NULL,
+    kali_host TEXT,
+    scanned   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hosts (
+    scan_id  INTEGER NOT NULL REFERENCES scans (id) ON DELETE CASCADE,
+    address  TEXT NOT NULL,
+    hostname TEXT,
+    state    TEXT
+);
+CREATE TABLE IF NOT EXISTS ports (
+    scan_id   INTEGER NOT NULL REFERENCES scans (id) ON DELETE CASCADE,
+    address   TEXT NOT NULL,
+    hostname  TEXT,
+    port      INTEGER NOT NULL,
+    protocol  TEXT NOT NULL,
+    state     TEXT NOT NULL,
+    service   TEXT,
+    product   TEXT,
+    version   TEXT
+);
+DROP INDEX IF EXISTS hosts_address;   -- superseded by hosts_latest
+CREATE INDEX IF NOT EXISTS hosts_latest   ON hosts (address, scan_id);
+CREATE INDEX IF NOT EXISTS ports_address  ON ports (address);
+CREATE INDEX IF NOT EXISTS ports_port     ON ports (port, state);
+CREATE INDEX IF NOT EXISTS ports_service  ON ports (service COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS ports_product  ON ports (product COLLATE NOCASE);
+"""
+
+
+# ── Parsing ───────────────────────────────────────────────────────────────────
+def parse_nmap_xml(xml: str) -> dict:
+    """Reduce nmap XML to {"hosts": [...], "summary": {...}}; ports keep only key fields."""
+    root = ET.fromstring(xml)
+    hosts = []
+    for host in root.iter("host"):
+        address = next(
+            (a.get("addr") for a in host.findall("address") if a.get("addrtype") != "mac"), None
+        )
+        names = [h.get("name") for h in host.findall("hostnames/hostname")]
+        status = host.find("status")
+        ports = []
+        for port in host.findall("ports/port"):
+            state = port.find("state")
+            service = port.find("service")
+            entry = {
+                "port": int(port.get("portid")),
+                "protocol": port.get("protocol"),
+                "state": state.get("state") if state is not None else "unknown",
+            }
+            if service is not None:
+                for key, attr in (("service", "name"), ("product", "product"), ("version", "version")):
+                    if service.get(attr):
+                        entry[key] = service.get(attr)
+            ports.append(entry)
+        hosts.append({
+            "address": address,
+            "hostnames": names,
+            "state": status.get("state") if status is not None else "unknown",
+            "ports": ports,
+        })
+    finished = root.find("runstats/finished")
+    return {
+        "hosts": hosts,
+        "summary": {
+            "hosts_up": sum(1 for h in hosts if h["state"] == "up"),
+            "open_ports": sum(1 for h in hosts for p in h["ports"] if p["state"] == "open"),
+            "elapsed_s": float(finished.get("elapsed")) if finished is not None else None,
+        },
+    }
+
+
+# ── Store ─────────────────────────────────────────────────────────────────────
+class ResultStore:
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(_SCHEMA)
+
+    def save(self, tool: str, command: str, target: str, kali_host: str, parsed: dict) -> int:
+        with self._lock, self._db:
+            scan_id = self._db.execute(
+                "INSERT INTO scans (tool, command, target, kali_host, scanned) VALUES (?, ?, ?, ?, ?)",
+                (tool, command, target, kali_host, time.time()),
+            ).lastrowid
+            for host in parsed["hosts"]:
+                hostname = host["hostnames"][0] if host["hostnames"] else None
+                self._db.execute(
+                    "INSERT INTO hosts VALUES (?, ?, ?, ?)",
+                    (scan_id, host["address"], hostname, host["state"]),
+                )
+                self._db.executemany(
+                    "INSERT INTO ports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (scan_id, host["address"], hostname, p["port"], p["protocol"], p["state"],
+                         p.get("service"), p.get("product"), p.get("version"))
+                        for p in host["ports"]
+                    ],
+                )
+        return scan_id
+
+    def query(
+        self,
+        host: str | None = None,
+        port: int | None = None,
+        protocol: str | None = None,
+        state: str | None = "open",
+        service: str | None = None,
+        latest_only: bool = True,
+        limit: int = 500,
+    ) -> list[dict]:
+        """Filter stored ports. `service` matches service name or product (substring).
+
+        With latest_only, each host is answered from its most recent scan
+        only. nmap lists just the ports it found (closed and filtered ones
+        are summarised in <extraports>), so a port missing from that scan is
+        not reported from an older one. A host's latest scan stands for it
+        even if it probed fewer ports than earlier scans did.
+        """
+        where, params = [], []
+        if host:
+            where.append("(ports.address = ? OR ports.hostname = ?)")
+            params += [host, host]
+        if port is not None:
+            where.append("ports.port = ?")
+            params.append(port)
+        if protocol:
+            where.append("ports.protocol = ?")
+            params.append(protocol)
+        if state:
+            where.append("ports.state = ?")
+            params.append(state)
+        if service:
+            where.append("(ports.service LIKE ? OR ports.product LIKE ?)")
+            params += [f"%{service}%", f"%{service}%"]
+
+        # Scan ids only grow, so the highest one per address is its latest scan.
+        # hosts has a row for every host a scan saw, even one with no ports listed
+        latest = """
+            JOIN (SELECT address, MAX(scan_id) AS scan_id FROM hosts GROUP BY address) AS latest
+              ON latest.address = ports.address AND latest.scan_id = ports.scan_id
+        """ if latest_only else ""
+        sql = f"""
+            SELECT ports.address, ports.hostname, ports.port, ports.protocol, ports.state,
+                   ports.service, ports.product, ports.version, ports.scan_id, scans.scanned
+            FROM ports JOIN scans ON scans.id = ports.scan_id
+            {latest}
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY ports.address, ports.port
+            LIMIT ?
+        """
+        params.append(limit)
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+_STORE: ResultStore | None = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store(config: Config) -> ResultStore:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = ResultStore(Path(config["kali_results_db"]))
+        return _STORE
+
+
+def close() -> None:
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is not None:
+            _STORE.close()
+        _STORE = None
@@ -9,47 +9,106 @@ Dependencies (add to requirements.txt when ready):
 
 Install:
     pip install pymupdf pdfplumber pypdf reportlab
+
+Sources:
+  pdf_read and pdf_extract_tables take either a local path or a
+  drive_file_id. A Drive PDF is fetched through the gdrive content cache and
+  opened from memory — no temp file. Google Docs are exported as PDF first.
+
+Forms:
+  pdf_fill_form_batch parses a template once per worker process and fills
+  it for each record in pdf_engine's pool (tools/pdf_forms.py).
+
+Search:
+  pdf_index keeps a SQLite FTS5 index of page text up to date, re-extracting
+  only files whose size or mtime changed; pdf_search queries it without
+  touching the PDFs (tools/pdf_index.py).
 """
 
 from mcp import types
 from config import Config
 
-# TODO: uncomment when dependencies are installed
-# import fitz          # pymupdf
-# import pdfplumber
-# from pypdf import PdfReader, PdfWriter
+from tools import pdf_cache, pdf_engine, pdf_forms, pdf_index, to_json
+from tools.pdf_engine import MemoryPDF, Source
+
+# Handlers only coordinate: text extraction fans out to pdf_engine's own
+# process pool, so the dispatch side is a thread pool
+EXECUTOR = "io"
+MAX_WORKERS = 4
 
 TOOLS: list[types.Tool] = [
     types.Tool(
         name="pdf_read",
-        description="Extract all text from a PDF file.",
+        description=(
+            "Extract text from a PDF file. Extracts every page unless "
+            "pages or page_range is given."
+        ),
         inputSchema={
             "type": "object",
             "properties": {
-                "path": {"type": "string", "description": "Absolute path to the PDF file."}
+                "path": {"type": "string", "description": "Absolute path to the PDF file."},
+                "drive_file_id": {
+                    "type": "string",
+                    "description": "Read a PDF (or Google Doc, exported as PDF) from Drive instead of path.",
+                },
+                "pages": {
+                    "type": "array",
+                    "items": {"type": "integer"},
+                    "description": "Page numbers (1-indexed) to extract.",
+                },
+                "page_range": {
+                    "type": "string",
+                    "description": "Inclusive 1-indexed range, e.g. '10-20' or '100-'.",
+                },
+                "no_cache": {
+                    "type": "boolean",
+                    "description": "Bypass the extraction cache for this call.",
+                    "default": False,
+                },
             },
-            "required": ["path"],
+            "required": [],
         },
     ),
     types.Tool(
         name="pdf_extract_tables",
-        description="Extract tables from a PDF and return them as JSON.",
+        description=(
+            "Extract tables from a PDF and return them as JSON. Pages without ruling "
+            "lines are skipped cheaply; only pages that can hold a table are parsed."
+        ),
         inputSchema={
             "type": "object",
             "properties": {
                 "path": {"type": "string"},
+                "drive_file_id": {
+                    "type": "string",
+                    "description": "Read a PDF (or Google Doc, exported as PDF) from Drive instead of path.",
+                },
                 "pages": {
                     "type": "array",
                     "items": {"type": "integer"},
                     "description": "Page numbers (1-indexed). Omit for all pages.",
                 },
+                "engine": {
+                    "type": "string",
+                    "enum": list(pdf_engine.TABLE_ENGINES),
+                    "default": "auto",
+                    "description": (
+                        "auto: pymupdf find_tables, falling back to pdfplumber when its "
+                        "result looks incomplete; pymupdf: fastest; pdfplumber: reference."
+                    ),
+                },
+                "no_cache": {
+                    "type": "boolean",
+                    "description": "Bypass the extraction cache for this call.",
+                    "default": False,
+                },
             },
-            "required": ["path"],
+            "required": [],
         },
     ),
     types.Tool(
         name="pdf_fill_form",
-        description="Fill AcroForm fields in a PDF and save to a new file.",
+        description="Fill AcroForm fields (on every page) in a PDF and save to a new file.",
         inputSchema={
             "type": "object",
             "properties": {
@@ -63,41 +122,224 @@ TOOLS: list[types.Tool] = [
             "required": ["input_path", "output_path", "fields"],
         },
     ),
+    types.Tool(
+        name="pdf_fill_form_batch",
+        description=(
+            "Fill one AcroForm template once per record, writing a PDF per record to "
+            "output_dir. Records come inline or from a CSV/JSONL file; keys are field "
+            "names. Failed records are listed with their errors; the rest are written."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "template_path": {"type": "string"},
+                "output_dir": {"type": "string"},
+                "records": {
+                    "type": "array",
+                    "items": {"type": "object"},
+                    "description": "field_name -> value dicts, one per output file.",
+                },
+                "records_path": {
+                    "type": "string",
+                    "description": "CSV (header row = field names) or JSONL file instead of records.",
+                },
+                "output_name": {
+                    "type": "string",
+                    "default": "{index:05d}.pdf",
+                    "description": "File name pattern; {index} is the 1-based record number, "
+                                   "other {placeholders} are record keys, e.g. 'letter-{hostname}.pdf'.",
+                },
+            },
+            "required": ["template_path", "output_dir"],
+        },
+    ),
+    types.Tool(
+        name="pdf_index",
+        description=(
+            "Add PDFs to the full-text search index used by pdf_search, or bring it up to "
+            "date. Walks directory trees; only new or modified files are re-extracted, "
+            "and files deleted from a walked directory are dropped."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "paths": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "PDF files and directories to index. Omit for PDF_INDEX_ROOTS.",
+                },
+                "prune": {
+                    "type": "boolean",
+                    "description": "Drop indexed files that no longer exist under the given directories.",
+                    "default": True,
+                },
+            },
+            "required": [],
+        },
+    ),
+    types.Tool(
+        name="pdf_search",
+        description=(
+            "Search the text of every indexed PDF (see pdf_index) and return ranked "
+            "matches as file, page and snippet, best first. Supports FTS5 syntax: "
+            "\"exact phrase\", OR, NOT, prefix*, NEAR(a b, 10)."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string"},
+                "limit": {
+                    "type": "integer",
+                    "default": 20,
+                    "description": f"Maximum matching pages (at most {pdf_index.MAX_RESULTS}).",
+                },
+                "path_prefix": {
+                    "type": "string",
+                    "description": "Only search files under this directory.",
+                },
+            },
+            "required": ["query"],
+        },
+    ),
+    types.Tool(
+        name="pdf_cache_stats",
+        description="Report hit/miss counts and size of the PDF extraction cache.",
+        inputSchema={"type": "object", "properties": {}, "required": []},
+    ),
 ]
 
 
-async def handle(name: str, args: dict, config: Config) -> str:
+def handle(name: str, args: dict, config: Config) -> str:
     if name == "pdf_read":
-        return _pdf_read(args["path"])
+        return _pdf_read(
+            _source(args, config), args.get("pages"), args.get("page_range"),
+            args.get("no_cache", False), config,
+        )
     if name == "pdf_extract_tables":
-        return _pdf_extract_tables(args["path"], args.get("pages"))
+        return _pdf_extract_tables(
+            _source(args, config), args.get("pages"), args.get("engine", "auto"),
+            args.get("no_cache", False), config,
+        )
     if name == "pdf_fill_form":
         return _pdf_fill_form(args["input_path"], args["output_path"], args["fields"])
+    if name == "pdf_fill_form_batch":
+        return _pdf_fill_form_batch(args, config)
+    if name == "pdf_index":
+        return _pdf_index(args, config)
+    if name == "pdf_search":
+        result = pdf_index.get_index(config).search(
+            args["query"], args.get("limit", 20), args.get("path_prefix"),
+        )
+        return to_json(result)
+    if name == "pdf_cache_stats":
+        return to_json(pdf_cache.get_cache(config).stats())
     raise ValueError(f"pdf module cannot handle tool: {name}")
 
 
-def _pdf_read(path: str) -> str:
-    # doc = fitz.open(path)
-    # text = "\n\n".join(page.get_text() for page in doc)
-    # return text
-    raise NotImplementedError("Install pymupdf and uncomment the implementation")
+def _source(args: dict, config: Config) -> Source:
+    """The PDF named by exactly one of path and drive_file_id."""
+    if bool(args.get("path")) == bool(args.get("drive_file_id")):
+        raise ValueError("Pass exactly one of path and drive_file_id")
+    if args.get("path"):
+        return args["path"]
+    # Imported here so local-only PDF use never loads the Drive client
+    from tools import gdrive
+
+    meta, data = gdrive.read_content(args["drive_file_id"], config, "application/pdf")
+    return MemoryPDF(f"drive:{meta['id']}:{meta['validator']}", data)
+
+
+def _cached_pages(
+    source: Source, kind: str, pages: list[int], no_cache: bool, config: Config, extract
+) -> list[str]:
+    """Return per-page values for `pages`, extracting only the cache misses.
+
+    extract(source, missing_pages) -> list[str] in the order of missing_pages.
+    """
+    if no_cache:
+        return extract(source, pages)
+    cache = pdf_cache.get_cache(config)
+    key = cache.doc_key(source)
+    found = cache.get_many(key, kind, pages)
+    missing = [p for p in pages if p not in found]
+    if missing:
+        fresh = dict(zip(missing, extract(source, missing)))
+        cache.put_many(key, kind, fresh)
+        found.update(fresh)
+    return [found[p] for p in pages]
+
+
+def _page_count(source: Source, no_cache: bool, config: Config) -> int:
+    (count,) = _cached_pages(
+        source, "page_count", [0], no_cache, config,
+        lambda p, _: [str(pdf_engine.page_count(p))],
+    )
+    return int(count)
+
 
+def _pdf_read(
+    source: Source, pages: list[int] | None, page_range: str | None,
+    no_cache: bool, config: Config,
+) -> str:
+    targets = pdf_engine.resolve_pages(_page_count(source, no_cache, config), pages, page_range)
+    workers = config.get("pdf_extract_workers", 0)
+    texts = _cached_pages(
+        source, "text", targets, no_cache, config,
+        lambda p, missing: pdf_engine.extract_text(p, missing, workers),
+    )
+    return "\n\n".join(texts)
 
-def _pdf_extract_tables(path: str, pages: list[int] | None) -> str:
-    # import json
-    # with pdfplumber.open(path) as pdf:
-    #     target_pages = [pdf.pages[i - 1] for i in pages] if pages else pdf.pages
-    #     tables = [page.extract_tables() for page in target_pages]
-    # return json.dumps(tables)
-    raise NotImplementedError("Install pdfplumber and uncomment the implementation")
+
+def _pdf_extract_tables(
+    source: Source, pages: list[int] | None, engine: str, no_cache: bool, config: Config
+) -> str:
+    targets = pdf_engine.resolve_pages(_page_count(source, no_cache, config), pages)
+    workers = config.get("pdf_extract_workers", 0)
+    # pdfplumber results keep the cache kind they had before engines existed
+    kind = "tables" if engine == "pdfplumber" else f"tables:{engine}"
+    tables = _cached_pages(
+        source, kind, targets, no_cache, config,
+        lambda p, missing: pdf_engine.extract_tables(p, missing, workers, engine),
+    )
+    return "[" + ",".join(tables) + "]"
 
 
 def _pdf_fill_form(input_path: str, output_path: str, fields: dict) -> str:
-    # reader = PdfReader(input_path)
-    # writer = PdfWriter()
-    # writer.append(reader)
-    # writer.update_page_form_field_values(writer.pages[0], fields)
-    # with open(output_path, "wb") as f:
-    #     writer.write(f)
-    # return f"Form filled and saved to {output_path}"
-    raise NotImplementedError("Install pypdf and uncomment the implementation")
+    unknown = pdf_forms.fill_file(input_path, output_path, fields)
+    note = f" (no such fields: {', '.join(unknown)})" if unknown else ""
+    return f"Form filled and saved to {output_path}{note}"
+
+
+def _pdf_fill_form_batch(args: dict, config: Config) -> str:
+    if bool(args.get("records")) == bool(args.get("records_path")):
+        raise ValueError("Pass exactly one of records and records_path")
+    records, lines = args.get("records"), None
+    if not records:
+        records, lines = pdf_forms.load_records(args["records_path"])
+    result = pdf_forms.fill_batch(
+        args["template_path"],
+        records,
+        args["output_dir"],
+        args.get("output_name") or "{index:05d}.pdf",
+        workers=config.get("pdf_extract_workers", 0),
+        lines=lines,
+    )
+    return to_json(result)
+
+
+def _pdf_index(args: dict, config: Config) -> str:
+    roots = args.get("paths") or config.get("pdf_index_roots")
+    if not roots:
+        raise ValueError("Pass paths, or set PDF_INDEX_ROOTS")
+    index = pdf_index.get_index(config)
+    result = index.update(
+        roots, config, config.get("pdf_extract_workers", 0), args.get("prune", True),
+    )
+    result["index"] = index.stats()
+    return to_json(result)
+
+
+def shutdown() -> None:
+    pdf_engine.shutdown()
+    pdf_index.close()
+    pdf_cache.close()
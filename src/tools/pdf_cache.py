@@ -0,0 +1,110 @@
+"""
+Persistent per-page cache for PDF extraction results (used by tools/pdf.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+Entries live in a single SQLite file and are keyed by
+(document key, kind, page), so pages extracted by an earlier full read are
+reused by a later page-range request. The document key is derived from the
+file's identity — resolved path + size + mtime, or the key of an in-memory
+PDF — or, with PDF_CACHE_HASH enabled, from a SHA-256 of its content so
+that copies share entries and a touched-but-unchanged file stays cached.
+
+Storage, compression and LRU eviction past PDF_CACHE_MAX_MB come from
+tools/blob_store.py.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+from config import Config
+from tools import pdf_engine
+from tools.blob_store import BlobStore, Shared
+
+# Content digests remembered by file identity (PDF_CACHE_HASH), most recent kept
+MAX_DIGESTS = 4096
+
+
+class PageCache(BlobStore):
+    TABLE = "pages"
+    KEY_COLUMNS = ("doc_key TEXT", "kind TEXT", "page INTEGER")
+
+    def __init__(self, path: Path, max_bytes: int, content_hash: bool = False):
+        super().__init__(path, max_bytes)
+        self.content_hash = content_hash
+        self._digests: "OrderedDict[tuple[str, int, int], str]" = OrderedDict()
+
+    # ── Keys ──────────────────────────────────────────────────────────────────
+    def doc_key(self, source: "pdf_engine.Source") -> str:
+        memory = isinstance(source, pdf_engine.MemoryPDF)
+        if memory:
+            identity = (f"memory:{source.key}", len(source.data), 0)
+        else:
+            real = os.path.realpath(source)
+            st = os.stat(real)
+            identity = (real, st.st_size, st.st_mtime_ns)
+        if not self.content_hash:
+            return hashlib.sha1(repr(identity).encode()).hexdigest()
+
+        with self._lock:
+            digest = self._digests.get(identity)
+            if digest is not None:
+                self._digests.move_to_end(identity)
+                return digest
+        h = hashlib.sha256()
+        if memory:
+            h.update(source.data)
+        else:
+            with open(real, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+        digest = h.hexdigest()
+        with self._lock:
+            self._digests[identity] = digest
+            while len(self._digests) > MAX_DIGESTS:
+                self._digests.popitem(last=False)
+        return digest
+
+    # ── Reads / writes ────────────────────────────────────────────────────────
+    def get_many(self, doc_key: str, kind: str, pages: list[int]) -> dict[int, str]:
+        """Return {page: value} for the cached subset of `pages`."""
+        found: dict[int, str] = {}
+        with self._lock:
+            for start in range(0, len(pages), 500):
+                batch = pages[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT page, value FROM pages WHERE doc_key = ? AND kind = ? "
+                    f"AND page IN ({','.join('?' * len(batch))})",
+                    (doc_key, kind, *batch),
+                ).fetchall()
+                found.update((page, self._unpack(value).decode()) for page, value in rows)
+            self._touch([(doc_key, kind, page) for page in found])
+            self.hits += len(found)
+            self.misses += len(pages) - len(found)
+        return found
+
+    def put_many(self, doc_key: str, kind: str, values: dict[int, str]) -> None:
+        packed = self._pack([(doc_key, kind, page, value.encode()) for page, value in values.items()])
+        with self._lock:
+            self._write(packed)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "content_hash": self.content_hash}
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+_SHARED: Shared[PageCache] = Shared()
+
+
+def get_cache(config: Config) -> PageCache:
+    return _SHARED.get(lambda: PageCache(
+        Path(config["pdf_cache_dir"]) / "pages.sqlite3",
+        max_bytes=config.get("pdf_cache_max_mb", 512) * 1024 * 1024,
+        content_hash=config.get("pdf_cache_hash", False),
+    ))
+
+
+def close() -> None:
+    _SHARED.close()
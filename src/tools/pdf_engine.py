@@ -0,0 +1,278 @@
+"""
+Page-parallel PDF text extraction engine (used by tools/pdf.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+The requested pages are split into contiguous chunks and extracted in a
+process pool. Each worker keeps the documents it has opened, so a worker
+opens a given file once no matter how many chunks it is handed. Results are
+reassembled in page order by the caller.
+
+Small requests skip the pool entirely: below PARALLEL_MIN_PAGES the IPC
+round trip costs more than it saves.
+
+Tables are found in two stages. A pre-pass reads each page's vector
+drawings, which takes about a millisecond. Only pages with at least two
+horizontal and two vertical rulings can hold a table under the "lines"
+strategy that pdfplumber and pymupdf both default to, so only those go on
+to stage two. There, the "auto" engine tries pymupdf's find_tables and
+keeps its result when it looks complete. It falls back to pdfplumber,
+the slow and reference engine, otherwise. Stage two runs in the same
+process pool once there are TABLES_PARALLEL_MIN_PAGES flagged pages.
+
+A source is a file path or a MemoryPDF — bytes already in memory, such as
+a Drive download — which is opened from the buffer without a temp file.
+A MemoryPDF's bytes travel to each worker with its chunk, so it is split
+into one chunk per worker rather than CHUNKS_PER_WORKER.
+"""
+
+import io
+import json
+import multiprocessing
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import pymupdf
+
+PARALLEL_MIN_PAGES = 64
+TABLES_PARALLEL_MIN_PAGES = 4
+CHUNKS_PER_WORKER = 4
+WORKER_MAX_OPEN_DOCS = 4
+
+TABLE_ENGINES = ("auto", "pymupdf", "pdfplumber")
+# "auto" keeps a find_tables result only if at most this share of cells is empty
+AUTO_MAX_EMPTY_CELLS = 0.25
+
+# find_tables prints a one-time hint to stdout, which is the MCP channel under stdio
+if hasattr(pymupdf, "no_recommend_layout"):
+    pymupdf.no_recommend_layout()
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+
+
+class MemoryPDF:
+    """PDF bytes held in memory. `key` must change whenever the bytes do."""
+
+    def __init__(self, key: str, data: bytes):
+        self.key = key
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"MemoryPDF({self.key!r}, {len(self.data)} bytes)"
+
+
+Source = str | MemoryPDF
+
+
+def open_pdf(source: Source) -> "pymupdf.Document":
+    if isinstance(source, MemoryPDF):
+        return pymupdf.open(stream=source.data, filetype="pdf")
+    return pymupdf.open(source)
+
+
+# ── Page selection ────────────────────────────────────────────────────────────
+def page_count(source: Source) -> int:
+    with open_pdf(source) as doc:
+        return doc.page_count
+
+
+def resolve_pages(
+    total: int, pages: list[int] | None = None, page_range: str | None = None
+) -> list[int]:
+    """Return the 1-indexed pages to extract, in order, without duplicates.
+
+    pages      — explicit page numbers, e.g. [1, 5, 9]
+    page_range — "10-20", "10-" (to the end), "-5" (from the start) or "7"
+    Omit both for every page.
+    """
+    selected: list[int] = []
+    if pages:
+        selected.extend(pages)
+    if page_range:
+        match = re.fullmatch(r"\s*(\d*)\s*(?:-\s*(\d*))?\s*", page_range)
+        if not match or not (match.group(1) or match.group(2)):
+            raise ValueError(f"Invalid page_range: '{page_range}' (expected e.g. '10-20')")
+        start = int(match.group(1)) if match.group(1) else 1
+        if match.group(2):
+            end = int(match.group(2))
+        elif "-" in page_range:
+            end = total
+        else:
+            end = start
+        selected.extend(range(start, end + 1))
+    if not pages and not page_range:
+        return list(range(1, total + 1))
+
+    out_of_range = [p for p in selected if p < 1 or p > total]
+    if out_of_range:
+        raise ValueError(f"Pages out of range 1-{total}: {sorted(set(out_of_range))[:10]}")
+    return list(dict.fromkeys(selected))
+
+
+def _chunk(pages: list[int], chunks: int) -> list[list[int]]:
+    size = max(1, -(-len(pages) // chunks))
+    return [pages[i:i + size] for i in range(0, len(pages), size)]
+
+
+# ── Worker side ───────────────────────────────────────────────────────────────
+# Per-process cache of open documents: path or MemoryPDF key → (identity, doc)
+_OPEN_DOCS: "OrderedDict[str, tuple[tuple, pymupdf.Document]]" = OrderedDict()
+
+
+def _open_cached(source: Source) -> "pymupdf.Document":
+    if isinstance(source, MemoryPDF):
+        # The key already changes with the content
+        key, identity = f"memory:{source.key}", ()
+    else:
+        st = os.stat(source)
+        key, identity = source, (st.st_size, st.st_mtime_ns)
+    cached = _OPEN_DOCS.get(key)
+    if cached and cached[0] == identity:
+        _OPEN_DOCS.move_to_end(key)
+        return cached[1]
+    if cached:
+        cached[1].close()
+    doc = open_pdf(source)
+    _OPEN_DOCS[key] = (identity, doc)
+    while len(_OPEN_DOCS) > WORKER_MAX_OPEN_DOCS:
+        _, (_, old) = _OPEN_DOCS.popitem(last=False)
+        old.close()
+    return doc
+
+
+def _extract_chunk(source: Source, pages: list[int]) -> list[str]:
+    doc = _open_cached(source)
+    return [doc[p - 1].get_text() for p in pages]
+
+
+# ── Tables ────────────────────────────────────────────────────────────────────
+def _may_have_table(page: "pymupdf.Page") -> bool:
+    """True if the page has enough horizontal and vertical rulings to form a cell."""
+    horizontal = vertical = 0
+    for drawing in page.get_drawings():
+        for item in drawing["items"]:
+            if item[0] == "l":
+                p1, p2 = item[1], item[2]
+                horizontal += abs(p1.y - p2.y) < 1
+                vertical += abs(p1.x - p2.x) < 1
+            elif item[0] in ("re", "qu"):
+                rect = item[1] if item[0] == "re" else item[1].rect
+                # A rectangle has two edges each way; a hairline rule has one
+                horizontal += 2 if rect.height >= 1 else 1
+                vertical += 2 if rect.width >= 1 else 1
+        if horizontal >= 2 and vertical >= 2:
+            return True
+    return False
+
+
+def table_candidates(source: Source, pages: list[int]) -> list[int]:
+    """Stage one: the subset of `pages` that may contain a ruled table."""
+    with open_pdf(source) as doc:
+        return [p for p in pages if _may_have_table(doc[p - 1])]
+
+
+def _good_enough(tables: list[list[list]]) -> bool:
+    cells = [cell for table in tables for row in table for cell in row]
+    if not cells:
+        return False
+    empty = sum(1 for cell in cells if cell is None or cell == "")
+    return empty / len(cells) <= AUTO_MAX_EMPTY_CELLS
+
+
+def _tables_on_pages(
+    doc: "pymupdf.Document", source: Source, pages: list[int], engine: str
+) -> list[str]:
+    """Stage two for flagged pages: one JSON list of tables per page."""
+    import pdfplumber   # only loaded where stage two actually runs
+
+    results: dict[int, list] = {}
+    if engine != "pdfplumber":
+        for p in pages:
+            tables = [t.extract() for t in doc[p - 1].find_tables().tables]
+            if engine == "pymupdf" or _good_enough(tables):
+                results[p] = tables
+    rest = [p for p in pages if p not in results]
+    if rest:
+        stream = io.BytesIO(source.data) if isinstance(source, MemoryPDF) else source
+        with pdfplumber.open(stream) as pdf:
+            for p in rest:
+                results[p] = pdf.pages[p - 1].extract_tables()
+    return [json.dumps(results[p]) for p in pages]
+
+
+def _tables_chunk(source: Source, pages: list[int], engine: str) -> list[str]:
+    return _tables_on_pages(_open_cached(source), source, pages, engine)
+
+
+def extract_tables(
+    source: Source, pages: list[int], workers: int = 0, engine: str = "auto"
+) -> list[str]:
+    """Return each page's tables as a JSON list (of rows of cells), in page order."""
+    if engine not in TABLE_ENGINES:
+        raise ValueError(f"Unknown table engine {engine!r}; expected one of {TABLE_ENGINES}")
+    flagged = table_candidates(source, pages)
+    found: dict[int, str] = {}
+    workers = workers or default_workers()
+    if flagged and (workers == 1 or len(flagged) < TABLES_PARALLEL_MIN_PAGES):
+        with open_pdf(source) as doc:
+            found.update(zip(flagged, _tables_on_pages(doc, source, flagged, engine)))
+    elif flagged:
+        pool = get_pool(workers)
+        per_worker = 1 if isinstance(source, MemoryPDF) else CHUNKS_PER_WORKER
+        chunks = _chunk(flagged, workers * per_worker)
+        futures = [pool.submit(_tables_chunk, source, chunk, engine) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            found.update(zip(chunk, future.result()))
+    return [found.get(p, "[]") for p in pages]
+
+
+# ── Parent side ───────────────────────────────────────────────────────────────
+def get_pool(workers: int = 0) -> ProcessPoolExecutor:
+    """The shared PDF process pool (also used by tools/pdf_forms.py and tools/pdf_index.py).
+
+    Sized by the first caller (`workers`, or default_workers()) and kept until
+    shutdown(). A later call asking for another size still gets this pool:
+    replacing it would cancel work other threads have already submitted.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # spawn, not fork: callers run inside the server's executor threads
+            _POOL = ProcessPoolExecutor(
+                max_workers=workers or default_workers(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _POOL
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def extract_text(source: Source, pages: list[int], workers: int = 0) -> list[str]:
+    """Extract the text of `pages` (1-indexed), returned in the same order."""
+    workers = workers or default_workers()
+    if workers == 1 or len(pages) < PARALLEL_MIN_PAGES:
+        with open_pdf(source) as doc:
+            return [doc[p - 1].get_text() for p in pages]
+
+    pool = get_pool(workers)
+    per_worker = 1 if isinstance(source, MemoryPDF) else CHUNKS_PER_WORKER
+    chunks = _chunk(pages, workers * per_worker)
+    futures = [pool.submit(_extract_chunk, source, chunk) for chunk in chunks]
+    texts: list[str] = []
+    for future in futures:
+        texts.extend(future.result())
+    return texts
+
+
+def shutdown() -> None:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+        _POOL = None
@@ -0,0 +1,244 @@
+"""
+AcroForm filling, single and batch (used by tools/pdf.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+A Template is a parsed form plus its field map (field name → pages with a
+widget for it), so filling touches only the pages that hold the record's
+fields. Every page is filled, not just the first.
+
+fill_batch splits the records into chunks for pdf_engine's process pool.
+Each worker parses a template once and keeps it while its size and mtime
+are unchanged, then clones it for every record it is handed. A record
+that fails is reported by index (and, for a records file, line) with its
+error and the rest of the batch carries on. That includes records that
+can't be used at all: a malformed JSONL line, a CSV row with more fields
+than the header, a record that is not an object, or one the output_name
+pattern can't be formatted with. Small batches run in the calling thread.
+"""
+
+import csv
+import json
+import logging
+import os
+import string
+import time
+from collections import OrderedDict
+from concurrent.futures import as_completed
+from pathlib import Path
+
+from pypdf import PdfReader, PdfWriter
+
+from tools import pdf_engine, report_progress
+
+BATCH_CHUNK = 50
+PARALLEL_MIN_RECORDS = 2 * BATCH_CHUNK
+WORKER_MAX_TEMPLATES = 4
+
+# pypdf logs a warning per field when a form's default font has no resource
+logging.getLogger("pypdf").setLevel(logging.ERROR)
+
+
+class Template:
+    def __init__(self, path: str):
+        self.path = path
+        self.reader = PdfReader(path)
+        self.fields = set(self.reader.get_fields() or {})
+        self.pages_by_field: dict[str, set[int]] = {}
+        for index, page in enumerate(self.reader.pages):
+            for annot in page.get("/Annots") or []:
+                annot = annot.get_object()
+                name = annot.get("/T") or annot.get("/Parent", {}).get("/T")
+                if name is not None:
+                    self.pages_by_field.setdefault(str(name), set()).add(index)
+
+    def fill(self, values: dict, output_path: str) -> None:
+        writer = PdfWriter(clone_from=self.reader)
+        every_page = range(len(writer.pages))
+        # Names of nested fields are qualified ("a.b") but widgets carry the last part
+        pages = sorted({
+            i for name in values if name in self.fields
+            for i in self.pages_by_field.get(name, every_page)
+        })
+        if pages:
+            writer.update_page_form_field_values(
+                [writer.pages[i] for i in pages],
+                {name: str(value) for name, value in values.items() if name in self.fields},
+            )
+        # Write next to the target and rename, so a crash never leaves half a PDF
+        tmp = f"{output_path}.tmp"
+        with open(tmp, "wb") as f:
+            writer.write(f)
+        os.replace(tmp, output_path)
+
+
+def fill_file(input_path: str, output_path: str, values: dict) -> list[str]:
+    """Fill one form on every page; return record keys that matched no field."""
+    template = Template(input_path)
+    template.fill(values, output_path)
+    return sorted(set(values) - template.fields)
+
+
+# ── Records ───────────────────────────────────────────────────────────────────
+def load_records(path: str) -> tuple[list, list[int]]:
+    """Read records from a .csv (header row) or .jsonl (one object per line) file.
+
+    Returns the records and the line each one ends on. A line that isn't
+    valid JSON becomes a ValueError in its place, so fill_batch reports it
+    and fills the rest.
+    """
+    suffix = Path(path).suffix.lower()
+    records: list = []
+    lines: list[int] = []
+    with open(path, newline="", encoding="utf-8") as f:
+        if suffix == ".csv":
+            reader = csv.DictReader(f)
+            for row in reader:
+                records.append(row)
+                lines.append(reader.line_num)
+            return records, lines
+        if suffix in (".jsonl", ".ndjson"):
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError as e:
+                    records.append(ValueError(f"invalid JSON: {e}"))
+                lines.append(number)
+            return records, lines
+    raise ValueError(f"records_path must be .csv or .jsonl, got {path}")
+
+
+def _check_record(record) -> dict:
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError(f"record is a {type(record).__name__}, not an object")
+    if None in record:   # csv.DictReader's key for cells past the header
+        raise ValueError("row has more fields than the header")
+    return record
+
+
+def _output_name(pattern: str, record: dict, index: int, seen: set[str]) -> str:
+    try:
+        name = pattern.format_map({**record, "index": index})
+    except (KeyError, IndexError) as e:
+        raise ValueError(f"output_name needs {e}") from None
+    except (TypeError, AttributeError, ValueError) as e:
+        raise ValueError(f"output_name can't be formatted: {e}") from None
+    if not name or os.sep in name or "/" in name or name in (".", ".."):
+        raise ValueError(f"output name {name!r} is not a plain file name")
+    if name in seen:
+        raise ValueError(f"output name {name!r} repeats an earlier record's")
+    seen.add(name)
+    return name
+
+
+# ── Worker side ───────────────────────────────────────────────────────────────
+# Per-process cache of parsed templates: path → (size, mtime_ns, Template)
+_TEMPLATES: "OrderedDict[str, tuple[int, int, Template]]" = OrderedDict()
+
+
+def _template(path: str) -> Template:
+    st = os.stat(path)
+    cached = _TEMPLATES.get(path)
+    if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+        _TEMPLATES.move_to_end(path)
+        return cached[2]
+    template = Template(path)
+    _TEMPLATES[path] = (st.st_size, st.st_mtime_ns, template)
+    while len(_TEMPLATES) > WORKER_MAX_TEMPLATES:
+        _TEMPLATES.popitem(last=False)
+    return template
+
+
+def _fill_chunk(template_path: str, jobs: list[tuple[int, dict, str]]) -> list[dict]:
+    template = _template(template_path)
+    results = []
+    for index, values, output_path in jobs:
+        try:
+            template.fill(values, output_path)
+            results.append({"index": index, "path": output_path})
+        except Exception as e:
+            results.append({"index": index, "error": f"{type(e).__name__}: {e}"})
+    return results
+
+
+# ── Parent side ───────────────────────────────────────────────────────────────
+def _pattern_keys(pattern: str) -> set[str]:
+    return {field for _, field, _, _ in string.Formatter().parse(pattern) if field}
+
+
+def fill_batch(
+    template_path: str,
+    records: list,
+    output_dir: str,
+    output_name: str,
+    workers: int = 0,
+    lines: list[int] | None = None,
+) -> dict:
+    """Fill `template_path` once per record into `output_dir`; return a summary.
+
+    `lines`, from load_records, adds each failed record's line to its error.
+    """
+    started = time.monotonic()
+    template_path = os.path.realpath(template_path)
+    template = Template(template_path)   # parse up front: a bad template fails the call
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    errors: list[dict] = []
+    jobs: list[tuple[int, dict, str]] = []
+    seen: set[str] = set()
+    for index, record in enumerate(records, 1):
+        try:
+            record = _check_record(record)
+            jobs.append((index, record, str(out / _output_name(output_name, record, index, seen))))
+        except ValueError as e:
+            errors.append({"index": index, "error": str(e)})
+    unknown = sorted({str(key) for _, record, _ in jobs for key in record} - template.fields
+                     - _pattern_keys(output_name))
+
+    written = 0
+    chunks = [jobs[i:i + BATCH_CHUNK] for i in range(0, len(jobs), BATCH_CHUNK)]
+    workers = workers or pdf_engine.default_workers()
+    if workers == 1 or len(jobs) < PARALLEL_MIN_RECORDS:
+        for index, values, output_path in jobs:
+            try:
+                template.fill(values, output_path)
+                written += 1
+            except Exception as e:
+                errors.append({"index": index, "error": f"{type(e).__name__}: {e}"})
+            if index % BATCH_CHUNK == 0:
+                report_progress(index, len(records), f"{written} written")
+    else:
+        pool = pdf_engine.get_pool(workers)
+        futures = [pool.submit(_fill_chunk, template_path, chunk) for chunk in chunks]
+        done = 0
+        for future in as_completed(futures):
+            for result in future.result():
+                done += 1
+                if "error" in result:
+                    errors.append(result)
+                else:
+                    written += 1
+            report_progress(done, len(jobs), f"{written} written")
+
+    errors.sort(key=lambda e: e["index"])
+    if lines:
+        for error in errors:
+            error["line"] = lines[error["index"] - 1]
+    elapsed = time.monotonic() - started
+    return {
+        "template": template_path,
+        "fields": len(template.fields),
+        "records": len(records),
+        "written": written,
+        "failed": len(errors),
+        "output_dir": str(out),
+        "unknown_fields": unknown,
+        "seconds": round(elapsed, 2),
+        "records_per_s": round(len(records) / elapsed, 1) if elapsed else None,
+        "errors": errors,
+    }
@@ -0,0 +1,310 @@
+"""
+Full-text search index over local PDFs (used by tools/pdf.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+Page text lives in one SQLite file, with an FTS5 index over it for ranked
+search with snippets. update() walks the given files and directory trees
+and re-extracts only the files whose size or mtime changed since they were
+last indexed. Files that vanished from under a walked directory are
+dropped. A file that fails to open is recorded with its error and is not
+retried until it changes.
+
+Text comes through the same path as pdf_read. Pages already in the
+per-page extraction cache are reused. Anything else is extracted with
+pdf_engine in its process pool, one file per task, and written back to
+the cache, so indexing a file also warms pdf_read for it.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import as_completed
+from pathlib import Path
+
+from config import Config
+from tools import pdf_cache, pdf_engine, report_progress
+
+# Fewer changed files than this are extracted in the calling thread
+PARALLEL_MIN_FILES = 4
+MAX_RESULTS = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id         INTEGER PRIMARY KEY,
+    path       TEXT    NOT NULL UNIQUE,
+    size       INTEGER NOT NULL,
+    mtime_ns   INTEGER NOT NULL,
+    pages      INTEGER NOT NULL,
+    indexed_at REAL    NOT NULL,
+    error      TEXT
+);
+CREATE TABLE IF NOT EXISTS page_text (
+    id      INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files (id) ON DELETE CASCADE,
+    page    INTEGER NOT NULL,
+    text    TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS page_text_file ON page_text (file_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS page_fts USING fts5 (
+    text, content='page_text', content_rowid='id',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS page_text_ai AFTER INSERT ON page_text BEGIN
+    INSERT INTO page_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS page_text_ad AFTER DELETE ON page_text BEGIN
+    INSERT INTO page_fts (page_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+# ── Worker side ───────────────────────────────────────────────────────────────
+def _extract_file(path: str) -> list[str]:
+    with pdf_engine.open_pdf(path) as doc:
+        return [page.get_text() for page in doc]
+
+
+# ── Walking ───────────────────────────────────────────────────────────────────
+def _walk(roots: list[str]) -> tuple[dict[str, os.stat_result], list[str]]:
+    """Return ({realpath: stat} of every PDF under `roots`, the directories walked)."""
+    found: dict[str, os.stat_result] = {}
+    dirs: list[str] = []
+    for root in roots:
+        root = os.path.realpath(root)
+        if os.path.isfile(root):
+            found[root] = os.stat(root)
+            continue
+        if not os.path.isdir(root):
+            raise ValueError(f"No such file or directory: {root}")
+        dirs.append(root)
+        for parent, _, names in os.walk(root):
+            for name in names:
+                if name.lower().endswith(".pdf"):
+                    path = os.path.join(parent, name)
+                    try:
+                        found[path] = os.stat(path)
+                    except OSError:
+                        continue   # vanished or unreadable between listing and stat
+    return found, dirs
+
+
+def _like_prefix(directory: str) -> str:
+    escaped = directory.rstrip(os.sep).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + os.sep + "%"
+
+
+def _fts_quote(query: str) -> str:
+    """Turn free text into an FTS5 query that ANDs each word as a literal."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+class SearchIndex:
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        # Only one update() walks and writes at a time; searches carry on meanwhile
+        self._update_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(_SCHEMA)
+
+    # ── Indexing ──────────────────────────────────────────────────────────────
+    def update(
+        self, roots: list[str], config: Config, workers: int = 0, prune: bool = True
+    ) -> dict:
+        """Bring the index up to date for `roots` (files and directory trees)."""
+        started = time.monotonic()
+        with self._update_lock:
+            found, dirs = _walk(roots)
+            with self._lock:
+                known = {
+                    path: (size, mtime_ns)
+                    for path, size, mtime_ns in self._db.execute(
+                        "SELECT path, size, mtime_ns FROM files"
+                    )
+                }
+            changed = [
+                path for path, st in found.items()
+                if known.get(path) != (st.st_size, st.st_mtime_ns)
+            ]
+            removed = self._prune(dirs, found) if prune else 0
+
+            cache = pdf_cache.get_cache(config)
+            pages = 0
+            errors: list[dict] = []
+
+            def store(path: str, texts: list[str] | None, error: str | None) -> None:
+                nonlocal pages
+                st = found[path]
+                if texts is not None:
+                    pages += len(texts)
+                    key = cache.doc_key(path)
+                    cache.put_many(key, "page_count", {0: str(len(texts))})
+                    cache.put_many(key, "text", dict(enumerate(texts, 1)))
+                else:
+                    errors.append({"path": path, "error": error})
+                self._store(path, st, texts or [], error)
+
+            pending = []
+            for path in changed:
+                texts = self._cached_text(cache, path)
+                if texts is not None:
+                    store(path, texts, None)
+                else:
+                    pending.append(path)
+
+            workers = workers or pdf_engine.default_workers()
+            done = len(changed) - len(pending)
+            if workers == 1 or len(pending) < PARALLEL_MIN_FILES:
+                for path in pending:
+                    try:
+                        store(path, _extract_file(path), None)
+                    except Exception as e:
+                        store(path, None, f"{type(e).__name__}: {e}")
+                    done += 1
+                    report_progress(done, len(changed), os.path.basename(path))
+            else:
+                pool = pdf_engine.get_pool(workers)
+                futures = {pool.submit(_extract_file, path): path for path in pending}
+                for future in as_completed(futures):
+                    path = futures[future]
+                    try:
+                        store(path, future.result(), None)
+                    except Exception as e:
+                        store(path, None, f"{type(e).__name__}: {e}")
+                    done += 1
+                    report_progress(done, len(changed), os.path.basename(path))
+
+        return {
+            "files": len(found),
+            "indexed": len(changed) - len(errors),
+            "unchanged": len(found) - len(changed),
+            "removed": removed,
+            "failed": len(errors),
+            "pages": pages,
+            "seconds": round(time.monotonic() - started, 2),
+            "errors": errors,
+        }
+
+    def _cached_text(self, cache: "pdf_cache.PageCache", path: str) -> list[str] | None:
+        """Every page's text from the extraction cache, or None if any is missing."""
+        try:
+            key = cache.doc_key(path)
+        except OSError:
+            return None
+        count = cache.get_many(key, "page_count", [0]).get(0)
+        if count is None:
+            return None
+        pages = list(range(1, int(count) + 1))
+        found = cache.get_many(key, "text", pages)
+        if len(found) < len(pages):
+            return None
+        return [found[p] for p in pages]
+
+    def _store(self, path: str, st: os.stat_result, texts: list[str], error: str | None) -> None:
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute("DELETE FROM files WHERE path = ?", (path,))
+            file_id = self._db.execute(
+                "INSERT INTO files (path, size, mtime_ns, pages, indexed_at, error) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, len(texts), time.time(), error),
+            ).lastrowid
+            self._db.executemany(
+                "INSERT INTO page_text (file_id, page, text) VALUES (?, ?, ?)",
+                [(file_id, page, text) for page, text in enumerate(texts, 1) if text.strip()],
+            )
+            self._db.execute("COMMIT")
+
+    def _prune(self, dirs: list[str], found: dict) -> int:
+        """Drop indexed files under the walked directories that no longer exist."""
+        removed = 0
+        with self._lock:
+            for directory in dirs:
+                gone = [
+                    (file_id,) for file_id, path in self._db.execute(
+                        "SELECT id, path FROM files WHERE path LIKE ? ESCAPE '\\'",
+                        (_like_prefix(directory),),
+                    )
+                    if path not in found
+                ]
+                self._db.executemany("DELETE FROM files WHERE id = ?", gone)
+                removed += len(gone)
+        return removed
+
+    # ── Searching ─────────────────────────────────────────────────────────────
+    def search(self, query: str, limit: int = 20, path_prefix: str | None = None) -> dict:
+        """Rank pages matching `query` (FTS5 syntax, or plain words) best first."""
+        started = time.perf_counter()
+        sql = (
+            "SELECT f.path, t.page, snippet(page_fts, 0, '[', ']', ' … ', 16), "
+            "bm25(page_fts) FROM page_fts "
+            "JOIN page_text t ON t.id = page_fts.rowid "
+            "JOIN files f ON f.id = t.file_id "
+            "WHERE page_fts MATCH ?"
+        )
+        params: list = []
+        if path_prefix:
+            sql += " AND f.path LIKE ? ESCAPE '\\'"
+            params.append(_like_prefix(os.path.realpath(path_prefix)))
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(min(limit, MAX_RESULTS))
+
+        with self._lock:
+            try:
+                rows = self._db.execute(sql, (query, *params)).fetchall()
+            except sqlite3.OperationalError:
+                # Not valid FTS5 query syntax: search for the words literally instead
+                rows = self._db.execute(sql, (_fts_quote(query), *params)).fetchall()
+        return {
+            "query": query,
+            "results": [
+                {"path": path, "page": page, "snippet": snippet, "score": round(-score, 4)}
+                for path, page, snippet, score in rows
+            ],
+            "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            files, pages, failed = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(pages), 0), COUNT(error) FROM files"
+            ).fetchone()
+            (db_pages,) = self._db.execute("PRAGMA page_count").fetchone()
+            (page_size,) = self._db.execute("PRAGMA page_size").fetchone()
+        return {
+            "files": files,
+            "pages": pages,
+            "failed": failed,
+            "bytes": db_pages * page_size,
+            "path": str(self.path),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+_INDEX: SearchIndex | None = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_index(config: Config) -> SearchIndex:
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = SearchIndex(Path(config["pdf_index_db"]))
+        return _INDEX
+
+
+def close() -> None:
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is not None:
+            _INDEX.close()
+        _INDEX = None
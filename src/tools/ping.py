@@ -3,15 +3,21 @@ ping tool — sanity check that the server is alive.
 Also serves as a copy-paste template for every new tool you add.
 
 Pattern for every tool file:
-  TOOLS  → list of mcp.types.Tool  (schema declarations)
-  handle → async def(name, args, config) -> str
+  TOOLS    → list of mcp.types.Tool  (schema declarations)
+  EXECUTOR → "async" | "io" | "cpu"  (where handle runs; see tools/__init__.py)
+  handle   → async def(name, args, config) -> str   for "async"
+             def(name, args, config) -> str         for "io" / "cpu"
 """
 
-import json
 from datetime import datetime, timezone
 from mcp import types
 from config import Config
+import metrics
+import results
+from tools import to_json
 
+# Pure in-memory work — runs directly on the event loop
+EXECUTOR = "async"
 
 # ── Tool schemas (what Claude sees) ──────────────────────────────────────────
 TOOLS: list[types.Tool] = [
@@ -37,6 +43,46 @@ TOOLS: list[types.Tool] = [
         ),
         inputSchema={"type": "object", "properties": {}, "required": []},
     ),
+    types.Tool(
+        name="server_stats",
+        description=(
+            "Per-tool call counts, errors, in-flight calls and latency percentiles "
+            "since the server started, plus backend timings (SSH connect, Proxmox "
+            "HTTP, Drive API) recorded by each integration, and the size of the "
+            "paged-result store."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "format": {
+                    "type": "string",
+                    "enum": ["json", "prometheus"],
+                    "default": "json",
+                    "description": "prometheus: the same text written to METRICS_TEXTFILE.",
+                },
+            },
+            "required": [],
+        },
+    ),
+    types.Tool(
+        name="fetch_result_page",
+        description=(
+            "Read the next page of a large tool result. Results longer than "
+            "RESULT_PAGE_CHARS arrive as their first page plus a note with a cursor; "
+            "pass that cursor here, then the cursor in each page's note, until the "
+            "note says it is the last page."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "cursor": {
+                    "type": "string",
+                    "description": "Cursor from the previous page's note, e.g. \"Xk3…:1\".",
+                },
+            },
+            "required": ["cursor"],
+        },
+    ),
 ]
 
 
@@ -46,6 +92,15 @@ async def handle(name: str, args: dict, config: Config) -> str:
         return _ping(args)
     if name == "list_config_keys":
         return _list_config_keys(config)
+    if name == "server_stats":
+        if args.get("format") == "prometheus":
+            return metrics.prometheus_text()
+        return to_json({**metrics.snapshot(), "result_store": results.stats()})
+    if name == "fetch_result_page":
+        try:
+            return results.fetch(args["cursor"], config)
+        except LookupError as e:
+            return f"Error: {e}"
     raise ValueError(f"ping module cannot handle tool: {name}")
 
 
@@ -58,7 +113,7 @@ def _ping(args: dict) -> str:
     }
     if echo:
         payload["echo"] = echo
-    return json.dumps(payload, indent=2)
+    return to_json(payload)
 
 
 def _list_config_keys(config: Config) -> str:
@@ -72,4 +127,4 @@ def _list_config_keys(config: Config) -> str:
             summary[key] = "✓ set"
         else:
             summary[key] = "✗ not set"
-    return json.dumps(summary, indent=2)
+    return to_json(summary)
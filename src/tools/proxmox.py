@@ -9,22 +9,75 @@ Setup steps:
   3. Grant the user only the permissions it needs (PVEVMAdmin, PVEAuditor, etc.)
   4. Set PROXMOX_HOST, PROXMOX_USER, PROXMOX_TOKEN_NAME, PROXMOX_TOKEN_VALUE in .env
 
+Connections:
+  All calls share one cached client per cluster (tools/proxmox_client.py)
+  with a keep-alive connection pool sized by PROXMOX_POOL_SIZE.
+
+Bulk operations:
+  proxmox_bulk_power and proxmox_bulk_snapshot post one task per VM with
+  bounded concurrency and wait for every task to finish
+  (tools/proxmox_tasks.py), sending progress as each one completes.
+
+Inventory:
+  proxmox_list_nodes, proxmox_list_vms and proxmox_vm_status answer from a
+  cluster snapshot refreshed in the background (tools/proxmox_inventory.py).
+  Every response carries data_age_s; pass max_staleness to force a live read
+  when the snapshot is older than that. proxmox_vm_status uses the snapshot
+  only when the VM is on the given node; its "fields" says which shape
+  "status" has: the /cluster/resources summary, or the fuller
+  status/current (with ha, qmpstatus, pid, ...).
+
 Dependencies:
     pip install proxmoxer requests
 """
 
-import json
+import time
 from mcp import types
 from config import Config
 
-# TODO: uncomment when proxmoxer is installed
-# from proxmoxer import ProxmoxAPI
+from tools import proxmox_client, proxmox_inventory, proxmox_tasks, to_json
+
+# proxmoxer is a blocking requests client — run handlers in this integration's thread pool
+EXECUTOR = "io"
+MAX_WORKERS = 8
+
+_MAX_STALENESS = {
+    "type": "number",
+    "description": (
+        "Max age in seconds of the cached inventory to accept; older data is "
+        "re-fetched live. 0 forces a live read. Default: PROXMOX_INVENTORY_MAX_AGE."
+    ),
+}
+
+_TARGETS = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "node": {"type": "string"},
+            "vmid": {"type": "integer"},
+            "type": {"type": "string", "enum": ["qemu", "lxc"], "default": "qemu"},
+        },
+        "required": ["node", "vmid"],
+    },
+    "description": "VMs to act on, as {node, vmid[, type]} objects.",
+}
+_CONCURRENCY = {
+    "type": "integer",
+    "description": "Max tasks running at once (default PROXMOX_BULK_CONCURRENCY).",
+}
 
 TOOLS: list[types.Tool] = [
     types.Tool(
         name="proxmox_list_nodes",
         description="List all nodes in the Proxmox cluster with their status.",
-        inputSchema={"type": "object", "properties": {}, "required": []},
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "max_staleness": _MAX_STALENESS,
+            },
+            "required": [],
+        },
     ),
     types.Tool(
         name="proxmox_list_vms",
@@ -32,20 +85,27 @@ TOOLS: list[types.Tool] = [
         inputSchema={
             "type": "object",
             "properties": {
-                "node": {"type": "string", "description": "Filter to a specific node name."}
+                "node": {"type": "string", "description": "Filter to a specific node name."},
+                "max_staleness": _MAX_STALENESS,
             },
             "required": [],
         },
     ),
     types.Tool(
         name="proxmox_vm_status",
-        description="Get detailed status of a specific VM or container.",
+        description=(
+            "Get the status of a specific VM or container. Answered from the cluster "
+            "inventory when it is fresh enough (fields: \"cluster/resources\", a summary); "
+            "otherwise read live from the node (fields: \"status/current\", full detail). "
+            "Pass max_staleness 0 for the full live status."
+        ),
         inputSchema={
             "type": "object",
             "properties": {
                 "node": {"type": "string"},
                 "vmid": {"type": "integer"},
                 "type": {"type": "string", "enum": ["qemu", "lxc"], "default": "qemu"},
+                "max_staleness": _MAX_STALENESS,
             },
             "required": ["node", "vmid"],
         },
@@ -78,58 +138,144 @@ TOOLS: list[types.Tool] = [
             "required": ["node", "vmid", "snapname"],
         },
     ),
+    types.Tool(
+        name="proxmox_bulk_power",
+        description=(
+            "Start, stop, reboot or shut down many VMs/containers and wait for every "
+            "task to finish. Returns per-VM status, exit status and duration."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "targets": _TARGETS,
+                "action": {"type": "string", "enum": ["start", "stop", "reboot", "shutdown"]},
+                "concurrency": _CONCURRENCY,
+            },
+            "required": ["targets", "action"],
+        },
+    ),
+    types.Tool(
+        name="proxmox_bulk_snapshot",
+        description=(
+            "Snapshot many VMs/containers under one name and wait for every task to "
+            "finish. Returns per-VM status, exit status and duration."
+        ),
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "targets": _TARGETS,
+                "snapname": {"type": "string", "description": "Snapshot name (no spaces)."},
+                "description": {"type": "string"},
+                "concurrency": _CONCURRENCY,
+            },
+            "required": ["targets", "snapname"],
+        },
+    ),
 ]
 
 
 def _get_proxmox(config: Config):
-    # return ProxmoxAPI(
-    #     config["proxmox_host"],
-    #     user=config["proxmox_user"],
-    #     token_name=config["proxmox_token_name"],
-    #     token_value=config["proxmox_token_value"],
-    #     verify_ssl=config["proxmox_verify_ssl"],
-    # )
-    raise NotImplementedError("Install proxmoxer and configure credentials")
+    return proxmox_client.get_client(config)
+
+
+def _max_staleness(args: dict, config: Config) -> float:
+    return float(args.get("max_staleness", config.get("proxmox_inventory_max_age", 60)))
+
 
+def _with_age(payload: dict, fetched: float, source: str) -> str:
+    return to_json(
+        {"data_age_s": round(time.time() - fetched, 1), "source": source, **payload})
 
-async def handle(name: str, args: dict, config: Config) -> str:
-    # px = _get_proxmox(config)
+
+def _guest(px, target: dict):
+    node = px.nodes(target["node"])
+    return node.lxc(target["vmid"]) if target.get("type") == "lxc" else node.qemu(target["vmid"])
+
+
+def _bulk(px, args: dict, config: Config, post: proxmox_tasks.PostTask, label: str) -> str:
+    summary = proxmox_tasks.run_bulk(
+        px,
+        args["targets"],
+        post,
+        concurrency=args.get("concurrency") or config.get("proxmox_bulk_concurrency", 8),
+        timeout=config.get("proxmox_task_timeout", 900),
+        label=label,
+    )
+    return to_json(summary)
+
+
+def handle(name: str, args: dict, config: Config) -> str:
+    px = _get_proxmox(config)
+    inventory = proxmox_inventory.get_inventory(config)
 
     if name == "proxmox_list_nodes":
-        # nodes = px.nodes.get()
-        # return json.dumps(nodes, indent=2)
-        raise NotImplementedError
+        snap, source = inventory.get(_max_staleness(args, config))
+        return _with_age({"nodes": snap.nodes}, snap.fetched, source)
 
     if name == "proxmox_list_vms":
-        # node_filter = args.get("node")
-        # nodes = [px.nodes(node_filter)] if node_filter else [px.nodes(n["node"]) for n in px.nodes.get()]
-        # vms = []
-        # for node in nodes:
-        #     vms.extend(node.qemu.get())
-        #     vms.extend(node.lxc.get())
-        # return json.dumps(vms, indent=2)
-        raise NotImplementedError
+        snap, source = inventory.get(_max_staleness(args, config))
+        vms = snap.guests
+        if args.get("node"):
+            vms = [vm for vm in vms if vm.get("node") == args["node"]]
+        return _with_age({"vms": vms}, snap.fetched, source)
 
     if name == "proxmox_vm_status":
-        # vm_type = args.get("type", "qemu")
-        # endpoint = px.nodes(args["node"]).qemu if vm_type == "qemu" else px.nodes(args["node"]).lxc
-        # status = endpoint(args["vmid"]).status.current.get()
-        # return json.dumps(status, indent=2)
-        raise NotImplementedError
+        vm_type = args.get("type", "qemu")
+        max_staleness = _max_staleness(args, config)
+        snap = inventory.snapshot
+        if snap is not None and snap.age <= max_staleness:
+            vm = snap.guest(vm_type, args["vmid"])
+            # On another node, the live call below errors as it should
+            if vm is not None and vm.get("node") == args["node"]:
+                return _with_age(
+                    {"fields": "cluster/resources", "status": vm}, snap.fetched, "snapshot"
+                )
+        # Too stale, not in the snapshot or not on that node: ask the node directly
+        endpoint = px.nodes(args["node"]).qemu if vm_type == "qemu" else px.nodes(args["node"]).lxc
+        fetched = time.time()
+        status = endpoint(args["vmid"]).status.current.get()
+        return _with_age({"fields": "status/current", "status": status}, fetched, "live")
 
     if name == "proxmox_vm_power":
-        # vm_type = args.get("type", "qemu")
-        # endpoint = px.nodes(args["node"]).qemu if vm_type == "qemu" else px.nodes(args["node"]).lxc
-        # endpoint(args["vmid"]).status(args["action"]).post()
-        # return f"Action '{args['action']}' sent to VMID {args['vmid']}"
-        raise NotImplementedError
+        vm_type = args.get("type", "qemu")
+        endpoint = px.nodes(args["node"]).qemu if vm_type == "qemu" else px.nodes(args["node"]).lxc
+        endpoint(args["vmid"]).status(args["action"]).post()
+        inventory.invalidate()
+        return f"Action '{args['action']}' sent to VMID {args['vmid']}"
 
     if name == "proxmox_create_snapshot":
-        # px.nodes(args["node"]).qemu(args["vmid"]).snapshot.post(
-        #     snapname=args["snapname"],
-        #     description=args.get("description", ""),
-        # )
-        # return f"Snapshot '{args['snapname']}' created for VMID {args['vmid']}"
-        raise NotImplementedError
+        px.nodes(args["node"]).qemu(args["vmid"]).snapshot.post(
+            snapname=args["snapname"],
+            description=args.get("description", ""),
+        )
+        return f"Snapshot '{args['snapname']}' created for VMID {args['vmid']}"
+
+    if name == "proxmox_bulk_power":
+        action = args["action"]
+        try:
+            return _bulk(
+                px, args, config,
+                lambda px, t: _guest(px, t).status(action).post(),
+                label=action,
+            )
+        finally:
+            inventory.invalidate()
+
+    if name == "proxmox_bulk_snapshot":
+        snapname, description = args["snapname"], args.get("description", "")
+        return _bulk(
+            px, args, config,
+            lambda px, t: _guest(px, t).snapshot.post(snapname=snapname, description=description),
+            label=f"snapshot {snapname}",
+        )
 
     raise ValueError(f"proxmox module cannot handle tool: {name}")
+
+
+def startup(config: Config) -> None:
+    proxmox_inventory.get_inventory(config).start()
+
+
+def shutdown() -> None:
+    proxmox_inventory.close()
+    proxmox_client.close_all()
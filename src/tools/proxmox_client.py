@@ -0,0 +1,90 @@
+"""
+Process-wide Proxmox API client (used by tools/proxmox.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+One ProxmoxAPI is built per configured cluster on first use and reused by
+every call, so calls share one requests session and its keep-alive
+connections instead of paying a TLS handshake each time. The session's
+connection pool is sized for the proxmox executor threads. The client is
+rebuilt when the host or credentials in config change.
+
+requests sessions are safe to share across threads for plain request/
+response use as long as the pool has a connection per thread, which is
+what PROXMOX_POOL_SIZE provides.
+"""
+
+import threading
+import time
+
+from proxmoxer import ProxmoxAPI
+from requests.adapters import HTTPAdapter
+
+import metrics
+from config import Config
+
+_CLIENTS: dict[tuple, ProxmoxAPI] = {}
+_LOCK = threading.Lock()
+
+
+class _TimedAdapter(HTTPAdapter):
+    """Records every API round trip as the "proxmox.http" backend metric."""
+
+    def send(self, request, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = super().send(request, *args, **kwargs)
+        except Exception:
+            metrics.observe("proxmox.http", time.perf_counter() - started, error=True)
+            raise
+        metrics.observe("proxmox.http", time.perf_counter() - started, response.status_code >= 400)
+        return response
+
+
+def _key(config: Config) -> tuple:
+    return (
+        config["proxmox_host"],
+        config["proxmox_user"],
+        config["proxmox_token_name"],
+        config["proxmox_token_value"],
+        config["proxmox_verify_ssl"],
+    )
+
+
+def _build(config: Config) -> ProxmoxAPI:
+    px = ProxmoxAPI(
+        config["proxmox_host"],
+        user=config["proxmox_user"],
+        token_name=config["proxmox_token_name"],
+        token_value=config["proxmox_token_value"],
+        verify_ssl=config["proxmox_verify_ssl"],
+        timeout=config.get("proxmox_timeout", 10),
+    )
+    # proxmoxer exposes no hook for adapter tuning; its session lives in _store
+    pool_size = config.get("proxmox_pool_size", 16)
+    adapter = _TimedAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+    px._store["session"].mount("https://", adapter)
+    return px
+
+
+def get_client(config: Config) -> ProxmoxAPI:
+    """Return the shared client for the configured cluster, building it on first use."""
+    key = _key(config)
+    client = _CLIENTS.get(key)
+    if client is not None:
+        return client
+    with _LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            # Credentials changed (or first use): drop any stale client for this host
+            for old in [k for k in _CLIENTS if k[0] == key[0]]:
+                _CLIENTS.pop(old)._store["session"].close()
+            client = _CLIENTS[key] = _build(config)
+        return client
+
+
+def close_all() -> None:
+    with _LOCK:
+        for client in _CLIENTS.values():
+            client._store["session"].close()
+        _CLIENTS.clear()
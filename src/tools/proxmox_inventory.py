@@ -0,0 +1,114 @@
+"""
+In-memory cluster inventory for the Proxmox tools (used by tools/proxmox.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+The whole cluster — nodes, QEMU VMs and LXC containers — is read with one
+GET /cluster/resources instead of a qemu.get() and lxc.get() per node.
+The result is kept as a snapshot that a background asyncio task refreshes
+every PROXMOX_INVENTORY_INTERVAL seconds, so list/status calls are answered
+from memory. A caller that needs fresher data than the snapshot passes
+max_staleness; if the snapshot is older, it is re-fetched on the spot.
+Concurrent callers that all find it stale share one live fetch.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+from config import Config
+from tools import proxmox_client
+
+log = logging.getLogger("mcp-server.proxmox")
+
+GUEST_TYPES = ("qemu", "lxc")
+
+
+class Snapshot:
+    def __init__(self, resources: list[dict]):
+        self.fetched = time.time()
+        self.nodes = [r for r in resources if r.get("type") == "node"]
+        self.guests = [r for r in resources if r.get("type") in GUEST_TYPES]
+        self._by_vmid = {(r["type"], r["vmid"]): r for r in self.guests}
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched
+
+    def guest(self, vm_type: str, vmid: int) -> dict | None:
+        return self._by_vmid.get((vm_type, vmid))
+
+
+class Inventory:
+    def __init__(self, config: Config):
+        self.config = config
+        self.interval = config.get("proxmox_inventory_interval", 30)
+        self.snapshot: Snapshot | None = None
+        self.live_fetches = 0
+        self._fetch_lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+
+    def fetch(self) -> Snapshot:
+        """Read /cluster/resources now and replace the snapshot (blocking)."""
+        resources = proxmox_client.get_client(self.config).cluster.resources.get()
+        self.snapshot = Snapshot(resources)
+        return self.snapshot
+
+    def get(self, max_staleness: float) -> tuple[Snapshot, str]:
+        """Return (snapshot, source) no older than `max_staleness` seconds."""
+        snap = self.snapshot
+        if snap is not None and snap.age <= max_staleness:
+            return snap, "snapshot"
+        with self._fetch_lock:
+            # Another thread may have refreshed it while we waited
+            snap = self.snapshot
+            if snap is not None and snap.age <= max_staleness:
+                return snap, "snapshot"
+            self.live_fetches += 1
+            return self.fetch(), "live"
+
+    def invalidate(self) -> None:
+        """Drop the snapshot after a change we made (power, snapshot, …)."""
+        self.snapshot = None
+
+    def start(self) -> None:
+        """Start the background refresh task on the running loop (idempotent)."""
+        if self.interval <= 0 or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.fetch)
+            except Exception as e:
+                # Keep serving the last good snapshot; callers can still force a live read
+                log.warning("Proxmox inventory refresh failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# ── Process-wide instance ─────────────────────────────────────────────────────
+_INVENTORY: Inventory | None = None
+_LOCK = threading.Lock()
+
+
+def get_inventory(config: Config) -> Inventory:
+    global _INVENTORY
+    with _LOCK:
+        if _INVENTORY is None:
+            _INVENTORY = Inventory(config)
+        return _INVENTORY
+
+
+def close() -> None:
+    global _INVENTORY
+    with _LOCK:
+        if _INVENTORY is not None:
+            _INVENTORY.stop()
+        _INVENTORY = None
@@ -0,0 +1,115 @@
+"""
+Bulk Proxmox operations with task tracking (used by tools/proxmox.py).
+
+Not a tool module — it has no TOOLS and is not in the registry.
+
+Proxmox answers a power or snapshot request with a UPID and runs the work
+as a background task on the node. run_bulk posts one such request per
+target, keeping at most PROXMOX_BULK_CONCURRENCY tasks in flight so a
+40-VM snapshot doesn't hit shared storage all at once. It then follows
+every UPID through /nodes/{node}/tasks/{upid}/status until it stops.
+
+Polling backs off per task: a task is first checked POLL_MIN after it is
+posted, and each check that finds it still running multiplies its delay by
+POLL_FACTOR, up to POLL_MAX. Short tasks are noticed quickly, long
+snapshots aren't polled every quarter second, and one slow VM doesn't slow
+down checks on tasks posted after it. The loop sleeps until the next task
+is due.
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Callable
+
+from tools import report_progress
+
+log = logging.getLogger("mcp-server.proxmox")
+
+POLL_MIN = 0.25
+POLL_MAX = 5.0
+POLL_FACTOR = 1.5
+
+# (px, target) → UPID of the task it started
+PostTask = Callable[[object, dict], str]
+
+
+def _result(target: dict, status: str, started: float, **extra) -> dict:
+    return {
+        "node": target["node"],
+        "vmid": target["vmid"],
+        "status": status,
+        "duration_s": round(time.monotonic() - started, 2),
+        **extra,
+    }
+
+
+def run_bulk(
+    px,
+    targets: list[dict],
+    post: PostTask,
+    concurrency: int,
+    timeout: float,
+    label: str,
+) -> dict:
+    """Run `post` for every target and wait for each task; return a summary."""
+    started = time.monotonic()
+    pending = deque(targets)
+    # upid → [target, posted at, next check at, current delay]
+    in_flight: dict[str, list] = {}
+    results: list[dict] = []
+
+    def finish(result: dict) -> None:
+        results.append(result)
+        report_progress(len(results), len(targets), f"{label} {result['vmid']}: {result['status']}")
+
+    while pending or in_flight:
+        while pending and len(in_flight) < concurrency:
+            target = pending.popleft()
+            posted = time.monotonic()
+            try:
+                upid = post(px, target)
+            except Exception as e:
+                finish(_result(target, "error", posted, error=str(e)))
+                continue
+            in_flight[upid] = [target, posted, posted + POLL_MIN, POLL_MIN]
+
+        now = time.monotonic()
+        for upid, entry in list(in_flight.items()):
+            target, posted, due, delay = entry
+            if due > now:
+                continue
+            try:
+                task = px.nodes(target["node"]).tasks(upid).status.get()
+            except Exception as e:
+                # A failed poll is not a failed task; try again after the next delay
+                log.warning("Proxmox task poll failed for %s: %s", upid, e)
+                task = {}
+            if task.get("status") == "stopped":
+                exitstatus = task.get("exitstatus")
+                status = "ok" if exitstatus == "OK" else "failed"
+                finish(_result(target, status, posted, upid=upid, exitstatus=exitstatus))
+            elif time.monotonic() - posted > timeout:
+                finish(_result(target, "timeout", posted, upid=upid))
+            else:
+                delay = min(delay * POLL_FACTOR, POLL_MAX)
+                entry[2:] = [time.monotonic() + delay, delay]
+                continue
+            del in_flight[upid]
+
+        if in_flight and not (pending and len(in_flight) < concurrency):
+            next_due = min(entry[2] for entry in in_flight.values())
+            time.sleep(max(0.0, next_due - time.monotonic()))
+
+    counts: dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    order = {(t["node"], t["vmid"]): i for i, t in enumerate(targets)}
+    results.sort(key=lambda r: order[(r["node"], r["vmid"])])
+    return {
+        "operation": label,
+        "total": len(targets),
+        "counts": counts,
+        "elapsed_s": round(time.monotonic() - started, 2),
+        "results": results,
+    }